@@ -0,0 +1,10 @@
+"""
+Offline benchmarks for yt-whisper.
+
+The benchmarks run the real pipeline and database code against a fake yt-dlp
+extractor, generated audio and a deterministic stub Whisper model, so results
+can be compared between releases without network access or a GPU.
+
+Usage:
+    python -m benchmarks --sizes 1000,10000 --output results.json
+"""
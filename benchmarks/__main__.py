@@ -0,0 +1,278 @@
+"""
+Run the offline benchmarks and report latency percentiles as JSON.
+
+Example usage:
+    python -m benchmarks
+    python -m benchmarks --sizes 1000,100000,1000000 --data-dir .bench --output out.json
+"""
+
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from typing import Any
+from unittest.mock import patch
+
+import click
+
+from yt_whisper import __version__
+from yt_whisper.db import (
+    close_connections,
+    get_connection,
+    get_transcript,
+    list_transcripts,
+    save_many,
+    save_to_db,
+    search_transcripts,
+    transaction,
+)
+from yt_whisper.lib import download_and_transcribe
+from yt_whisper.models import clear_model_cache
+
+from .fakes import WORDS, FakeYoutubeDL, StubModel, fake_info, fake_text
+
+# Rows inserted per transaction while populating a benchmark database
+POPULATE_BATCH = 5000
+
+
+def summarize(latencies: list[float]) -> dict[str, float]:
+    """Latency percentiles in milliseconds and throughput in operations/second."""
+    ordered = sorted(latencies)
+
+    def percentile(p: float) -> float:
+        index = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+        return ordered[index] * 1000
+
+    total = sum(ordered)
+    return {
+        "count": len(ordered),
+        "mean_ms": total / len(ordered) * 1000,
+        "p50_ms": percentile(50),
+        "p90_ms": percentile(90),
+        "p99_ms": percentile(99),
+        "max_ms": ordered[-1] * 1000,
+        "ops_per_second": len(ordered) / total if total else 0.0,
+    }
+
+
+def measure(func: Callable[[int], object], iterations: int) -> list[float]:
+    """Call func(i) for each iteration and return the duration of each call."""
+    latencies = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        func(i)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+@contextlib.contextmanager
+def quiet() -> Iterator[None]:
+    """Swallow the progress messages the library prints."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def video_id(i: int) -> str:
+    """An 11 character ID like YouTube's."""
+    return f"bench{i:06d}"
+
+
+def make_record(i: int, words: int) -> dict[str, Any]:
+    """A stored video as download_and_transcribe would produce it."""
+    youtube_id = video_id(i)
+    info = fake_info(youtube_id, 600)
+    return {
+        "id": youtube_id,
+        "url": f"https://www.youtube.com/watch?v={youtube_id}",
+        "title": info["title"],
+        "channel": info["channel"],
+        "author": info["uploader"],
+        "upload_date": info["upload_date"],
+        "duration": info["duration"],
+        "description": info["description"],
+        "transcription": fake_text(i, words),
+        "segments": None,
+        "metadata": info,
+        "created_at": f"2024-05-01T12:{i // 60 % 60:02d}:{i % 60:02d}Z",
+    }
+
+
+def populate(db_path: str, rows: int, words: int) -> float:
+    """
+    Fill a database with rows synthetic videos, reusing an existing file.
+
+    Returns:
+        float: Seconds spent inserting, or 0 if the database was reused
+    """
+    if os.path.exists(db_path):
+        count = get_connection(db_path).execute("SELECT COUNT(*) FROM videos")
+        if count.fetchone()[0] == rows:
+            return 0.0
+        close_connections()
+        os.remove(db_path)
+
+    start = time.perf_counter()
+    for first in range(0, rows, POPULATE_BATCH):
+        last = min(rows, first + POPULATE_BATCH)
+        save_many(
+            (make_record(i, words) for i in range(first, last)),
+            db_path,
+            batch_size=POPULATE_BATCH,
+        )
+    return time.perf_counter() - start
+
+
+def bench_pipeline(iterations: int, audio_seconds: float) -> dict[str, Any]:
+    """Benchmark download_and_transcribe end to end with the fakes in place."""
+    FakeYoutubeDL.seconds = audio_seconds
+    clear_model_cache()
+    stages: dict[str, list[float]] = {}
+
+    def run(i: int) -> None:
+        url = f"https://www.youtube.com/watch?v={video_id(i)}"
+        result = download_and_transcribe(url, model_name="stub")
+        for name, seconds in result["timings"].items():
+            stages.setdefault(name, []).append(seconds)
+
+    with (
+        patch("yt_dlp.YoutubeDL", FakeYoutubeDL),
+        patch("whisper.load_model", return_value=StubModel()),
+        quiet(),
+    ):
+        latencies = measure(run, iterations)
+    clear_model_cache()
+
+    report = summarize(latencies)
+    report["audio_seconds_per_second"] = (
+        iterations * audio_seconds / sum(latencies) if latencies else 0.0
+    )
+    report["stages"] = {name: summarize(values) for name, values in stages.items()}
+    return report
+
+
+def bench_database(
+    db_path: str, rows: int, iterations: int, words: int
+) -> dict[str, Any]:
+    """Benchmark the database operations against rows stored videos."""
+    with quiet():
+        populate_seconds = populate(db_path, rows, words)
+    rng = random.Random(rows)
+
+    def save(i: int) -> None:
+        record = make_record(rows + i, words)
+        record["segments"] = []
+        save_to_db(record, db_path)
+
+    with quiet():
+        report = {
+            "rows": rows,
+            "populate_seconds": populate_seconds,
+            "get_transcript": summarize(
+                measure(
+                    lambda i: get_transcript(video_id(rng.randrange(rows)), db_path),
+                    iterations,
+                )
+            ),
+            "list_transcripts": summarize(
+                measure(lambda i: list_transcripts(10, db_path), iterations)
+            ),
+            "search": summarize(
+                measure(
+                    lambda i: search_transcripts(
+                        " ".join(rng.sample(WORDS, 2)), db_path=db_path
+                    ),
+                    iterations,
+                )
+            ),
+            "save_to_db": summarize(measure(save, iterations)),
+        }
+
+    # Undo the inserts so a reused database keeps its size
+    with transaction(db_path) as conn:
+        conn.executemany(
+            "DELETE FROM videos WHERE id = ?",
+            [(video_id(rows + i),) for i in range(iterations)],
+        )
+    return report
+
+
+@click.command()
+@click.option(
+    "--sizes",
+    default="1000,10000",
+    help="Comma-separated database sizes, in videos",
+    show_default=True,
+)
+@click.option(
+    "--iterations",
+    default=200,
+    help="Calls measured per database operation",
+    show_default=True,
+)
+@click.option(
+    "--pipeline-iterations",
+    default=20,
+    help="Videos run through download_and_transcribe",
+    show_default=True,
+)
+@click.option(
+    "--audio-seconds",
+    default=60.0,
+    help="Length of each generated video's audio",
+    show_default=True,
+)
+@click.option(
+    "--words",
+    default=300,
+    help="Words per synthetic transcript",
+    show_default=True,
+)
+@click.option(
+    "--data-dir",
+    type=click.Path(file_okay=False),
+    help="Keep populated databases here and reuse them on the next run",
+)
+@click.option("--output", type=click.File("w"), help="Output file (default: stdout)")
+def main(
+    sizes: str,
+    iterations: int,
+    pipeline_iterations: int,
+    audio_seconds: float,
+    words: int,
+    data_dir: str | None,
+    output: io.TextIOBase | None,
+) -> None:
+    """Run the offline benchmarks and print the results as JSON."""
+    with contextlib.ExitStack() as stack:
+        if data_dir is None:
+            data_dir = stack.enter_context(tempfile.TemporaryDirectory())
+        os.makedirs(data_dir, exist_ok=True)
+
+        results: dict[str, Any] = {
+            "version": __version__,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "pipeline": bench_pipeline(pipeline_iterations, audio_seconds),
+            "database": [],
+        }
+        for size in sizes.split(","):
+            rows = int(size)
+            click.echo(f"Benchmarking database with {rows} videos...", err=True)
+            db_path = os.path.join(data_dir, f"bench-{rows}.db")
+            results["database"].append(bench_database(db_path, rows, iterations, words))
+        close_connections()
+
+    json.dump(results, output or sys.stdout, indent=2)
+    (output or sys.stdout).write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Offline stand-ins for YouTube and Whisper.
+
+FakeYoutubeDL mimics the part of yt_dlp.YoutubeDL that yt-whisper uses, writing
+generated WAV audio and an info JSON instead of downloading anything. StubModel
+mimics a loaded Whisper model and returns deterministic segments whose count
+follows the length of the audio.
+"""
+
+import json
+import random
+import re
+import wave
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from yt_whisper.audio import SAMPLE_RATE
+
+# Words the synthetic transcripts and search queries are drawn from
+WORDS = (
+    "about above across action after again against almost along already also "
+    "always among analysis answer around audio because before behind below "
+    "between beyond build called camera change channel chapter common compare "
+    "computer content could course create current data database design detail "
+    "develop different during early energy engine enough example experience "
+    "explain family feature field figure final first follow format future "
+    "general government great group guitar history house however human idea "
+    "important include increase interest interview island itself journey "
+    "kitchen language large later learn level light little local machine market "
+    "measure memory method middle minute model moment money mountain music "
+    "nature network number object ocean office often order other paper people "
+    "perhaps person picture place planet point policy popular power practice "
+    "present problem process program project public question quickly radio "
+    "reason record report research result river science second service several "
+    "should simple small social sound space special speech story street study "
+    "summer system table teacher theory thought through today together travel "
+    "under until video voice water weather where which while window winter "
+    "within without world would write young"
+).split()
+
+# Length of each stub segment in seconds
+SEGMENT_SECONDS = 5.0
+
+
+def write_wav(
+    path: str | Path, seconds: float, sample_rate: int = SAMPLE_RATE, seed: int = 0
+) -> None:
+    """Write mono 16-bit WAV audio of the given length: a tone with some noise."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    samples = 0.3 * np.sin(2 * np.pi * 220 * t) + rng.normal(0, 0.05, len(t))
+    pcm = (np.clip(samples, -1, 1) * 32767).astype("<i2")
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(pcm.tobytes())
+
+
+def fake_text(seed: int, num_words: int) -> str:
+    """Deterministic pseudo-English text."""
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(num_words))
+
+
+def fake_info(youtube_id: str, seconds: float) -> dict[str, Any]:
+    """Info JSON in the shape yt-dlp writes for a video."""
+    seed = sum(map(ord, youtube_id))
+    return {
+        "id": youtube_id,
+        "title": fake_text(seed, 6).title(),
+        "channel": f"Channel {seed % 100}",
+        "uploader": f"Uploader {seed % 100}",
+        "upload_date": "20240501",
+        "duration": int(seconds),
+        "description": fake_text(seed + 1, 40),
+        "formats": [{"format_id": "251", "ext": "webm", "acodec": "opus"}],
+    }
+
+
+class FakeYoutubeDL:
+    """
+    Drop-in replacement for yt_dlp.YoutubeDL that generates files locally.
+
+    Set the ``seconds`` class attribute to change the length of the generated
+    audio.
+
+    Args:
+        params: yt-dlp options, as passed by yt_whisper.lib.download_audio
+    """
+
+    seconds = 60.0
+
+    def __init__(self, params: dict[str, Any] | None = None) -> None:
+        self.params = params or {}
+
+    def __enter__(self) -> "FakeYoutubeDL":  # noqa: PYI034
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        return None
+
+    def download(self, urls: list[str]) -> int:
+        """Write audio and an info JSON for each URL."""
+        for url in urls:
+            youtube_id = re.sub(r".*[?&]v=", "", url)
+            template = self.params["outtmpl"]
+            if "%(ext)s" in template:
+                audio_file = template.replace("%(ext)s", "wav")
+                base = template.replace(".%(ext)s", "")
+            else:
+                # The MP3 postprocessor names the file after the template
+                audio_file = f"{template}.mp3"
+                base = template
+            write_wav(audio_file, self.seconds)
+            with open(f"{base}.info.json", "w", encoding="utf-8") as f:
+                json.dump(fake_info(youtube_id, self.seconds), f)
+        return 0
+
+
+class StubModel:
+    """Deterministic stand-in for a loaded Whisper model."""
+
+    def transcribe(
+        self,
+        audio: str | np.ndarray,
+        language: str | None = None,
+        **kwargs: object,
+    ) -> dict[str, Any]:
+        """Return one segment of pseudo-English per SEGMENT_SECONDS of audio."""
+        if isinstance(audio, str):
+            with wave.open(audio, "rb") as f:
+                seconds = f.getnframes() / f.getframerate()
+        else:
+            seconds = len(audio) / SAMPLE_RATE
+
+        segments = []
+        start = 0.0
+        while start < seconds:
+            end = min(seconds, start + SEGMENT_SECONDS)
+            segments.append(
+                {
+                    "start": start,
+                    "end": end,
+                    "text": " " + fake_text(len(segments), 12),
+                    "tokens": list(range(12)),
+                    "avg_logprob": -0.2,
+                    "no_speech_prob": 0.01,
+                }
+            )
+            start = end
+        return {
+            "text": "".join(segment["text"] for segment in segments),
+            "segments": segments,
+            "language": language or "en",
+        }
@@ -0,0 +1,65 @@
+"""Fixtures shared by the test modules."""
+
+import json
+import os
+import tempfile
+from collections.abc import Callable, Generator
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+
+def fake_download_audio(
+    youtube_id: str, temp_dir: str, force: bool = False, native: bool = False
+) -> tuple[str, str]:
+    """Write a fake audio and info JSON file instead of downloading."""
+    if youtube_id.startswith("bad"):
+        raise RuntimeError("Video unavailable")
+    audio_file = os.path.join(temp_dir, f"ytw_audio_{youtube_id}.mp3")
+    metadata_file = os.path.join(temp_dir, f"ytw_audio_{youtube_id}.info.json")
+    with open(audio_file, "w") as f:
+        f.write("audio")
+    with open(metadata_file, "w") as f:
+        json.dump({"id": youtube_id, "title": f"Video {youtube_id}", "duration": 60}, f)
+    return audio_file, metadata_file
+
+
+def _make_video(youtube_id: str, **fields: object) -> dict:
+    """Build a video record as produced by download_and_transcribe."""
+    video = {
+        "id": youtube_id,
+        "url": f"https://www.youtube.com/watch?v={youtube_id}",
+        "title": f"Video {youtube_id}",
+        "channel": "Channel",
+        "author": "Author",
+        "upload_date": "20240501",
+        "duration": 60,
+        "description": "",
+        "transcription": "",
+        "metadata": {"id": youtube_id},
+        "created_at": "2024-05-01T12:00:00Z",
+    }
+    video.update(fields)
+    return video
+
+
+@pytest.fixture
+def db_path() -> Generator[str, None, None]:
+    """Path to a database file that does not exist yet."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield os.path.join(temp_dir, "test.db")
+
+
+@pytest.fixture
+def make_video() -> Callable[..., dict]:
+    """Build video records; keyword arguments override the defaults."""
+    return _make_video
+
+
+@pytest.fixture
+def fake_download() -> Generator[MagicMock, None, None]:
+    """Replace downloads with fake audio; IDs starting with 'bad' fail."""
+    with patch(
+        "yt_whisper.lib.download_audio", side_effect=fake_download_audio
+    ) as mock_download:
+        yield mock_download
@@ -0,0 +1,176 @@
+"""Tests for the asyncio interface."""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections.abc import Generator
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from yt_whisper import aio
+from yt_whisper.models import clear_model_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache() -> Generator[None, None, None]:
+    """Make sure fake models do not leak into other tests."""
+    clear_model_cache()
+    yield
+    clear_model_cache()
+
+
+class SlowDownload:
+    """Fake download_audio that takes a while and counts concurrent calls."""
+
+    def __init__(self) -> None:
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(
+        self, youtube_id: str, temp_dir: str, force: bool = False, native: bool = False
+    ) -> tuple[str, str]:
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.05)
+        audio_file = os.path.join(temp_dir, f"ytw_audio_{youtube_id}.mp3")
+        metadata_file = os.path.join(temp_dir, f"ytw_audio_{youtube_id}.info.json")
+        with open(audio_file, "w") as f:
+            f.write("audio")
+        with open(metadata_file, "w") as f:
+            json.dump({"id": youtube_id, "title": f"Video {youtube_id}"}, f)
+        with self._lock:
+            self.active -= 1
+        return audio_file, metadata_file
+
+
+def fake_model() -> MagicMock:
+    """A model that returns a fixed transcription."""
+    model = MagicMock()
+    model.transcribe.return_value = {"text": "Async transcription.", "segments": []}
+    return model
+
+
+def test_concurrency_limit_applies_backpressure() -> None:
+    """No more than max_concurrency videos are downloaded at once."""
+    download = SlowDownload()
+
+    async def main() -> list[dict]:
+        async with aio.AsyncTranscriber(max_concurrency=2) as transcriber:
+            return await asyncio.gather(
+                *(
+                    transcriber.download_and_transcribe(f"https://youtu.be/vid{i}")
+                    for i in range(6)
+                )
+            )
+
+    with (
+        patch("yt_whisper.lib.download_audio", side_effect=download),
+        patch("yt_whisper.lib.get_model", return_value=fake_model()),
+    ):
+        results = asyncio.run(main())
+
+    assert download.peak == 2
+    assert [result["id"] for result in results] == [f"vid{i}" for i in range(6)]
+    assert results[0]["transcription"] == "Async transcription."
+    assert "inference" in results[0]["timings"]
+
+
+def test_event_loop_is_not_blocked() -> None:
+    """Other tasks keep running while a video is being downloaded."""
+    ticks = []
+
+    async def ticker() -> None:
+        for _ in range(3):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    async def main() -> None:
+        await asyncio.gather(
+            aio.download_and_transcribe("https://youtu.be/abc"), ticker()
+        )
+
+    with (
+        patch("yt_whisper.lib.download_audio", side_effect=SlowDownload()),
+        patch("yt_whisper.lib.get_model", return_value=fake_model()),
+    ):
+        asyncio.run(main())
+
+    assert ticks[-1] - ticks[0] < 0.05
+
+
+def test_private_models_per_inference_worker() -> None:
+    """With several inference threads, each thread loads its own model."""
+    with (
+        patch("yt_whisper.lib.download_audio", side_effect=SlowDownload()),
+        patch("whisper.load_model", side_effect=lambda *a, **k: fake_model()) as load,
+    ):
+
+        async def main() -> None:
+            async with aio.AsyncTranscriber(inference_workers=2) as transcriber:
+                await asyncio.gather(
+                    *(
+                        transcriber.download_and_transcribe(f"https://youtu.be/v{i}")
+                        for i in range(4)
+                    )
+                )
+
+        asyncio.run(main())
+
+    assert 1 <= load.call_count <= 2
+
+
+def test_async_db_accessors(db_path: str) -> None:
+    """The database accessors can be awaited."""
+
+    async def main() -> dict | None:
+        await aio.save_to_db(
+            {
+                "id": "abc",
+                "url": "https://youtu.be/abc",
+                "title": "Video",
+                "transcription": "Saved from asyncio.",
+                "created_at": "2024-05-01T12:00:00Z",
+            },
+            db_path,
+        )
+        return await aio.get_transcript("abc", db_path)
+
+    transcript = asyncio.run(main())
+
+    assert transcript["transcription"] == "Saved from asyncio."
+
+
+def test_stream_is_forwarded() -> None:
+    """Streaming transcription is available from asyncio, with its peak memory."""
+    streamed = {
+        "text": " Streamed.",
+        "segments": [],
+        "language": "en",
+        "language_probability": None,
+        "model": "base",
+        "backend": "openai-whisper",
+        "options": {"compute_type": "fp32", "vad": False, "streamed": True},
+    }
+
+    async def main() -> dict:
+        async with aio.AsyncTranscriber(max_concurrency=1) as transcriber:
+            return await transcriber.download_and_transcribe(
+                "https://youtu.be/abc", stream=True
+            )
+
+    with (
+        patch("yt_whisper.lib.download_audio", side_effect=SlowDownload()),
+        patch(
+            "yt_whisper.streaming.transcribe_stream", return_value=streamed
+        ) as mock_stream,
+    ):
+        result = asyncio.run(main())
+
+    assert mock_stream.call_args.args[0].endswith(".mp3")
+    assert result["transcription"] == " Streamed."
+    assert "peak_rss" in result
@@ -0,0 +1,64 @@
+"""Tests for audio decoding."""
+
+import os
+import subprocess
+import tempfile
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from yt_whisper.audio import decode_audio, open_pcm
+
+
+@patch("subprocess.run")
+def test_decode_audio_returns_float32_samples(mock_run: MagicMock) -> None:
+    """ffmpeg output is read as 16 kHz mono float32 without conversion."""
+    samples = np.array([0.0, 0.5, -0.5], dtype=np.float32)
+    mock_run.return_value = MagicMock(stdout=samples.tobytes())
+
+    audio = decode_audio("ytw_audio_abc.webm")
+
+    np.testing.assert_array_equal(audio, samples)
+    command = mock_run.call_args[0][0]
+    assert command[command.index("-f") + 1] == "f32le"
+    assert command[command.index("-ar") + 1] == "16000"
+    assert command[command.index("-ac") + 1] == "1"
+    assert command[-1] == "-"
+
+
+@patch("subprocess.run")
+def test_decode_audio_memory_maps_output_file(mock_run: MagicMock) -> None:
+    """With mmap_path the samples are written to disk and memory-mapped."""
+    samples = np.arange(8, dtype=np.float32)
+
+    def fake_ffmpeg(command: list[str], **kwargs: object) -> MagicMock:
+        samples.tofile(command[-1])
+        return MagicMock(stdout=b"")
+
+    mock_run.side_effect = fake_ffmpeg
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pcm_file = os.path.join(temp_dir, "audio.f32")
+        audio = decode_audio("ytw_audio_abc.m4a", mmap_path=pcm_file)
+
+        assert isinstance(audio, np.memmap)
+        np.testing.assert_array_equal(audio, samples)
+        del audio
+
+
+@patch("subprocess.run")
+def test_decode_audio_reports_ffmpeg_errors(mock_run: MagicMock) -> None:
+    """A failed decode raises RuntimeError with ffmpeg's message."""
+    mock_run.side_effect = subprocess.CalledProcessError(
+        1, ["ffmpeg"], stderr=b"Invalid data found when processing input"
+    )
+
+    with pytest.raises(RuntimeError, match="Invalid data found"):
+        decode_audio("broken.webm")
+
+
+def test_open_pcm_handles_empty_file() -> None:
+    """An empty PCM file maps to an empty array instead of failing."""
+    with tempfile.NamedTemporaryFile(suffix=".f32") as tmp:
+        assert open_pcm(tmp.name).size == 0
@@ -0,0 +1,118 @@
+"""Tests for the pluggable inference backends."""
+
+import sys
+import types
+from collections.abc import Generator, Iterator
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from yt_whisper.backends import get_backend, resolve_precision
+from yt_whisper.cli import cli
+from yt_whisper.lib import run_transcription
+from yt_whisper.models import ModelCache, clear_model_cache
+
+
+class FakeWhisperModel:
+    """Stand-in for faster_whisper.WhisperModel."""
+
+    loaded: list[tuple[str, str, str]] = []
+
+    def __init__(self, model_name: str, device: str, compute_type: str) -> None:
+        self.loaded.append((model_name, device, compute_type))
+
+    def transcribe(
+        self,
+        audio: Any,  # noqa: ANN401
+        language: str | None = None,
+    ) -> tuple[Iterator[Any], Any]:
+        segments = (
+            types.SimpleNamespace(
+                start=start,
+                end=start + 2.0,
+                text=text,
+                tokens=(1, 2),
+                avg_logprob=-0.2,
+                no_speech_prob=0.01,
+            )
+            for start, text in ((0.0, " Hello"), (2.0, " world."))
+        )
+        return segments, types.SimpleNamespace(language=language or "en")
+
+
+@pytest.fixture
+def faster_whisper() -> Generator[None, None, None]:
+    """Install a fake faster_whisper module."""
+    FakeWhisperModel.loaded = []
+    module = types.ModuleType("faster_whisper")
+    module.WhisperModel = FakeWhisperModel  # type: ignore[attr-defined]
+    clear_model_cache()
+    with patch.dict(sys.modules, {"faster_whisper": module}):
+        yield
+    clear_model_cache()
+
+
+def test_faster_whisper_results_match_openai_whisper_shape(
+    faster_whisper: None,
+) -> None:
+    """faster-whisper output is converted to text, segments and language."""
+    result = run_transcription("audio.mp3", model_name="tiny", backend="faster-whisper")
+
+    assert FakeWhisperModel.loaded == [("tiny", "auto", "int8")]
+    assert result["text"] == " Hello world."
+    assert result["language"] == "en"
+    assert result["segments"][1] == {
+        "start": 2.0,
+        "end": 4.0,
+        "text": "world.",
+        "tokens": [1, 2],
+        "avg_logprob": -0.2,
+        "no_speech_prob": 0.01,
+    }
+
+
+def test_model_cache_key_includes_backend(faster_whisper: None) -> None:
+    """The same model name is loaded once per backend and compute type."""
+    cache = ModelCache(max_models=3)
+    with patch("whisper.load_model", return_value="openai"):
+        assert cache.get("base") == "openai"
+    first = cache.get("base", precision="int8", backend="faster-whisper")
+    again = cache.get("base", precision="int8", backend="faster-whisper")
+    cache.get("base", precision="int8_float16", backend="faster-whisper")
+
+    assert first is again
+    assert cache.stats()["misses"] == 3
+
+
+def test_missing_faster_whisper_is_reported() -> None:
+    """Selecting faster-whisper without the package explains how to install it."""
+    with (
+        patch.dict(sys.modules, {"faster_whisper": None}),
+        pytest.raises(RuntimeError, match=r"yt-whisper\[faster-whisper\]"),
+    ):
+        get_backend("faster-whisper").load("base", None, "int8")
+
+
+def test_resolve_precision() -> None:
+    """Each backend has its own default and set of compute types."""
+    assert resolve_precision("openai-whisper", None) == "fp32"
+    assert resolve_precision("faster-whisper", None) == "int8"
+    with pytest.raises(ValueError, match="does not support"):
+        resolve_precision("openai-whisper", "int8")
+    with pytest.raises(ValueError, match="Unknown backend"):
+        resolve_precision("whisper.cpp", None)
+
+
+def test_cli_rejects_unsupported_compute_type() -> None:
+    """An unsupported compute type is a usage error before anything runs."""
+    runner = CliRunner()
+    with patch("yt_whisper.cli.is_ffmpeg_available", return_value=True):
+        result = runner.invoke(
+            cli,
+            ["transcribe", "https://youtu.be/abc", "--compute-type", "int8"],
+        )
+
+    assert result.exit_code == 2
+    assert "does not support compute type int8" in result.output
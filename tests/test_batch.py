@@ -0,0 +1,119 @@
+"""Tests for the batch transcription pipeline."""
+
+import io
+from unittest.mock import MagicMock, patch
+
+from click.testing import CliRunner
+
+from yt_whisper.batch import read_urls, transcribe_batch
+from yt_whisper.cli import cli
+from yt_whisper.db import get_transcript
+
+
+def test_read_urls_skips_blank_lines_and_comments() -> None:
+    """Only non-empty, non-comment lines are returned."""
+    stream = io.StringIO("# urls\nhttps://youtu.be/a\n\n  https://youtu.be/b  \n")
+    assert read_urls(stream) == ["https://youtu.be/a", "https://youtu.be/b"]
+
+
+def test_transcribe_batch_saves_results(fake_download: MagicMock, db_path: str) -> None:
+    """Every valid URL is downloaded, transcribed and saved once."""
+    model = MagicMock()
+    model.transcribe.return_value = {"text": "Batch transcription."}
+
+    urls = [
+        "https://www.youtube.com/watch?v=aaa",
+        "https://youtu.be/bbb",
+        "https://youtu.be/aaa",
+        "https://example.com/nothing",
+    ]
+    with patch("yt_whisper.lib.get_model", return_value=model):
+        batch = transcribe_batch(urls, download_workers=2, db_path=db_path)
+
+    summary = batch["summary"]
+    assert summary["videos"] == 2
+    assert summary["failed"] == 1
+    assert summary["audio_seconds"] == 120
+    assert summary["videos_per_hour"] > 0
+    assert fake_download.call_count == 2
+    assert get_transcript("bbb", db_path)["transcription"] == "Batch transcription."
+
+
+def test_transcribe_batch_skips_existing(
+    fake_download: MagicMock, db_path: str
+) -> None:
+    """Videos already in the database are not downloaded again."""
+    model = MagicMock()
+    model.transcribe.return_value = {"text": "Batch transcription."}
+
+    with patch("yt_whisper.lib.get_model", return_value=model):
+        transcribe_batch(["https://youtu.be/aaa"], db_path=db_path)
+        batch = transcribe_batch(["https://youtu.be/aaa"], db_path=db_path)
+
+    assert batch["skipped"] == ["aaa"]
+    assert fake_download.call_count == 1
+
+
+def test_transcribe_batch_match_model(fake_download: MagicMock, db_path: str) -> None:
+    """Videos done with another model are transcribed again unless any counts."""
+    model = MagicMock()
+    model.transcribe.return_value = {"text": "Batch transcription."}
+
+    with patch("yt_whisper.lib.get_model", return_value=model):
+        transcribe_batch(["https://youtu.be/aaa"], model_name="tiny", db_path=db_path)
+        same = transcribe_batch(
+            ["https://youtu.be/aaa"], model_name="tiny", db_path=db_path
+        )
+        any_model = transcribe_batch(
+            ["https://youtu.be/aaa"],
+            model_name="small",
+            db_path=db_path,
+            match_model=False,
+        )
+        other = transcribe_batch(
+            ["https://youtu.be/aaa"], model_name="small", db_path=db_path
+        )
+
+    assert same["skipped"] == ["aaa"]
+    assert any_model["skipped"] == ["aaa"]
+    # One video at a time, so each result has its own peak memory
+    assert other["results"][0]["peak_rss"] <= other["summary"]["peak_rss"]
+    assert other["skipped"] == []
+    assert fake_download.call_count == 2
+    assert get_transcript("aaa", db_path)["model"] == "small"
+
+
+@patch("yt_whisper.cli.is_ffmpeg_available", return_value=True)
+@patch("yt_whisper.cli.transcribe_batch")
+def test_transcribe_batch_command_reads_stdin(
+    mock_transcribe_batch: MagicMock, mock_ffmpeg: MagicMock
+) -> None:
+    """URLs are read from stdin and a throughput summary is printed."""
+    mock_transcribe_batch.return_value = {
+        "results": [],
+        "failures": [],
+        "skipped": [],
+        "summary": {
+            "videos": 2,
+            "failed": 0,
+            "skipped": 0,
+            "wall_time": 60.0,
+            "audio_seconds": 600.0,
+            "videos_per_hour": 120.0,
+            "audio_seconds_per_second": 10.0,
+        },
+    }
+
+    runner = CliRunner()
+    result = runner.invoke(
+        cli,
+        ["transcribe-batch", "--download-workers", "3"],
+        input="https://youtu.be/aaa\nhttps://youtu.be/bbb\n",
+    )
+
+    assert result.exit_code == 0
+    args, kwargs = mock_transcribe_batch.call_args
+    assert args[0] == ["https://youtu.be/aaa", "https://youtu.be/bbb"]
+    assert kwargs["download_workers"] == 3
+    assert "120.0 videos/hour" in result.output
+    assert "10.00 audio-seconds per wall-second" in result.output
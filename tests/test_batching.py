@@ -0,0 +1,150 @@
+"""Tests for dynamic batching of windows across videos."""
+
+import os
+import tempfile
+import threading
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from yt_whisper.audio import SAMPLE_RATE
+from yt_whisper.backends import OpenAIWhisperBackend, timestamped_segments
+from yt_whisper.batch import transcribe_batch
+from yt_whisper.batching import BatchScheduler, plan_windows
+from yt_whisper.db import get_transcript
+
+
+def video_audio(level: float, seconds: float) -> np.ndarray:
+    """Constant audio whose level identifies the video it belongs to."""
+    return np.full(int(seconds * SAMPLE_RATE), level, dtype=np.float32)
+
+
+def fake_windows(
+    model: Any,  # noqa: ANN401
+    windows: list[np.ndarray],
+    languages: list[str | None],
+    precision: str,
+) -> list[dict[str, Any]]:
+    """One segment per window, naming the video and the window length."""
+    results = []
+    for window in windows:
+        seconds = len(window) / SAMPLE_RATE
+        text = f" v{round(float(window[0]) * 10)}"
+        results.append(
+            {
+                "text": text,
+                "segments": [{"start": 0.0, "end": seconds, "text": text}],
+                "language": "en",
+            }
+        )
+    return results
+
+
+def test_plan_windows_fit_whisper() -> None:
+    """Windows cover the audio without gaps and never exceed 30 seconds."""
+    samples = np.random.default_rng(0).normal(0, 0.1, 200 * SAMPLE_RATE)
+
+    windows = plan_windows(samples.astype(np.float32))
+
+    assert windows[0][0] == 0
+    assert windows[-1][1] == len(samples)
+    assert all(a[1] == b[0] for a, b in zip(windows, windows[1:], strict=False))
+    assert all(last - first <= 30 * SAMPLE_RATE for first, last in windows)
+    assert plan_windows(np.zeros(0, dtype=np.float32)) == []
+
+
+def test_timestamped_segments() -> None:
+    """Timestamp tokens delimit segments; an unclosed one ends the window."""
+    begin = 1000
+    tokens = [begin, 1, 2, begin + 100, begin + 100, 3, begin + 250, 4]
+
+    segments = timestamped_segments(
+        tokens, begin, lambda ids: " " + "".join(map(str, ids)), 8.0
+    )
+
+    assert [(s["start"], s["end"], s["text"]) for s in segments] == [
+        (0.0, 2.0, " 12"),
+        (2.0, 5.0, " 3"),
+        (5.0, 8.0, " 4"),
+    ]
+
+
+def test_windows_from_several_videos_share_batches() -> None:
+    """Windows are batched across videos and routed back with their offsets."""
+    audio = {1: video_audio(0.1, 20), 2: video_audio(0.2, 50), 3: video_audio(0.3, 70)}
+    results: dict[int, dict] = {}
+    sizes: list[int] = []
+
+    def record(*args: Any) -> list[dict[str, Any]]:  # noqa: ANN401
+        sizes.append(len(args[1]))
+        return fake_windows(*args)
+
+    with (
+        patch("yt_whisper.batching.get_model"),
+        patch.object(OpenAIWhisperBackend, "transcribe_windows", side_effect=record),
+        BatchScheduler(batch_size=8, max_wait=0.5) as scheduler,
+    ):
+        threads = [
+            threading.Thread(
+                target=lambda k=k: results.update({k: scheduler.transcribe(audio[k])})
+            )
+            for k in audio
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    windows = sum(len(plan_windows(samples)) for samples in audio.values())
+    assert sum(sizes) == windows
+    assert max(sizes) > 1
+    assert scheduler.stats()["mean_batch_size"] > 1
+    for k, samples in audio.items():
+        segments = results[k]["segments"]
+        assert {segment["text"] for segment in segments} == {f"v{k}"}
+        assert segments[0]["start"] == 0.0
+        assert segments[-1]["end"] == len(samples) / SAMPLE_RATE
+        assert all(
+            a["end"] == b["start"] for a, b in zip(segments, segments[1:], strict=False)
+        )
+        assert results[k]["language"] == "en"
+
+
+def test_failed_batch_fails_its_videos() -> None:
+    """An inference error reaches every video in the batch."""
+    with (
+        patch("yt_whisper.batching.get_model"),
+        patch.object(
+            OpenAIWhisperBackend,
+            "transcribe_windows",
+            side_effect=RuntimeError("out of memory"),
+        ),
+        BatchScheduler() as scheduler,
+    ):
+        future = scheduler.submit(video_audio(0.1, 10))
+        assert isinstance(future.exception(timeout=5), RuntimeError)
+
+
+def test_transcribe_batch_with_batching(fake_download: MagicMock) -> None:
+    """The batch pipeline sends every video through one shared scheduler."""
+    with (
+        tempfile.TemporaryDirectory() as temp_dir,
+        patch("yt_whisper.batching.decode_audio", return_value=video_audio(0.1, 40)),
+        patch("yt_whisper.batching.get_model") as mock_get_model,
+        patch.object(
+            OpenAIWhisperBackend, "transcribe_windows", side_effect=fake_windows
+        ),
+    ):
+        db_path = os.path.join(temp_dir, "batch.db")
+        batch = transcribe_batch(
+            ["https://youtu.be/aaa", "https://youtu.be/bbb", "https://youtu.be/ccc"],
+            db_path=db_path,
+            batch_size=4,
+        )
+        transcript = get_transcript("bbb", db_path)
+
+    assert batch["summary"]["videos"] == 3
+    assert batch["summary"]["mean_batch_size"] >= 1
+    assert {call.args[0] for call in mock_get_model.call_args_list} == {"base"}
+    assert transcript["transcription"] == " v1 v1"
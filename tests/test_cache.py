@@ -0,0 +1,144 @@
+"""Tests for the on-disk audio cache."""
+
+import json
+import os
+import tempfile
+import threading
+from collections.abc import Generator
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from click.testing import CliRunner
+
+from yt_whisper.cache import AudioCache, format_size, parse_size
+from yt_whisper.cli import cli
+from yt_whisper.lib import fetch_audio
+
+
+@pytest.fixture
+def cache_dir() -> Generator[Path, None, None]:
+    """An empty cache directory."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield Path(temp_dir) / "cache"
+
+
+@pytest.fixture
+def download_dir() -> Generator[Path, None, None]:
+    """A directory downloads are written to."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield Path(temp_dir)
+
+
+def write_download(
+    directory: Path, youtube_id: str, size: int = 100
+) -> tuple[str, str]:
+    """Create a fake downloaded audio file and info JSON."""
+    audio_file = directory / f"ytw_audio_{youtube_id}.mp3"
+    metadata_file = directory / f"ytw_audio_{youtube_id}.info.json"
+    audio_file.write_bytes(os.urandom(size))
+    metadata_file.write_text(json.dumps({"id": youtube_id}))
+    return str(audio_file), str(metadata_file)
+
+
+def test_parse_and_format_size() -> None:
+    """Human readable sizes round-trip through bytes."""
+    assert parse_size("500M") == 500 * 1024**2
+    assert parse_size("1.5g") == int(1.5 * 1024**3)
+    assert parse_size("2048") == 2048
+    assert format_size(1536) == "1.5K"
+    with pytest.raises(ValueError):
+        parse_size("lots")
+
+
+def test_store_and_lookup(cache_dir: Path, download_dir: Path) -> None:
+    """Stored audio is found again under the same ID and format only."""
+    cache = AudioCache(cache_dir)
+    audio_file, metadata_file = write_download(download_dir, "abc")
+    content = Path(audio_file).read_bytes()
+
+    cached_audio, cached_metadata = cache.store("abc", "mp3", audio_file, metadata_file)
+
+    assert not os.path.exists(audio_file)
+    assert cache.lookup("abc", "mp3") == (cached_audio, cached_metadata)
+    assert Path(cached_audio).read_bytes() == content
+    assert cache.lookup("abc", "native") is None
+    assert cache.stats()["entries"] == 1
+
+
+def test_lookup_discards_corrupt_entry(cache_dir: Path, download_dir: Path) -> None:
+    """An audio file that no longer matches its checksum is not reused."""
+    cache = AudioCache(cache_dir)
+    cached_audio, _ = cache.store("abc", "mp3", *write_download(download_dir, "abc"))
+
+    Path(cached_audio).write_bytes(b"truncated")
+
+    assert cache.lookup("abc", "mp3") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_store_evicts_least_recently_used(cache_dir: Path, download_dir: Path) -> None:
+    """The cache stays under its size limit by dropping the oldest entries."""
+    cache = AudioCache(cache_dir, max_bytes=2500)
+    for youtube_id in ("one", "two"):
+        cache.store(youtube_id, "mp3", *write_download(download_dir, youtube_id, 1000))
+
+    # Touch "one" so that "two" becomes the least recently used entry
+    assert cache.lookup("one", "mp3")
+    cache.store("three", "mp3", *write_download(download_dir, "three", 1000))
+
+    assert cache.lookup("two", "mp3") is None
+    assert cache.lookup("one", "mp3")
+    assert cache.lookup("three", "mp3")
+
+
+@patch("yt_whisper.lib.download_audio")
+def test_fetch_audio_downloads_once(
+    mock_download: MagicMock, cache_dir: Path, download_dir: Path
+) -> None:
+    """A second fetch with the cache enabled does not download again."""
+    mock_download.side_effect = lambda youtube_id, *args, **kwargs: write_download(
+        download_dir, youtube_id
+    )
+    cache = AudioCache(cache_dir)
+
+    first = fetch_audio("abc", str(download_dir), cache=cache)
+    second = fetch_audio("abc", str(download_dir), cache=cache)
+
+    assert first == second
+    mock_download.assert_called_once()
+
+
+def test_cache_commands(cache_dir: Path, download_dir: Path) -> None:
+    """The cache CLI group reports, prunes and clears entries."""
+    cache = AudioCache(cache_dir)
+    for youtube_id in ("one", "two"):
+        cache.store(youtube_id, "mp3", *write_download(download_dir, youtube_id))
+
+    runner = CliRunner()
+    with patch("yt_whisper.cache.get_audio_cache_dir", return_value=cache_dir):
+        stats = runner.invoke(cli, ["cache", "stats"])
+        prune = runner.invoke(cli, ["cache", "prune", "--max-size", "150"])
+        clear = runner.invoke(cli, ["cache", "clear", "--yes"])
+
+    assert "Entries: 2" in stats.output
+    assert "Removed 1 cache entries." in prune.output
+    assert "Removed 1 cache entries." in clear.output
+
+
+def test_instances_share_the_cache_lock(cache_dir: Path, download_dir: Path) -> None:
+    """Pruning through one instance waits for a lookup through another."""
+    cache = AudioCache(cache_dir)
+    cache.store("abc", "mp3", *write_download(download_dir, "abc"))
+    other = AudioCache(cache_dir, max_bytes=0)
+
+    with cache._lock():
+        pruner = threading.Thread(target=other.prune)
+        pruner.start()
+        pruner.join(0.2)
+        assert pruner.is_alive()
+        assert (cache_dir / "abc-mp3").exists()
+    pruner.join(5)
+
+    assert not (cache_dir / "abc-mp3").exists()
+    assert (cache_dir / ".lock").exists()
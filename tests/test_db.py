@@ -0,0 +1,622 @@
+"""Tests for the database layer."""
+
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+from collections.abc import Callable
+from multiprocessing.synchronize import Barrier
+
+import pytest
+from click.testing import CliRunner
+
+from yt_whisper.cli import cli
+from yt_whisper.db import (
+    delete_video,
+    existing_ids,
+    get_connection,
+    get_segments,
+    get_transcript,
+    get_versions,
+    get_video_info,
+    init_db,
+    iter_transcripts,
+    list_transcripts,
+    model_rank,
+    save_many,
+    save_to_db,
+    search_segments,
+    search_transcripts,
+    transaction,
+)
+
+
+def test_search_matches_transcription(
+    db_path: str, make_video: Callable[..., dict]
+) -> None:
+    """Words that only occur in the transcript are found."""
+    save_to_db(make_video("a1", transcription="we talk about glaciers"), db_path)
+    save_to_db(make_video("b2", transcription="nothing relevant"), db_path)
+
+    rows = search_transcripts("glaciers", db_path=db_path)
+
+    assert [row["id"] for row in rows] == ["a1"]
+    assert "[glaciers]" in rows[0]["snippet"]
+
+
+def test_search_ranks_title_matches_first(
+    db_path: str, make_video: Callable[..., dict]
+) -> None:
+    """A title match outranks a passing mention in the transcript."""
+    save_to_db(make_video("t1", transcription="a word on climate"), db_path)
+    save_to_db(make_video("t2", title="Climate explained"), db_path)
+
+    rows = search_transcripts("climate", db_path=db_path)
+
+    assert [row["id"] for row in rows] == ["t2", "t1"]
+
+
+def test_search_index_follows_updates_and_deletes(
+    db_path: str, make_video: Callable[..., dict]
+) -> None:
+    """The triggers keep the index in sync with the videos table."""
+    save_to_db(make_video("u1", transcription="old words"), db_path)
+    save_to_db(make_video("u1", transcription="new words"), db_path)
+
+    assert search_transcripts("old", db_path=db_path) == []
+    assert len(search_transcripts("new", db_path=db_path)) == 1
+
+    delete_video("u1", db_path)
+    assert search_transcripts("new", db_path=db_path) == []
+
+
+def test_search_paging(db_path: str, make_video: Callable[..., dict]) -> None:
+    """Limit and offset page through the ranked matches."""
+    for i in range(5):
+        save_to_db(make_video(f"p{i}", transcription="shared topic"), db_path)
+
+    first = search_transcripts("topic", limit=2, db_path=db_path)
+    rest = search_transcripts("topic", limit=10, offset=2, db_path=db_path)
+
+    assert len(first) == 2
+    assert len(rest) == 3
+    assert not {row["id"] for row in first} & {row["id"] for row in rest}
+
+
+def test_search_treats_query_syntax_literally(
+    db_path: str, make_video: Callable[..., dict]
+) -> None:
+    """Quotes and operators in the query do not raise FTS syntax errors."""
+    save_to_db(make_video("q1", title='The "AND" operator'), db_path)
+
+    assert len(search_transcripts('"AND" -', db_path=db_path)) == 1
+
+
+def test_init_db_backfills_existing_database(db_path: str) -> None:
+    """Rows written before the index existed become searchable."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+    CREATE TABLE videos (
+        id TEXT PRIMARY KEY, url TEXT NOT NULL, title TEXT NOT NULL,
+        channel TEXT, author TEXT, upload_date TEXT, duration INTEGER,
+        description TEXT, transcription TEXT NOT NULL, metadata TEXT,
+        created_at TEXT NOT NULL
+    )
+    """)
+    conn.execute(
+        "INSERT INTO videos VALUES "
+        "('old1', 'u', 'Legacy', '', '', '', 0, '', 'legacy words', '{}', 'now')"
+    )
+    conn.commit()
+    conn.close()
+
+    init_db(db_path)
+
+    assert [row["id"] for row in search_transcripts("legacy", db_path=db_path)] == [
+        "old1"
+    ]
+
+
+def test_init_db_adds_model_columns(
+    db_path: str, make_video: Callable[..., dict]
+) -> None:
+    """Databases created before the model and language columns are migrated."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+    CREATE TABLE videos (
+        id TEXT PRIMARY KEY, url TEXT NOT NULL, title TEXT NOT NULL,
+        channel TEXT, author TEXT, upload_date TEXT, duration INTEGER,
+        description TEXT, transcription TEXT NOT NULL, metadata TEXT,
+        created_at TEXT NOT NULL
+    )
+    """)
+    conn.commit()
+    conn.close()
+
+    save_to_db(make_video("new1", model="base", language="en"), db_path)
+
+    assert get_video_info("new1", db_path)["model"] == "base"
+
+
+def _open_database(db_path: str, barrier: Barrier) -> None:
+    """Open the database once every process is ready to."""
+    barrier.wait()
+    get_connection(db_path)
+
+
+def open_concurrently(db_path: str, processes: int = 6) -> list[int | None]:
+    """Open a database from several processes at once and return exit codes."""
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(processes)
+    workers = [
+        context.Process(target=_open_database, args=(db_path, barrier))
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(60)
+    return [worker.exitcode for worker in workers]
+
+
+def test_processes_migrate_a_legacy_database_together(db_path: str) -> None:
+    """Columns are added once when several processes open an old database."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+    CREATE TABLE videos (
+        id TEXT PRIMARY KEY, url TEXT NOT NULL, title TEXT NOT NULL,
+        channel TEXT, author TEXT, upload_date TEXT, duration INTEGER,
+        description TEXT, transcription TEXT NOT NULL, metadata TEXT,
+        created_at TEXT NOT NULL
+    )
+    """)
+    conn.commit()
+    conn.close()
+
+    assert open_concurrently(db_path) == [0] * 6
+
+    conn = sqlite3.connect(db_path)
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(videos)")]
+    conn.close()
+    assert columns.count("model") == 1
+
+
+def test_processes_create_a_new_database_together(db_path: str) -> None:
+    """Tables, indexes and triggers are created once by concurrent processes."""
+    assert open_concurrently(db_path) == [0] * 6
+
+    conn = sqlite3.connect(db_path)
+    triggers = {
+        row[0]
+        for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+    }
+    conn.close()
+    assert {"videos_fts_insert", "segments_fts_delete"} <= triggers
+
+
+def test_existing_ids_matches_model_and_language(
+    db_path: str, make_video: Callable[..., dict]
+) -> None:
+    """Existence checks run over many IDs and can require the same model."""
+    assert existing_ids(["a1"], db_path=db_path) == set()
+
+    save_many(
+        [
+            make_video("a1", model="base", language="en"),
+            make_video("a2", model="small", language="de"),
+        ],
+        db_path,
+    )
+    ids = ["a1", "a2", "zz"] + [f"x{i}" for i in range(1200)]
+
+    assert existing_ids(ids, db_path=db_path) == {"a1", "a2"}
+    assert existing_ids(ids, "base", db_path=db_path) == {"a1"}
+    assert existing_ids(ids, "base", "de", db_path=db_path) == set()
+
+
+def test_keyset_pagination_walks_every_row_once(
+    db_path: str, make_video: Callable[..., dict]
+) -> None:
+    """Pages continue after their cursor, including rows with equal timestamps."""
+    save_many(
+        [
+            make_video(f"v{i:02d}", created_at=f"2024-05-{1 + i // 3:02d}T12:00:00Z")
+            for i in range(10)
+        ],
+        db_path,
+    )
+
+    seen, after = [], None
+    while page := list_transcripts(4, db_path, after=after):
+        seen.extend(row["id"] for row in page)
+        after = page[-1]["cursor"]
+
+    assert seen == [row["id"] for row in iter_transcripts(db_path)]
+    assert sorted(seen) == [f"v{i:02d}" for i in range(10)]
+    assert seen[0] == "v09"
+
+    plan = get_connection(db_path).execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM videos WHERE (created_at, id) < (?, ?) "
+        "ORDER BY created_at DESC, id DESC",
+        ("2024-05-03T12:00:00Z", "v07"),
+    )
+    assert "idx_videos_created_at" in " ".join(row[3] for row in plan)
+
+
+def test_list_command_streams_jsonl(
+    db_path: str, make_video: Callable[..., dict]
+) -> None:
+    """--jsonl writes one object per row and resumes after a cursor."""
+    save_many(
+        [make_video(f"v{i}", created_at=f"2024-05-0{i}T12") for i in range(1, 4)],
+        db_path,
+    )
+    runner = CliRunner()
+
+    full = runner.invoke(cli, ["list", "--jsonl", "--db-path", db_path])
+    rows = [json.loads(line) for line in full.output.splitlines()]
+    resumed = runner.invoke(
+        cli, ["list", "--jsonl", "--db-path", db_path, "--after", rows[0]["cursor"]]
+    )
+    bad = runner.invoke(cli, ["list", "--db-path", db_path, "--after", "nope"])
+
+    assert [row["id"] for row in rows] == ["v3", "v2", "v1"]
+    assert [json.loads(line)["id"] for line in resumed.output.splitlines()] == [
+        "v2",
+        "v1",
+    ]
+    assert bad.exit_code == 2
+    assert "Invalid cursor" in bad.output
+
+
+def test_search_command(db_path: str, make_video: Callable[..., dict]) -> None:
+    """The CLI prints ranked matches with a snippet."""
+    save_to_db(make_video("c1", transcription="rivers and lakes"), db_path)
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["search", "rivers", "--db-path", db_path])
+
+    assert result.exit_code == 0
+    assert "Found 1 matches" in result.output
+    assert "rivers and lakes" in result.output
+
+
+def test_get_connection_waits_for_locks(db_path: str) -> None:
+    """The pragmas keep the lock wait of the connection, not a shorter one."""
+    conn = get_connection(db_path)
+
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 30000
+
+
+def test_get_connection_is_reused_and_uses_wal(db_path: str) -> None:
+    """The same thread gets the same tuned connection back."""
+    conn = get_connection(db_path)
+
+    assert get_connection(db_path) is conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_get_connection_reconnects_after_file_is_replaced(
+    db_path: str, make_video: Callable[..., dict]
+) -> None:
+    """A deleted and recreated database file gets a fresh connection and schema."""
+    save_to_db(make_video("r1"), db_path)
+    old = get_connection(db_path)
+
+    os.unlink(db_path)
+    save_to_db(make_video("r2"), db_path)
+
+    assert get_connection(db_path) is not old
+    assert get_transcript("r1", db_path) is None
+    assert get_transcript("r2", db_path)["id"] == "r2"
+
+
+def test_readers_are_not_blocked_by_open_write_transaction(
+    db_path: str, make_video: Callable[..., dict]
+) -> None:
+    """WAL mode lets another thread read while a write is uncommitted."""
+    save_to_db(make_video("w1"), db_path)
+    seen = []
+
+    with transaction(db_path) as conn:
+        conn.execute("UPDATE videos SET title = 'Changed' WHERE id = 'w1'")
+        reader = threading.Thread(
+            target=lambda: seen.append(get_transcript("w1", db_path)["title"])
+        )
+        reader.start()
+        reader.join(timeout=5)
+
+    assert seen == ["Video w1"]
+    assert get_transcript("w1", db_path)["title"] == "Changed"
+
+
+def test_transaction_rolls_back_on_error(
+    db_path: str, make_video: Callable[..., dict]
+) -> None:
+    """Statements in a failed transaction are not committed."""
+    save_to_db(make_video("x1"), db_path)
+
+    with pytest.raises(sqlite3.IntegrityError):
+        with transaction(db_path) as conn:
+            conn.execute("DELETE FROM videos WHERE id = 'x1'")
+            conn.execute("INSERT INTO videos (id) VALUES ('x2')")
+
+    assert get_transcript("x1", db_path) is not None
+
+
+def test_save_many_upserts_in_batches(
+    db_path: str, make_video: Callable[..., dict]
+) -> None:
+    """Records are inserted or updated, one transaction per batch."""
+    save_to_db(make_video("m0", title="Before"), db_path)
+    records = [make_video(f"m{i}") for i in range(5)]
+
+    conn = get_connection(db_path)
+    commits = []
+    conn.set_trace_callback(
+        lambda sql: commits.append(sql) if sql.strip() == "COMMIT" else None
+    )
+    try:
+        saved = save_many(records, db_path, batch_size=2)
+    finally:
+        conn.set_trace_callback(None)
+
+    assert saved == 5
+    assert len(commits) == 3
+    assert get_transcript("m0", db_path)["title"] == "Video m0"
+    assert get_transcript("m4", db_path) is not None
+
+
+def make_segments(*texts: str, length: float = 10.0) -> list[dict]:
+    """Build consecutive segments of the given length."""
+    return [
+        {
+            "start": i * length,
+            "end": (i + 1) * length,
+            "text": text,
+            "tokens": [1, 2],
+            "avg_logprob": -0.2,
+            "no_speech_prob": 0.01,
+        }
+        for i, text in enumerate(texts)
+    ]
+
+
+def test_get_segments_reads_only_the_time_range(
+    db_path: str, make_video: Callable[..., dict]
+) -> None:
+    """Segments overlapping the requested range are returned in order."""
+    segments = make_segments("zero", "ten", "twenty", "thirty", "forty")
+    save_to_db(make_video("s1", segments=segments), db_path)
+
+    assert [s["text"] for s in get_segments("s1", 15, 32, db_path)] == [
+        "ten",
+        "twenty",
+        "thirty",
+    ]
+    assert [s["text"] for s in get_segments("s1", end=10, db_path=db_path)] == ["zero"]
+    assert len(get_segments("s1", db_path=db_path)) == 5
+
+
+def test_segments_are_replaced_and_deleted_with_video(
+    db_path: str, make_video: Callable[..., dict]
+) -> None:
+    """Re-saving a video replaces its segments; deleting it removes them."""
+    save_to_db(make_video("s2", segments=make_segments("a", "b", "c")), db_path)
+    save_to_db(make_video("s2", segments=make_segments("d")), db_path)
+
+    assert [s["text"] for s in get_segments("s2", db_path=db_path)] == ["d"]
+
+    delete_video("s2", db_path)
+    assert get_segments("s2", db_path=db_path) == []
+    assert search_segments("d", db_path=db_path) == []
+
+
+def test_search_segments_finds_the_moment(
+    db_path: str, make_video: Callable[..., dict]
+) -> None:
+    """The segment containing the words is returned with its timestamps."""
+    segments = make_segments("intro music", "the glacier is melting", "outro")
+    save_to_db(make_video("s3", segments=segments), db_path)
+
+    moments = search_segments("glacier melting", db_path=db_path)
+
+    assert len(moments) == 1
+    assert moments[0]["video_id"] == "s3"
+    assert moments[0]["start"] == 10.0
+    assert moments[0]["end"] == 20.0
+
+
+def test_get_command_time_range(db_path: str, make_video: Callable[..., dict]) -> None:
+    """'get --from/--to' prints only the matching timestamped segments."""
+    segments = make_segments("zero", "ten", "twenty", "thirty")
+    save_to_db(make_video("s4", segments=segments), db_path)
+
+    runner = CliRunner()
+    result = runner.invoke(
+        cli, ["get", "s4", "--db-path", db_path, "--from", "0:12", "--to", "25"]
+    )
+
+    assert result.exit_code == 0
+    assert "[00:00:10 - 00:00:20] ten" in result.output
+    assert "[00:00:20 - 00:00:30] twenty" in result.output
+    assert "zero" not in result.output
+    assert "thirty" not in result.output
+
+
+def test_get_command_rejects_bad_timestamp(db_path: str) -> None:
+    """An unparseable --from value is a usage error."""
+    runner = CliRunner()
+    result = runner.invoke(cli, ["get", "s5", "--db-path", db_path, "--from", "1:xx"])
+
+    assert result.exit_code == 2
+    assert "is not a time" in result.output
+
+
+def test_metadata_is_stored_compressed_and_loaded_on_request(
+    db_path: str, make_video: Callable[..., dict]
+) -> None:
+    """Raw metadata lives in its own table and is only decoded when asked for."""
+    metadata = {"id": "m1", "formats": [{"format_id": str(i)} for i in range(500)]}
+    save_to_db(make_video("m1", metadata=metadata), db_path)
+
+    conn = get_connection(db_path)
+    inline = conn.execute("SELECT metadata FROM videos WHERE id = 'm1'").fetchone()
+    stored = conn.execute("SELECT data FROM video_metadata").fetchone()
+
+    assert inline[0] is None
+    assert len(stored[0]) < len(json.dumps(metadata)) / 4
+    assert get_transcript("m1", db_path)["metadata"] == metadata
+    assert "metadata" not in get_transcript("m1", db_path, include_metadata=False)
+
+    delete_video("m1", db_path)
+    assert conn.execute("SELECT COUNT(*) FROM video_metadata").fetchone()[0] == 0
+
+
+def test_compact_metadata_moves_legacy_rows(
+    db_path: str, make_video: Callable[..., dict]
+) -> None:
+    """Metadata written inline by older versions is moved and still readable."""
+    save_many([make_video(f"v{i}") for i in range(50)], db_path)
+    legacy = {"id": "v0", "description": "x" * 100_000}
+    with transaction(db_path) as conn:
+        conn.execute("DELETE FROM video_metadata")
+        conn.execute("UPDATE videos SET metadata = ?", (json.dumps(legacy),))
+
+    assert get_transcript("v0", db_path)["metadata"] == legacy
+    size_before = os.path.getsize(db_path)
+
+    result = CliRunner().invoke(cli, ["db", "--db-path", db_path, "--vacuum"])
+
+    assert "Compressed metadata of 50 videos." in result.output
+    assert os.path.getsize(db_path) < size_before / 4
+    assert get_transcript("v0", db_path)["metadata"] == legacy
+
+
+def test_model_rank() -> None:
+    """Larger models rank higher, whatever their variant."""
+    assert model_rank("tiny") < model_rank("base.en") < model_rank("small")
+    assert model_rank("medium") < model_rank("large-v3") == model_rank("turbo")
+    assert model_rank("distil-large-v3") == model_rank("large")
+    assert model_rank("custom") == 0
+    # Transcripts from before the model was recorded
+    assert model_rank(None) == model_rank("") == model_rank("base")
+
+
+def test_transcript_versions_keep_the_best(
+    db_path: str, make_video: Callable[..., dict]
+) -> None:
+    """A draft saved after a better transcript is stored but not shown."""
+    large = [{"start": 0.0, "end": 2.0, "text": "Final."}]
+    tiny = [{"start": 0.0, "end": 2.0, "text": "Draft."}]
+    save_to_db(
+        make_video("v1", model="tiny", transcription="Draft.", segments=tiny), db_path
+    )
+    save_to_db(
+        make_video("v1", model="large", transcription="Final.", segments=large),
+        db_path,
+    )
+    save_to_db(
+        make_video("v1", model="tiny", transcription="Draft 2.", segments=tiny),
+        db_path,
+    )
+
+    transcript = get_transcript("v1", db_path)
+    assert transcript["transcription"] == "Final."
+    assert transcript["model"] == "large"
+    assert [s["text"] for s in get_segments("v1", db_path=db_path)] == ["Final."]
+    assert search_transcripts("draft", db_path=db_path) == []
+
+    versions = get_versions("v1", db_path)
+    assert [version["model"] for version in versions] == ["large", "tiny"]
+    assert get_transcript("v1", db_path, model_name="tiny")["transcription"] == (
+        "Draft 2."
+    )
+    assert get_transcript("v1", db_path, model_name="medium") is None
+
+    result = CliRunner().invoke(cli, ["get", "v1", "--db-path", db_path, "--versions"])
+    assert result.exit_code == 0
+    assert "Found 2 transcripts" in result.output
+
+
+def test_existing_ids_matches_versions(
+    db_path: str, make_video: Callable[..., dict]
+) -> None:
+    """Any version counts, and versions from older databases match any options."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+    CREATE TABLE videos (
+        id TEXT PRIMARY KEY, url TEXT NOT NULL, title TEXT NOT NULL,
+        channel TEXT, author TEXT, upload_date TEXT, duration INTEGER,
+        description TEXT, transcription TEXT NOT NULL, metadata TEXT,
+        created_at TEXT NOT NULL, model TEXT, language TEXT
+    )
+    """)
+    conn.execute(
+        "INSERT INTO videos VALUES ('old1', 'u', 'Legacy', '', '', '', 0, '', "
+        "'legacy words', '{}', 'now', 'base', 'en')"
+    )
+    conn.commit()
+    conn.close()
+
+    save_many(
+        [
+            make_video(
+                "new1", model="tiny", backend="faster-whisper", options_hash="a"
+            ),
+            make_video(
+                "new1", model="small", backend="faster-whisper", options_hash="a"
+            ),
+        ],
+        db_path,
+    )
+
+    def match(**version: str) -> set[str]:
+        return existing_ids(["old1", "new1"], db_path=db_path, **version)
+
+    assert match(model_name="base", backend="openai-whisper", options_hash="b") == {
+        "old1"
+    }
+    assert match(model_name="tiny", backend="faster-whisper", options_hash="a") == {
+        "new1"
+    }
+    assert match(model_name="small", options_hash="b") == set()
+    assert get_transcript("new1", db_path)["model"] == "small"
+
+
+def test_legacy_transcripts_without_model(
+    db_path: str, make_video: Callable[..., dict]
+) -> None:
+    """Videos saved before models were recorded count as done and as base."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+    CREATE TABLE videos (
+        id TEXT PRIMARY KEY, url TEXT NOT NULL, title TEXT NOT NULL,
+        channel TEXT, author TEXT, upload_date TEXT, duration INTEGER,
+        description TEXT, transcription TEXT NOT NULL, metadata TEXT,
+        created_at TEXT NOT NULL
+    )
+    """)
+    conn.execute(
+        "INSERT INTO videos VALUES ('old1', 'u', 'Legacy', '', '', '', 0, '', "
+        "'legacy words', '{}', '2024-01-01T00:00:00Z')"
+    )
+    conn.commit()
+    conn.close()
+
+    assert existing_ids(["old1"], "base", None, db_path, "openai-whisper", "a") == {
+        "old1"
+    }
+    assert existing_ids(["old1"], "large", None, db_path) == set()
+    assert existing_ids(["old1"], "base", "de", db_path) == set()
+    legacy = get_transcript("old1", db_path, model_name="base")
+    assert legacy["transcription"] == "legacy words"
+    assert legacy["model"] is None
+    assert get_transcript("old1", db_path, model_name="large") is None
+
+    save_to_db(make_video("old1", model="tiny", transcription="Draft."), db_path)
+    assert get_transcript("old1", db_path)["transcription"] == "legacy words"
+
+    save_to_db(make_video("old1", model="small", transcription="Better."), db_path)
+    assert get_transcript("old1", db_path)["transcription"] == "Better."
@@ -0,0 +1,238 @@
+"""Tests for the persistent job queue."""
+
+import os
+import signal
+import threading
+import time
+from collections.abc import Callable, Generator
+from unittest.mock import MagicMock, patch
+
+import pytest
+from click.testing import CliRunner
+
+from yt_whisper.cli import cli
+from yt_whisper.db import get_connection, get_transcript, save_to_db
+from yt_whisper.jobs import (
+    claim_job,
+    enqueue,
+    heartbeat,
+    job_counts,
+    retry_failed,
+    run_worker,
+    update_job,
+)
+from yt_whisper.lib import version_filter
+
+
+@pytest.fixture
+def fake_pipeline(fake_download: MagicMock) -> Generator[None, None, None]:
+    """Replace downloads and the model with fakes."""
+    model = MagicMock()
+    model.transcribe.return_value = {"text": "Queued transcription."}
+    with patch("yt_whisper.lib.get_model", return_value=model):
+        yield
+
+
+def test_enqueue_skips_duplicates_and_transcribed_videos(db_path: str) -> None:
+    """Videos already queued or in the database are not queued again."""
+    save_to_db(
+        {
+            "id": "old",
+            "url": "https://youtu.be/old",
+            "title": "Old",
+            "transcription": "",
+            "created_at": "2024-05-01T12:00:00Z",
+        },
+        db_path,
+    )
+
+    first = enqueue(["https://youtu.be/aaa", "https://youtu.be/old", "nope"], db_path)
+    second = enqueue(["https://youtu.be/aaa"], db_path)
+
+    assert first == {"queued": ["aaa"], "skipped": ["old"], "invalid": ["nope"]}
+    assert second["skipped"] == ["aaa"]
+    assert job_counts(db_path)["queued"] == 1
+    assert job_counts(db_path)["done"] == 1
+
+
+def test_enqueue_requeues_videos_lacking_the_version(
+    db_path: str, fake_pipeline: None
+) -> None:
+    """A finished video is queued again for a model it has no transcript from."""
+    enqueue(["https://youtu.be/aaa"], db_path)
+    run_worker(db_path, model_name="tiny")
+
+    same = enqueue(
+        ["https://youtu.be/aaa"], db_path, version=version_filter("tiny", None)
+    )
+    better = enqueue(
+        ["https://youtu.be/aaa"], db_path, version=version_filter("large", None)
+    )
+    run_worker(db_path, model_name="large")
+
+    assert same["skipped"] == ["aaa"]
+    assert better["queued"] == ["aaa"]
+    assert get_transcript("aaa", db_path)["model"] == "large"
+
+
+def test_enqueue_requeues_legacy_videos_for_better_models(db_path: str) -> None:
+    """Videos saved before models were recorded are base transcripts."""
+    save_to_db(
+        {
+            "id": "old",
+            "url": "https://youtu.be/old",
+            "title": "Old",
+            "transcription": "Legacy words.",
+            "created_at": "2024-05-01T12:00:00Z",
+        },
+        db_path,
+    )
+
+    base = enqueue(
+        ["https://youtu.be/old"], db_path, version=version_filter("base", None)
+    )
+    large = enqueue(
+        ["https://youtu.be/old"], db_path, version=version_filter("large", None)
+    )
+
+    assert base["skipped"] == ["old"]
+    assert large["queued"] == ["old"]
+
+
+def test_claims_are_exclusive(db_path: str) -> None:
+    """Concurrent workers never claim the same job."""
+    enqueue([f"https://youtu.be/vid{i:03d}" for i in range(40)], db_path)
+    claimed: list[str] = []
+    lock = threading.Lock()
+
+    def claim_all(worker_id: str) -> None:
+        while (job := claim_job(worker_id, db_path)) is not None:
+            with lock:
+                claimed.append(job["video_id"])
+
+    threads = [threading.Thread(target=claim_all, args=(f"w{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claimed) == [f"vid{i:03d}" for i in range(40)]
+
+
+def test_stale_jobs_are_reclaimed(db_path: str) -> None:
+    """A job abandoned mid-way by a dead worker is claimed again."""
+    enqueue(["https://youtu.be/aaa"], db_path)
+    job = claim_job("dead", db_path)
+    update_job(job["id"], "transcribing", db_path=db_path)
+
+    assert claim_job("alive", db_path) is None
+
+    with get_connection(db_path) as conn:
+        conn.execute("UPDATE jobs SET updated_at = '2000-01-01T00:00:00Z'")
+    reclaimed = claim_job("alive", db_path)
+
+    assert reclaimed["video_id"] == "aaa"
+    assert reclaimed["attempts"] == 2
+
+
+def test_abandoned_last_attempt_fails(db_path: str) -> None:
+    """A job whose worker died on its last attempt fails and can be retried."""
+    enqueue(["https://youtu.be/aaa"], db_path)
+    for _ in range(3):
+        claim_job("dead", db_path)
+        with get_connection(db_path) as conn:
+            conn.execute("UPDATE jobs SET updated_at = '2000-01-01T00:00:00Z'")
+
+    assert claim_job("alive", db_path) is None
+    assert job_counts(db_path)["failed"] == 1
+    assert job_counts(db_path)["downloading"] == 0
+    assert retry_failed(db_path) == 1
+
+
+def test_heartbeat_keeps_long_jobs_claimed(db_path: str) -> None:
+    """A job still being worked on is not taken over by another worker."""
+    enqueue(["https://youtu.be/aaa"], db_path)
+    job = claim_job("busy", db_path)
+    with get_connection(db_path) as conn:
+        conn.execute("UPDATE jobs SET updated_at = '2000-01-01T00:00:00Z'")
+
+    with heartbeat(job["id"], "busy", db_path, interval=0.05):
+        time.sleep(0.3)
+        assert claim_job("other", db_path, stale_seconds=60) is None
+
+
+def test_worker_processes_queue_and_retries_failures(
+    db_path: str, fake_pipeline: None
+) -> None:
+    """Good jobs finish, failing ones are retried until they run out of attempts."""
+    enqueue(["https://youtu.be/aaa", "https://youtu.be/bad"], db_path)
+
+    processed = run_worker(db_path, max_attempts=2)
+
+    assert processed == {"done": 1, "failed": 2}
+    assert get_transcript("aaa", db_path)["transcription"] == "Queued transcription."
+    row = get_connection(db_path).execute(
+        "SELECT status, attempts, error FROM jobs WHERE video_id = 'bad'"
+    )
+    assert tuple(row.fetchone()) == ("failed", 2, "Video unavailable")
+
+
+def press_ctrl_c(*args: object) -> None:
+    """Interrupt the worker like Ctrl+C."""
+    raise KeyboardInterrupt
+
+
+def send_sigterm(*args: object) -> None:
+    """Stop the worker like a service manager."""
+    os.kill(os.getpid(), signal.SIGTERM)
+    time.sleep(5)
+
+
+@pytest.mark.parametrize(
+    ("stop", "error"), [(press_ctrl_c, KeyboardInterrupt), (send_sigterm, SystemExit)]
+)
+def test_stopped_worker_requeues_its_job(
+    db_path: str, stop: Callable[..., None], error: type[BaseException]
+) -> None:
+    """A job interrupted by Ctrl+C or SIGTERM is queued again at once."""
+    enqueue(["https://youtu.be/aaa"], db_path)
+
+    with (
+        patch("yt_whisper.jobs._process_job", side_effect=stop),
+        pytest.raises(error),
+    ):
+        run_worker(db_path)
+
+    row = get_connection(db_path).execute(
+        "SELECT status, attempts, worker FROM jobs WHERE video_id = 'aaa'"
+    )
+    assert tuple(row.fetchone()) == ("queued", 0, None)
+    assert signal.getsignal(signal.SIGTERM) is signal.SIG_DFL
+
+
+def test_worker_resumes_unfinished_jobs(db_path: str, fake_pipeline: None) -> None:
+    """A restarted worker only processes jobs that are not done yet."""
+    enqueue([f"https://youtu.be/vid{i}" for i in range(3)], db_path)
+
+    first = run_worker(db_path, max_jobs=2)
+    second = run_worker(db_path)
+
+    assert first["done"] == 2
+    assert second["done"] == 1
+    assert job_counts(db_path)["done"] == 3
+
+
+def test_jobs_and_worker_commands(db_path: str, fake_pipeline: None) -> None:
+    """Videos queued with `jobs add` are processed by `worker`."""
+    runner = CliRunner()
+    urls = "https://youtu.be/aaa\nhttps://youtu.be/bbb\n"
+
+    with patch("yt_whisper.cli.is_ffmpeg_available", return_value=True):
+        added = runner.invoke(cli, ["jobs", "add", "--db-path", db_path], input=urls)
+        worked = runner.invoke(cli, ["worker", "--db-path", db_path])
+        status = runner.invoke(cli, ["jobs", "status", "--db-path", db_path])
+
+    assert "Queued: 2" in added.output
+    assert worked.exit_code == 0, worked.output
+    assert "Processed: 2 done | 0 failed" in worked.output
+    assert "done          2" in status.output
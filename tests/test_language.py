@@ -0,0 +1,121 @@
+"""Tests for language detection and model routing."""
+
+import os
+import tempfile
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from yt_whisper.audio import SAMPLE_RATE
+from yt_whisper.backends import OpenAIWhisperBackend
+from yt_whisper.db import get_video_info, save_to_db
+from yt_whisper.language import (
+    ENGLISH_MODEL,
+    MULTILINGUAL_MODEL,
+    detect_language,
+    sample_windows,
+)
+from yt_whisper.lib import build_result, run_transcription
+
+
+def silence(seconds: float) -> np.ndarray:
+    """Silent audio."""
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.float32)
+
+
+def test_sample_windows_spread_across_audio() -> None:
+    """Windows start at the beginning and end at the end of the audio."""
+    audio = np.arange(300 * SAMPLE_RATE, dtype=np.float32)
+
+    windows = sample_windows(audio, windows=3)
+
+    assert [len(window) for window in windows] == [30 * SAMPLE_RATE] * 3
+    assert windows[0][0] == 0
+    assert windows[-1][-1] == audio[-1]
+    assert len(sample_windows(silence(10), windows=3)) == 1
+
+
+def test_detect_language_averages_windows() -> None:
+    """The most likely language over all windows wins."""
+    answers = iter([("de", 0.6), ("en", 0.9), ("en", 0.8)])
+    with (
+        patch("yt_whisper.language.get_model") as mock_get_model,
+        patch.object(
+            OpenAIWhisperBackend,
+            "detect_language",
+            side_effect=lambda *args: next(answers),
+        ),
+    ):
+        detected = detect_language(silence(120), windows=3)
+
+    assert mock_get_model.call_args.args[0] == "tiny"
+    assert detected["language"] == "en"
+    assert abs(detected["probability"] - 1.7 / 3) < 1e-9
+
+
+def test_auto_model_routes_by_language() -> None:
+    """English audio goes to the English-only model, other languages do not."""
+    model = MagicMock()
+    model.transcribe.return_value = {"text": " Hola.", "segments": []}
+
+    for language, expected in (("en", ENGLISH_MODEL), ("es", MULTILINGUAL_MODEL)):
+        with (
+            patch("yt_whisper.language.get_model"),
+            patch.object(
+                OpenAIWhisperBackend, "detect_language", return_value=(language, 0.9)
+            ),
+            patch("yt_whisper.lib.get_model", return_value=model) as mock_get_model,
+        ):
+            result = run_transcription(silence(5), model_name="auto")
+
+        assert mock_get_model.call_args.args[0] == expected
+        assert model.transcribe.call_args.kwargs["language"] == language
+        assert result["model"] == expected
+        assert result["language"] == language
+        assert result["language_probability"] == 0.9
+
+
+def test_auto_model_with_known_language_skips_detection() -> None:
+    """A given language is routed without running language ID."""
+    model = MagicMock()
+    model.transcribe.return_value = {"text": " Hello.", "segments": []}
+
+    with (
+        patch("yt_whisper.language.get_model") as mock_detect_model,
+        patch("yt_whisper.lib.get_model", return_value=model),
+    ):
+        result = run_transcription(silence(5), model_name="auto", language="en")
+
+    mock_detect_model.assert_not_called()
+    assert result["model"] == ENGLISH_MODEL
+    assert result["language_probability"] is None
+
+
+def test_language_probability_is_stored() -> None:
+    """The detected language and its probability are saved with the video."""
+    metadata = {
+        "title": "Video",
+        "channel": "Channel",
+        "author": "Author",
+        "upload_date": "20240101",
+        "duration": 60,
+        "description": "",
+    }
+    result = build_result(
+        "abc",
+        "https://youtu.be/abc",
+        metadata,
+        {},
+        "Bonjour.",
+        model_name=MULTILINGUAL_MODEL,
+        language="fr",
+        language_probability=0.97,
+    )
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, "language.db")
+        save_to_db(result, db_path)
+        info = get_video_info("abc", db_path)
+
+    assert info["language"] == "fr"
+    assert info["language_probability"] == 0.97
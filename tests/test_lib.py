@@ -1,12 +1,13 @@
 import unittest
 from unittest.mock import patch, MagicMock
 import subprocess
+import tempfile
 
 import os # Added for os.path.join and os.path.exists mocking
 
 # Assuming yt_whisper.lib is accessible in the PYTHONPATH
 # If not, you might need to adjust sys.path or how you import
-from yt_whisper.lib import is_ffmpeg_available, download_audio
+from yt_whisper.lib import is_ffmpeg_available, download_audio, run_transcription
 from yt_dlp.utils import DownloadError # Assuming this can be imported; or mock it
 
 # If direct import of DownloadError is an issue, use a dummy class for tests:
@@ -166,5 +167,71 @@ class TestLibDownloadAudio(unittest.TestCase):
         self.assertEqual(metadata_file, expected_metadata_file)
 
 
+    @patch('yt_dlp.YoutubeDL')
+    def test_download_audio_native_keeps_original_container(self, mock_youtube_dl):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            def fake_download(urls):
+                open(os.path.join(temp_dir, "ytw_audio_test_id.webm"), "w").close()
+                open(os.path.join(temp_dir, "ytw_audio_test_id.info.json"), "w").close()
+
+            mock_ydl_instance = MagicMock()
+            mock_ydl_instance.download.side_effect = fake_download
+            mock_youtube_dl.return_value.__enter__.return_value = mock_ydl_instance
+
+            audio_file, metadata_file = download_audio("test_id", temp_dir, native=True)
+
+            ydl_opts = mock_youtube_dl.call_args[0][0]
+            self.assertEqual(ydl_opts["postprocessors"], [])
+            self.assertTrue(ydl_opts["outtmpl"].endswith("ytw_audio_test_id.%(ext)s"))
+            self.assertEqual(audio_file, os.path.join(temp_dir, "ytw_audio_test_id.webm"))
+            self.assertTrue(metadata_file.endswith("ytw_audio_test_id.info.json"))
+
+            # A second call reuses the downloaded file
+            self.assertEqual(download_audio("test_id", temp_dir, native=True)[0], audio_file)
+            mock_ydl_instance.download.assert_called_once()
+
+
+class TestLibRunTranscription(unittest.TestCase):
+
+    def test_run_transcription_keeps_segments(self):
+        mock_model = MagicMock()
+        mock_model.transcribe.return_value = {
+            "text": " Hello there.",
+            "language": "en",
+            "segments": [
+                {
+                    "id": 0,
+                    "seek": 0,
+                    "start": 0.0,
+                    "end": 2.5,
+                    "text": " Hello there.",
+                    "tokens": [50364, 2425, 456],
+                    "temperature": 0.0,
+                    "avg_logprob": -0.25,
+                    "compression_ratio": 0.8,
+                    "no_speech_prob": 0.02,
+                }
+            ],
+        }
+
+        result = run_transcription("audio.mp3", model=mock_model)
+
+        self.assertEqual(result["text"], " Hello there.")
+        self.assertEqual(result["language"], "en")
+        self.assertEqual(
+            result["segments"],
+            [
+                {
+                    "start": 0.0,
+                    "end": 2.5,
+                    "text": "Hello there.",
+                    "tokens": [50364, 2425, 456],
+                    "avg_logprob": -0.25,
+                    "no_speech_prob": 0.02,
+                }
+            ],
+        )
+
+
 if __name__ == '__main__':
     unittest.main()
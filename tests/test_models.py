@@ -0,0 +1,99 @@
+"""Tests for the process-wide Whisper model cache."""
+
+import threading
+from collections.abc import Generator
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from yt_whisper.models import (
+    ModelCache,
+    clear_model_cache,
+    get_model,
+    get_model_cache_stats,
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache() -> Generator[None, None, None]:
+    """Make sure no model leaks between tests."""
+    clear_model_cache()
+    yield
+    clear_model_cache()
+
+
+def test_get_model_reuses_loaded_model() -> None:
+    """Repeated lookups for the same key load the model only once."""
+    model = MagicMock()
+    with patch("whisper.load_model", return_value=model) as mock_load:
+        assert get_model("base") is model
+        assert get_model("base") is model
+
+    mock_load.assert_called_once_with("base", device=None)
+    stats = get_model_cache_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["resident"] == [["base", "auto", "fp32", "openai-whisper"]]
+
+
+def test_model_cache_key_includes_device_and_precision() -> None:
+    """Different devices or precisions are cached separately."""
+    with patch("whisper.load_model", side_effect=lambda *a, **k: MagicMock()):
+        cpu = get_model("base", device="cpu")
+        cuda = get_model("base", device="cuda", precision="fp16")
+
+    assert cpu is not cuda
+    assert get_model_cache_stats()["misses"] == 2
+
+
+def test_model_cache_evicts_least_recently_used() -> None:
+    """The cache never holds more than max_models models."""
+    cache = ModelCache(max_models=2)
+    with patch("whisper.load_model", side_effect=lambda *a, **k: MagicMock()):
+        cache.get("tiny")
+        cache.get("base")
+        cache.get("tiny")
+        cache.get("small")
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["resident"] == [
+        ["tiny", "auto", "fp32", "openai-whisper"],
+        ["small", "auto", "fp32", "openai-whisper"],
+    ]
+
+
+def test_model_loads_do_not_block_other_models() -> None:
+    """A slow load holds up neither cache hits nor threads waiting for it."""
+    cache = ModelCache(max_models=3)
+    loading, release = threading.Event(), threading.Event()
+
+    def load(name: str, **kwargs: object) -> MagicMock:
+        if name == "large":
+            loading.set()
+            release.wait(5)
+        return MagicMock()
+
+    with patch("whisper.load_model", side_effect=load) as mock_load:
+        tiny = cache.get("tiny")
+        results: list[object] = []
+        loaders = [
+            threading.Thread(target=lambda: results.append(cache.get("large")))
+            for _ in range(2)
+        ]
+        for loader in loaders:
+            loader.start()
+        assert loading.wait(5)
+
+        lookup = threading.Thread(target=lambda: results.append(cache.get("tiny")))
+        lookup.start()
+        lookup.join(1)
+        assert not lookup.is_alive()
+        assert results == [tiny]
+
+        release.set()
+        for loader in loaders:
+            loader.join(5)
+
+    assert results[1] is results[2]
+    assert mock_load.call_count == 2
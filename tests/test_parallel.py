@@ -0,0 +1,92 @@
+"""Tests for chunked parallel transcription."""
+
+from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from yt_whisper.audio import SAMPLE_RATE, find_silence_splits
+from yt_whisper.models import clear_model_cache
+from yt_whisper.parallel import plan_chunks, transcribe_parallel
+
+
+@pytest.fixture(autouse=True)
+def empty_cache() -> Generator[None, None, None]:
+    """Make sure the fake model does not leak into other tests."""
+    clear_model_cache()
+    yield
+    clear_model_cache()
+
+
+def noise(seconds: float) -> np.ndarray:
+    """Loud random audio."""
+    rng = np.random.default_rng(0)
+    return rng.uniform(-0.5, 0.5, int(seconds * SAMPLE_RATE)).astype(np.float32)
+
+
+def fake_model() -> MagicMock:
+    """A model producing one segment per second of audio it is given."""
+
+    def transcribe(audio: np.ndarray, **kwargs: object) -> dict:
+        seconds = len(audio) // SAMPLE_RATE
+        segments = [
+            {"start": float(i), "end": float(i + 1), "text": "word", "tokens": []}
+            for i in range(seconds)
+        ]
+        return {"text": " word" * seconds, "segments": segments, "language": "en"}
+
+    model = MagicMock()
+    model.transcribe.side_effect = transcribe
+    return model
+
+
+def test_find_silence_splits_cuts_in_pauses() -> None:
+    """Splits land in the quiet stretch closest to each target position."""
+    audio = np.concatenate([noise(9), np.zeros(SAMPLE_RATE), noise(12)])
+
+    splits = find_silence_splits(audio, chunk_seconds=8, search_seconds=3)
+
+    assert len(splits) == 2
+    assert 9.0 <= splits[0] / SAMPLE_RATE <= 10.0
+
+
+def test_plan_chunks_adds_overlap_and_keep_ranges() -> None:
+    """Chunks overlap by the given amount but their keep ranges do not."""
+    chunks = plan_chunks(30 * SAMPLE_RATE, [10 * SAMPLE_RATE, 20 * SAMPLE_RATE], 1.0)
+
+    assert [(first, last) for first, last, _, _ in chunks] == [
+        (0, 11 * SAMPLE_RATE),
+        (9 * SAMPLE_RATE, 21 * SAMPLE_RATE),
+        (19 * SAMPLE_RATE, 30 * SAMPLE_RATE),
+    ]
+    assert chunks[0][2] == float("-inf")
+    assert chunks[1][2:] == (10.0, 20.0)
+    assert chunks[2][3] == float("inf")
+
+
+def test_transcribe_parallel_stitches_chunks() -> None:
+    """Segments come back once each, in order, on the original timeline."""
+    audio = noise(23)
+
+    with patch("whisper.load_model", return_value=fake_model()):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            result = transcribe_parallel(
+                audio,
+                chunk_seconds=5,
+                overlap_seconds=1,
+                executor=executor,
+            )
+
+    starts = [segment["start"] for segment in result["segments"]]
+    assert starts == sorted(starts)
+    assert len(set(starts)) == len(starts)
+    assert starts[0] == 0.0
+    assert result["segments"][-1]["end"] >= 21.0
+    for previous, current in zip(
+        result["segments"], result["segments"][1:], strict=False
+    ):
+        assert current["start"] - previous["end"] < 1.0
+    assert result["language"] == "en"
+    assert result["text"] == " word" * len(starts)
@@ -0,0 +1,124 @@
+"""Tests for playlist and channel expansion and sync."""
+
+from collections.abc import Iterator
+from typing import Any
+from unittest.mock import patch
+
+from click.testing import CliRunner
+
+from yt_whisper.batch import transcribe_batch
+from yt_whisper.cli import cli
+from yt_whisper.db import get_channel
+from yt_whisper.jobs import job_counts
+from yt_whisper.playlists import is_collection_url, list_entries, sync_channel
+
+
+class FakeChannel:
+    """
+    Stand-in for yt_dlp.YoutubeDL listing a channel, newest video first.
+
+    Records the URLs it was asked for and how many entries were consumed.
+    """
+
+    def __init__(self, video_ids: list[str]) -> None:
+        self.video_ids = video_ids
+        self.urls: list[str] = []
+        self.consumed = 0
+
+    def __call__(self, params: dict[str, Any]) -> "FakeChannel":
+        assert params["extract_flat"] == "in_playlist"
+        return self
+
+    def __enter__(self) -> "FakeChannel":  # noqa: PYI034
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        return None
+
+    def _entries(self) -> Iterator[dict[str, Any]]:
+        yield {"_type": "url", "ie_key": "YoutubeTab", "id": "shorts-tab"}
+        for video_id in self.video_ids:
+            self.consumed += 1
+            yield {"_type": "url", "ie_key": "Youtube", "id": video_id}
+
+    def extract_info(self, url: str, **kwargs: object) -> dict[str, Any]:
+        self.urls.append(url)
+        return {"title": "Fake Channel", "entries": self._entries()}
+
+
+def test_is_collection_url() -> None:
+    """Playlist and channel URLs are told apart from single videos."""
+    assert is_collection_url("https://www.youtube.com/playlist?list=PL123")
+    assert is_collection_url("https://www.youtube.com/@someone")
+    assert is_collection_url("https://youtube.com/channel/UC123/videos")
+    assert not is_collection_url("https://www.youtube.com/watch?v=abc&list=PL123")
+    assert not is_collection_url("https://youtu.be/abc")
+
+
+def test_list_entries_uses_videos_tab_and_skips_nested_playlists() -> None:
+    """A bare channel URL is listed through its videos tab."""
+    fake = FakeChannel(["new", "old"])
+
+    with patch("yt_dlp.YoutubeDL", fake):
+        title, entries = list_entries("https://www.youtube.com/@someone")
+
+    assert fake.urls == ["https://www.youtube.com/@someone/videos"]
+    assert title == "Fake Channel"
+    assert [entry["id"] for entry in entries] == ["new", "old"]
+    assert entries[0]["url"] == "https://www.youtube.com/watch?v=new"
+
+
+def test_sync_channel_only_lists_new_uploads(db_path: str) -> None:
+    """A second sync stops listing at the newest video of the first one."""
+    url = "https://www.youtube.com/@someone"
+    fake = FakeChannel([f"old{i}" for i in range(50)])
+
+    with patch("yt_dlp.YoutubeDL", fake):
+        first = sync_channel(url, db_path)
+        fake.video_ids = ["new1", "new0", *fake.video_ids]
+        fake.consumed = 0
+        second = sync_channel(url, db_path)
+
+    assert len(first) == 50
+    assert [entry["id"] for entry in second] == ["new1", "new0"]
+    assert fake.consumed == 3
+    assert get_channel(url, db_path)["last_video_id"] == "new1"
+    assert job_counts(db_path)["queued"] == 52
+
+
+def test_sync_command_queues_remembered_channels(db_path: str) -> None:
+    """Without URLs, sync refreshes every channel synced before."""
+    fake = FakeChannel(["aaa", "bbb"])
+    runner = CliRunner()
+
+    with patch("yt_dlp.YoutubeDL", fake):
+        first = runner.invoke(
+            cli,
+            [
+                "sync",
+                "https://www.youtube.com/@someone",
+                "--queue-only",
+                "--db-path",
+                db_path,
+            ],
+        )
+        again = runner.invoke(cli, ["sync", "--queue-only", "--db-path", db_path])
+
+    assert "2 new videos queued" in first.output
+    assert "0 new videos queued" in again.output
+
+
+def test_transcribe_batch_expands_playlists() -> None:
+    """transcribe_batch treats each playlist entry as its own video."""
+    fake = FakeChannel(["aaa", "bbb"])
+    with (
+        patch("yt_dlp.YoutubeDL", fake),
+        patch("yt_whisper.batch.existing_ids", return_value={"aaa"}),
+        patch("yt_whisper.batch._download_stage") as mock_download,
+    ):
+        batch = transcribe_batch(
+            ["https://www.youtube.com/playlist?list=PL123"], save=False
+        )
+
+    assert batch["skipped"] == ["aaa"]
+    assert mock_download.call_args.args[1] == "bbb"
@@ -0,0 +1,167 @@
+"""Tests for the serve daemon and its client."""
+
+import os
+import socket
+import threading
+from collections.abc import Callable, Generator
+from unittest.mock import patch
+
+import pytest
+from click.testing import CliRunner
+
+from yt_whisper.cli import cli
+from yt_whisper.client import (
+    Client,
+    DaemonUnavailableError,
+    socket_path,
+    via_daemon,
+)
+from yt_whisper.db import get_transcript, get_video_info, save_to_db
+from yt_whisper.server import Daemon, create_server
+
+
+@pytest.fixture
+def daemon(db_path: str) -> Generator[Daemon, None, None]:
+    """A daemon serving the test database on its default socket."""
+    daemon = Daemon(db_path)
+    server = create_server(daemon)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield daemon
+    server.shutdown()
+    server.server_close()
+    os.unlink(f"{db_path}.sock")
+    daemon.close()
+
+
+def test_cli_queries_go_through_daemon(
+    daemon: Daemon, db_path: str, make_video: Callable[..., dict]
+) -> None:
+    """get and list are answered by a running daemon."""
+    save_to_db(make_video("abc", transcription="Hello from the daemon."), db_path)
+    runner = CliRunner()
+
+    result = runner.invoke(cli, ["get", "abc", "--db-path", db_path])
+    assert result.exit_code == 0
+    assert "Hello from the daemon." in result.output
+
+    result = runner.invoke(cli, ["list", "--db-path", db_path])
+    assert result.exit_code == 0
+    assert "ID: abc" in result.output
+
+    assert Client(f"{db_path}.sock").health()["requests"] == 2
+
+
+def test_daemon_errors_reach_the_client(daemon: Daemon, db_path: str) -> None:
+    """Invalid arguments and unknown functions are reported as ValueError."""
+    client = Client(f"{db_path}.sock")
+
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        client.call("list_transcripts", limit=10, after="bogus")
+    with pytest.raises(ValueError, match="Unknown function"):
+        client.call("delete_video", youtube_id="abc")
+
+    result = CliRunner().invoke(cli, ["list", "--db-path", db_path, "--after", "bogus"])
+    assert result.exit_code == 2
+    assert "Invalid cursor" in result.output
+
+
+def test_daemon_only_serves_its_own_database(
+    daemon: Daemon, db_path: str, make_video: Callable[..., dict]
+) -> None:
+    """Clients cannot point a function at another file or pass other arguments."""
+    other = f"{db_path}.other"
+    save_to_db(make_video("abc"), other)
+    client = Client(f"{db_path}.sock")
+
+    with pytest.raises(ValueError, match="Unexpected arguments.*db_path"):
+        client.call("get_video_info", youtube_id="abc", db_path=other)
+    with pytest.raises(ValueError, match="Unexpected arguments.*compact"):
+        client.call("transcribe", url="https://youtu.be/abc", compact=True)
+    assert client.call("get_video_info", youtube_id="abc") is None
+    assert via_daemon(get_video_info, db_path)("abc", other)["title"] == "Video abc"
+    assert daemon.requests == 3
+
+
+def test_socket_override_only_applies_to_the_default_database(
+    db_path: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """YT_WHISPER_SOCKET does not send queries for another file to the daemon."""
+    monkeypatch.setenv("YT_WHISPER_SOCKET", f"{db_path}.custom")
+
+    assert socket_path(db_path) == f"{db_path}.sock"
+    with patch("yt_whisper.client.get_db_path", return_value=db_path):
+        assert socket_path() == f"{db_path}.custom"
+        assert socket_path(db_path) == f"{db_path}.custom"
+
+
+def test_socket_is_private_from_the_start(db_path: str) -> None:
+    """The socket is created owner-only rather than restricted after binding."""
+    daemon = Daemon(db_path)
+    with patch("os.chmod") as mock_chmod:
+        server = create_server(daemon)
+    try:
+        assert os.stat(f"{db_path}.sock").st_mode & 0o777 == 0o600
+        mock_chmod.assert_not_called()
+    finally:
+        server.server_close()
+        os.unlink(f"{db_path}.sock")
+        daemon.close()
+
+
+def test_daemon_failures_fall_back_to_sqlite(
+    daemon: Daemon, db_path: str, make_video: Callable[..., dict]
+) -> None:
+    """A query that fails inside the daemon is answered from the database."""
+    save_to_db(make_video("abc", transcription="Read directly."), db_path)
+
+    with patch("yt_whisper.db.get_transcript", side_effect=RuntimeError("boom")):
+        result = CliRunner().invoke(cli, ["get", "abc", "--db-path", db_path])
+
+    assert result.exit_code == 0
+    assert "Read directly." in result.output
+
+
+def test_transcribe_in_daemon_saves_result(
+    daemon: Daemon, db_path: str, make_video: Callable[..., dict]
+) -> None:
+    """A transcription runs in the daemon and is saved to its database."""
+    with patch(
+        "yt_whisper.server.download_and_transcribe",
+        return_value=make_video("xyz", transcription="Warm model."),
+    ) as mock_transcribe:
+        result = Client(f"{db_path}.sock").transcribe(
+            "https://youtu.be/xyz", model_name="tiny"
+        )
+
+    assert mock_transcribe.call_args.kwargs["model_name"] == "tiny"
+    assert mock_transcribe.call_args.kwargs["backend"] == daemon.backend
+    assert "metadata" not in result
+    assert get_transcript("xyz", db_path)["transcription"] == "Warm model."
+
+
+def test_stale_socket_falls_back_to_sqlite(
+    db_path: str, make_video: Callable[..., dict]
+) -> None:
+    """A socket left behind by a dead daemon is ignored by clients and replaced."""
+    save_to_db(make_video("abc"), db_path)
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(f"{db_path}.sock")
+    stale.close()
+
+    with pytest.raises(DaemonUnavailableError):
+        Client(f"{db_path}.sock").health()
+    assert via_daemon(get_video_info, db_path)("abc", db_path)["title"] == "Video abc"
+
+    daemon = Daemon(db_path)
+    server = create_server(daemon)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        assert Client(f"{db_path}.sock").health()["db_path"] == db_path
+        with pytest.raises(RuntimeError, match="already listening"):
+            create_server(Daemon(db_path))
+    finally:
+        server.shutdown()
+        server.server_close()
+        daemon.close()
@@ -0,0 +1,63 @@
+"""Regression tests for CLI startup cost."""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import pytest
+
+# Modules that take from a few hundred milliseconds to several seconds to import
+HEAVY_MODULES = ("whisper", "torch", "yt_dlp", "numpy", "faster_whisper")
+
+# Generous budget for importing the CLI and running a database-only command;
+# with the heavy modules imported it takes seconds
+STARTUP_BUDGET_SECONDS = 1.5
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from yt_whisper.cli import cli
+try:
+    cli(sys.argv[1:], standalone_mode=False)
+except SystemExit:
+    # get and delete exit with an error for a video that is not there
+    pass
+elapsed = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{"elapsed": elapsed, "heavy": heavy}}))
+"""
+
+
+def run_probe(*args: str) -> dict:
+    """Run a CLI command in a fresh interpreter and report what it imported."""
+    process = subprocess.run(
+        [sys.executable, "-c", PROBE.format(heavy=HEAVY_MODULES), *args],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize(
+    "command",
+    [
+        ["list"],
+        ["list", "--jsonl"],
+        ["get", "abc"],
+        ["search", "query"],
+        ["db"],
+        ["delete", "abc", "--yes"],
+    ],
+)
+def test_database_commands_skip_heavy_imports(command: list[str]) -> None:
+    """Commands that only query SQLite never import ML or download libraries."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, "startup.db")
+        result = run_probe(*command, "--db-path", db_path)
+
+    assert result["heavy"] == []
+    assert result["elapsed"] < STARTUP_BUDGET_SECONDS
@@ -50,6 +50,17 @@ class TestStorage(TestCase):
             if db_path.exists():
                 db_path.unlink()
 
+    def test_get_database_connection_tuned(self) -> None:
+        """Test that a tuned connection uses WAL mode."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = Path(temp_dir) / "tuned.db"
+            conn = get_database_connection(str(db_path), tuned=True)
+            try:
+                mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+                assert mode == "wal"
+            finally:
+                conn.close()
+
     def test_platform_specific_paths(self) -> None:
         """Test that paths are platform-specific."""
         # Create a temporary directory for testing
@@ -0,0 +1,108 @@
+"""Tests for memory-bounded streaming transcription."""
+
+import subprocess
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from yt_whisper.audio import SAMPLE_RATE, stream_audio
+from yt_whisper.backends import OpenAIWhisperBackend
+from yt_whisper.lib import run_transcription
+from yt_whisper.streaming import iter_windows
+from yt_whisper.timing import peak_rss, reset_peak_rss
+
+
+def fake_windows(
+    model: Any,  # noqa: ANN401
+    windows: list[np.ndarray],
+    languages: list[str | None],
+    precision: str,
+) -> list[dict[str, Any]]:
+    """One segment per window, spanning all of it."""
+    return [
+        {
+            "text": " window",
+            "segments": [
+                {"start": 0.0, "end": len(window) / SAMPLE_RATE, "text": " window"}
+            ],
+            "language": "en",
+        }
+        for window in windows
+    ]
+
+
+def test_iter_windows_cover_the_blocks() -> None:
+    """Windows cut across block boundaries cover every sample in order."""
+    samples = np.random.default_rng(0).normal(0, 0.1, 200 * SAMPLE_RATE)
+    samples = samples.astype(np.float32)
+    blocks = np.array_split(samples, 7)
+
+    windows = list(iter_windows(blocks))
+
+    assert windows[0][0] == 0
+    assert all(len(window) <= 30 * SAMPLE_RATE for _, window in windows)
+    assert all(
+        first + len(window) == next_first
+        for (first, window), (next_first, _) in zip(windows, windows[1:], strict=False)
+    )
+    np.testing.assert_array_equal(
+        np.concatenate([window for _, window in windows]), samples
+    )
+
+
+def test_stream_transcription_offsets_segments() -> None:
+    """Each window is transcribed alone and its segments keep their times."""
+    samples = np.random.default_rng(1).normal(0, 0.1, 150 * SAMPLE_RATE)
+    with (
+        patch("yt_whisper.streaming.get_model"),
+        patch.object(
+            OpenAIWhisperBackend, "transcribe_windows", side_effect=fake_windows
+        ) as mock_windows,
+    ):
+        result = run_transcription(samples.astype(np.float32), stream=True)
+
+    segments = result["segments"]
+    assert all(len(call.args[1]) == 1 for call in mock_windows.call_args_list)
+    assert len(segments) == mock_windows.call_count > 5
+    assert segments[0]["start"] == 0.0
+    assert segments[-1]["end"] == pytest.approx(150.0)
+    assert all(
+        a["end"] == pytest.approx(b["start"])
+        for a, b in zip(segments, segments[1:], strict=False)
+    )
+    assert result["language"] == "en"
+    assert result["options"]["streamed"] is True
+
+
+def test_stream_audio_reads_blocks_from_pipe() -> None:
+    """ffmpeg output is read in blocks, and a failed decode raises."""
+    pcm = np.arange(2500, dtype=np.float32)
+    process = MagicMock(returncode=0)
+    process.stdout.read.side_effect = [pcm[:1000].tobytes(), pcm[1000:].tobytes(), b""]
+    process.communicate.return_value = (b"", b"")
+
+    with patch.object(subprocess, "Popen", return_value=process) as mock_popen:
+        blocks = list(stream_audio("audio.webm", block_seconds=1000 / SAMPLE_RATE))
+
+    assert mock_popen.call_args.args[0][-1] == "-"
+    assert process.stdout.read.call_args.args == (4000,)
+    np.testing.assert_array_equal(np.concatenate(blocks), pcm)
+
+    process = MagicMock(returncode=1)
+    process.stdout.read.return_value = b""
+    process.communicate.return_value = (b"", b"Invalid data")
+    with (
+        patch.object(subprocess, "Popen", return_value=process),
+        pytest.raises(RuntimeError, match="Invalid data"),
+    ):
+        list(stream_audio("broken.webm"))
+
+
+def test_peak_rss_reports_bytes() -> None:
+    """The memory high-water mark is a plausible byte count."""
+    reset_peak_rss()
+    rss = peak_rss()
+
+    assert rss is None or rss > 1024 * 1024
@@ -0,0 +1,99 @@
+"""Tests for per-stage timing instrumentation."""
+
+import json
+from unittest.mock import MagicMock, patch
+
+from click.testing import CliRunner
+
+from yt_whisper.cli import cli
+from yt_whisper.db import get_connection, record_run
+from yt_whisper.lib import run_transcription
+from yt_whisper.timing import Timings, format_profile
+
+
+def test_spans_accumulate_in_stage_order() -> None:
+    """Repeated spans add up and well-known stages come first."""
+    timings = Timings()
+    timings.add("custom", 1.0)
+    timings.add("inference", 2.0)
+    timings.add("inference", 0.5)
+    with timings.span("download"):
+        pass
+
+    spans = timings.as_dict()
+
+    assert list(spans) == ["download", "inference", "custom"]
+    assert spans["inference"] == 2.5
+
+
+def test_format_profile_reports_real_time_factor() -> None:
+    """The table ends with audio seconds per inference second."""
+    lines = format_profile({"download": 1.0, "inference": 3.0}, audio_seconds=60)
+
+    assert lines[1].split() == ["download", "1.00", "25.0%"]
+    assert lines[-2].split() == ["total", "4.00"]
+    assert lines[-1].startswith("Real-time factor: 20.0x")
+
+
+def test_run_transcription_records_spans() -> None:
+    """Model loading and inference are timed separately."""
+    model = MagicMock()
+    model.transcribe.return_value = {"text": "hi", "segments": []}
+    timings = Timings()
+
+    with patch("yt_whisper.lib.get_model", return_value=model):
+        run_transcription("audio.mp3", timings=timings)
+
+    assert set(timings.as_dict()) == {"model_load", "inference"}
+
+
+def test_record_run(db_path: str) -> None:
+    """Runs are stored with their total and real-time factor."""
+    record_run("abc", {"inference": 2.0, "db_write": 1.0}, "base", 10, db_path)
+
+    row = get_connection(db_path).execute("SELECT * FROM runs").fetchone()
+
+    assert row["video_id"] == "abc"
+    assert json.loads(row["timings"]) == {"inference": 2.0, "db_write": 1.0}
+    assert row["total_seconds"] == 3.0
+    assert row["real_time_factor"] == 5.0
+
+
+@patch("yt_whisper.cli.download_and_transcribe")
+@patch("yt_whisper.cli.is_ffmpeg_available", return_value=True)
+def test_transcribe_profile_flag(
+    mock_ffmpeg: MagicMock, mock_download_and_transcribe: MagicMock, db_path: str
+) -> None:
+    """--profile prints the breakdown and records the run with the model used."""
+    mock_download_and_transcribe.return_value = {
+        "id": "abc",
+        "url": "https://www.youtube.com/watch?v=abc",
+        "title": "Video",
+        "channel": "Channel",
+        "author": "Author",
+        "duration": 120,
+        "transcription": "text",
+        "model": "small.en",
+        "metadata": {},
+        "created_at": "2024-05-01T12:00:00Z",
+        "timings": {"download": 2.0, "model_load": 1.0, "inference": 4.0},
+    }
+
+    result = CliRunner().invoke(
+        cli,
+        [
+            "transcribe",
+            "https://www.youtube.com/watch?v=abc",
+            "--db-path",
+            db_path,
+            "--model",
+            "auto",
+            "--profile",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "db_write" in result.output
+    assert "Real-time factor: 30.0x" in result.output
+    runs = get_connection(db_path).execute("SELECT model FROM runs").fetchall()
+    assert [row["model"] for row in runs] == ["small.en"]
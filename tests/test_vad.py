@@ -0,0 +1,96 @@
+"""Tests for voice activity detection."""
+
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from yt_whisper.audio import SAMPLE_RATE
+from yt_whisper.db import MAX_SEGMENT_SECONDS
+from yt_whisper.lib import run_transcription
+from yt_whisper.vad import find_speech, remap_segments, speech_stats
+
+
+def noise(seconds: float, level: float = 0.3) -> np.ndarray:
+    """Random audio at the given amplitude."""
+    rng = np.random.default_rng(0)
+    return rng.uniform(-level, level, int(seconds * SAMPLE_RATE)).astype(np.float32)
+
+
+def quiet(seconds: float) -> np.ndarray:
+    """Background hiss far below speech level."""
+    return noise(seconds, level=0.001)
+
+
+def test_find_speech_skips_silence_and_short_pauses() -> None:
+    """Long quiet stretches are dropped, short pauses stay inside a region."""
+    audio = np.concatenate(
+        [quiet(20), noise(5), quiet(0.5), noise(5), quiet(10), noise(3), quiet(15)]
+    )
+
+    regions = find_speech(audio, padding_seconds=0)
+
+    seconds = [(first / SAMPLE_RATE, last / SAMPLE_RATE) for first, last in regions]
+    assert len(seconds) == 2
+    assert abs(seconds[0][0] - 20) < 0.1 and abs(seconds[0][1] - 30.5) < 0.1
+    assert abs(seconds[1][0] - 40.5) < 0.1 and abs(seconds[1][1] - 43.5) < 0.1
+
+
+def test_find_speech_ignores_short_clicks() -> None:
+    """Bursts shorter than min_speech_seconds are not speech."""
+    audio = np.concatenate([quiet(5), noise(0.1), quiet(5)])
+
+    assert find_speech(audio) == []
+
+
+def test_remap_segments_to_original_timeline() -> None:
+    """Timestamps in the joined audio are moved past the removed stretches."""
+    regions = [
+        (10 * SAMPLE_RATE, 20 * SAMPLE_RATE),
+        (50 * SAMPLE_RATE, 80 * SAMPLE_RATE),
+    ]
+    segments = [
+        {"start": 1.0, "end": 10.0, "text": "first"},
+        {"start": 12.0, "end": 14.0, "text": "second"},
+        {"start": 5.0, "end": 30.0, "text": "across the gap"},
+    ]
+
+    remapped = remap_segments(segments, regions)
+
+    assert [(s["start"], s["end"]) for s in remapped[:2]] == [
+        (11.0, 20.0),
+        (52.0, 54.0),
+    ]
+    # Spanning the 30 second gap would exceed the segment length bound
+    assert remapped[2]["start"] == 15.0
+    assert remapped[2]["end"] - remapped[2]["start"] <= MAX_SEGMENT_SECONDS
+
+
+def test_run_transcription_with_vad_reports_skipped_audio() -> None:
+    """Only speech is transcribed, and the segments land where it was spoken."""
+    audio = np.concatenate([quiet(30), noise(4), quiet(26)])
+    model = MagicMock()
+    model.transcribe.return_value = {
+        "text": " Hello.",
+        "segments": [{"start": 0.5, "end": 3.5, "text": " Hello."}],
+        "language": "en",
+    }
+
+    with patch("yt_whisper.lib.get_model", return_value=model):
+        result = run_transcription(audio, vad=True)
+
+    transcribed = model.transcribe.call_args.args[0]
+    assert len(transcribed) < 5 * SAMPLE_RATE
+    assert 30 <= result["segments"][0]["start"] <= 31
+    assert result["vad"]["audio_seconds"] == 60
+    assert result["vad"]["skipped_seconds"] > 55
+
+
+def test_run_transcription_with_vad_skips_silent_audio() -> None:
+    """Audio without speech is not sent to the model at all."""
+    with patch("yt_whisper.lib.get_model") as mock_get_model:
+        result = run_transcription(quiet(10), vad=True)
+
+    mock_get_model.assert_not_called()
+    assert result["text"] == ""
+    assert result["segments"] == []
+    assert result["vad"] == speech_stats([], 10 * SAMPLE_RATE)
@@ -231,11 +231,11 @@ def test_get_transcript_command(temp_db: str) -> None:
 
 @patch("yt_whisper.cli.download_and_transcribe")
 @patch("yt_whisper.cli.save_to_db")
-@patch("yt_whisper.cli.get_transcript")
+@patch("yt_whisper.cli.get_video_info")
 @patch("yt_whisper.cli.is_ffmpeg_available") # Mock ffmpeg check
 def test_transcribe_command_ffmpeg_available(
     mock_is_ffmpeg_available: MagicMock,
-    mock_get_transcript: MagicMock,
+    mock_get_video_info: MagicMock,
     mock_save_to_db: MagicMock,
     mock_download_and_transcribe: MagicMock,
 ) -> None:
@@ -245,8 +245,8 @@ def test_transcribe_command_ffmpeg_available(
     # Mock FFmpeg as available
     mock_is_ffmpeg_available.return_value = True
 
-    # Mock the get_transcript function to return None (video not in DB)
-    mock_get_transcript.return_value = None
+    # Mock the get_video_info function to return None (video not in DB)
+    mock_get_video_info.return_value = None
 
     # Mock the download_and_transcribe function
     mock_download_and_transcribe.return_value = {
@@ -355,7 +355,7 @@ def test_list_command(mock_list_transcripts: MagicMock) -> None:
     assert "Found 2 transcripts" in result.output
 
     # Verify function call
-    mock_list_transcripts.assert_called_once_with(10, None)
+    mock_list_transcripts.assert_called_once_with(10, None, after=None)
 
 
 def test_save_and_get_to_db(temp_db: str) -> None:
@@ -1,12 +1,22 @@
 # yt_whisper/__init__.py
-from importlib.metadata import PackageNotFoundError, version
+from typing import Any
 
 from .lib import download_and_transcribe
 
-try:
-    __version__ = version("yt-whisper")
-except PackageNotFoundError:
-    # package is not installed
-    __version__ = "0.4.2"
-
 __all__ = ["download_and_transcribe"]
+
+
+def __getattr__(name: str) -> Any:  # noqa: ANN401
+    # Reading the installed version imports importlib.metadata, which is slow
+    # enough to matter for quick commands, so it is looked up on first use
+    if name == "__version__":
+        from importlib.metadata import PackageNotFoundError, version
+
+        try:
+            __version__ = version("yt-whisper")
+        except PackageNotFoundError:
+            # package is not installed
+            __version__ = "0.4.2"
+        globals()["__version__"] = __version__
+        return __version__
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,286 @@
+"""
+Asyncio interface to yt-whisper.
+
+The blocking work is moved off the event loop: downloads, metadata parsing,
+decoding and database access run in the loop's default thread pool, and
+inference runs on a dedicated executor. A semaphore bounds how many videos are
+in flight at once, so a single loop can drive many videos without running out
+of memory or disk.
+
+Example usage:
+    async with AsyncTranscriber(max_concurrency=4) as transcriber:
+        results = await asyncio.gather(
+            *(transcriber.download_and_transcribe(url) for url in urls)
+        )
+"""
+
+import asyncio
+import functools
+import os
+import shutil
+import tempfile
+import threading
+import weakref
+from collections.abc import Callable
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, ParamSpec, TypeVar
+
+from . import db
+from .audio import decode_audio
+from .backends import DEFAULT_BACKEND
+from .cache import AudioCache
+from .lib import (
+    build_result,
+    extract_metadata,
+    extract_youtube_id,
+    fetch_audio,
+    run_transcription,
+)
+from .models import ModelCache
+from .timing import Timings, peak_rss, reset_peak_rss
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+# Videos in flight per event loop for the module-level functions, overridable
+# with YT_WHISPER_MAX_CONCURRENCY
+DEFAULT_MAX_CONCURRENCY = 4
+
+
+class AsyncTranscriber:
+    """
+    Transcribes videos from asyncio code with bounded concurrency.
+
+    Args:
+        max_concurrency: Maximum number of videos being processed at once;
+            further calls wait for a free slot
+        inference_workers: Number of threads running inference. Each thread
+            beyond the first loads its own copy of the model, because models
+            must not be shared between concurrent transcriptions.
+        executor: Executor to run inference on instead of a private thread pool.
+            It is not shut down by close().
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        inference_workers: int = 1,
+        executor: Executor | None = None,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._max_concurrency = max_concurrency
+        self._own_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=inference_workers, thread_name_prefix="yt-whisper-inference"
+        )
+        self._private_models = inference_workers > 1
+        self._local = threading.local()
+
+    async def __aenter__(self) -> "AsyncTranscriber":  # noqa: PYI034
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shut down the inference executor if this transcriber created it."""
+        if self._own_executor:
+            self._executor.shutdown(wait=False)
+
+    def _transcribe(
+        self,
+        audio: Any,  # noqa: ANN401
+        model_name: str,
+        language: str | None,
+        workers: int,
+        timings: Timings,
+        backend: str = DEFAULT_BACKEND,
+        compute_type: str | None = None,
+        vad: bool = False,
+        stream: bool = False,
+    ) -> dict[str, Any]:
+        """Run inference on the calling executor thread."""
+        models = None
+        if self._private_models:
+            models = getattr(self._local, "models", None)
+            if models is None:
+                # With model 'auto' the language ID and routed models are kept
+                models = self._local.models = ModelCache(max_models=3)
+        return run_transcription(
+            audio,
+            model_name=model_name,
+            language=language,
+            model_cache=models,
+            workers=workers,
+            timings=timings,
+            backend=backend,
+            compute_type=compute_type,
+            vad=vad,
+            stream=stream,
+        )
+
+    async def download_and_transcribe(
+        self,
+        url: str,
+        force: bool = False,
+        model_name: str = "base",
+        language: str | None = None,
+        native_audio: bool = False,
+        use_cache: bool = False,
+        workers: int = 1,
+        backend: str = DEFAULT_BACKEND,
+        compute_type: str | None = None,
+        vad: bool = False,
+        stream: bool = False,
+    ) -> dict:
+        """
+        Download and transcribe a YouTube video without blocking the event loop.
+
+        Takes the same arguments and returns the same dictionary as
+        yt_whisper.lib.download_and_transcribe. With max_concurrency above 1,
+        videos share the process, so 'peak_rss' includes the memory of the
+        others transcribed at the same time.
+        """
+        youtube_id = extract_youtube_id(url)
+        if not youtube_id:
+            raise ValueError(f"Could not extract YouTube ID from URL: {url}")
+
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            timings = Timings()
+            temp_dir = await asyncio.to_thread(tempfile.mkdtemp, prefix="ytw_")
+            try:
+                with timings.span("download"):
+                    audio_file, metadata_file = await asyncio.to_thread(
+                        fetch_audio,
+                        youtube_id,
+                        temp_dir,
+                        force,
+                        native=native_audio,
+                        cache=AudioCache() if use_cache else None,
+                    )
+
+                with timings.span("metadata"):
+                    metadata, raw_metadata = await asyncio.to_thread(
+                        extract_metadata, metadata_file
+                    )
+
+                if self._max_concurrency == 1:
+                    reset_peak_rss()
+                audio = audio_file
+                if native_audio and not stream:
+                    with timings.span("decode"):
+                        audio = await asyncio.to_thread(decode_audio, audio_file)
+
+                transcription = await loop.run_in_executor(
+                    self._executor,
+                    self._transcribe,
+                    audio,
+                    model_name,
+                    language,
+                    workers,
+                    timings,
+                    backend,
+                    compute_type,
+                    vad,
+                    stream,
+                )
+                rss = peak_rss()
+            finally:
+                await asyncio.to_thread(shutil.rmtree, temp_dir, True)
+
+        result = build_result(
+            youtube_id,
+            url,
+            metadata,
+            raw_metadata,
+            transcription["text"],
+            transcription["segments"],
+            model_name=transcription["model"],
+            language=transcription["language"],
+            language_probability=transcription["language_probability"],
+            backend=transcription["backend"],
+            options=transcription["options"],
+        )
+        result["timings"] = timings.as_dict()
+        result["peak_rss"] = rss
+        if "vad" in transcription:
+            result["vad"] = transcription["vad"]
+        return result
+
+
+# Shared transcriber of each event loop, used by the module-level functions
+_transcribers: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def get_transcriber() -> AsyncTranscriber:
+    """Return the shared transcriber of the running event loop."""
+    loop = asyncio.get_running_loop()
+    transcriber = _transcribers.get(loop)
+    if transcriber is None:
+        transcriber = AsyncTranscriber(
+            max_concurrency=int(
+                os.environ.get(
+                    "YT_WHISPER_MAX_CONCURRENCY", str(DEFAULT_MAX_CONCURRENCY)
+                )
+            )
+        )
+        _transcribers[loop] = transcriber
+    return transcriber
+
+
+async def download_and_transcribe(
+    url: str,
+    force: bool = False,
+    model_name: str = "base",
+    language: str | None = None,
+    native_audio: bool = False,
+    use_cache: bool = False,
+    workers: int = 1,
+    backend: str = DEFAULT_BACKEND,
+    compute_type: str | None = None,
+    vad: bool = False,
+    stream: bool = False,
+) -> dict:
+    """
+    Download and transcribe a YouTube video using the loop's shared transcriber.
+
+    See AsyncTranscriber.download_and_transcribe.
+    """
+    return await get_transcriber().download_and_transcribe(
+        url,
+        force=force,
+        model_name=model_name,
+        language=language,
+        native_audio=native_audio,
+        use_cache=use_cache,
+        workers=workers,
+        backend=backend,
+        compute_type=compute_type,
+        vad=vad,
+        stream=stream,
+    )
+
+
+def _in_thread(func: Callable[P, R]) -> Callable[P, Any]:
+    """Wrap a blocking database function as a coroutine function."""
+
+    @functools.wraps(func)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+    return wrapper
+
+
+# Async versions of the database accessors
+save_to_db = _in_thread(db.save_to_db)
+save_many = _in_thread(db.save_many)
+get_transcript = _in_thread(db.get_transcript)
+get_video_info = _in_thread(db.get_video_info)
+get_segments = _in_thread(db.get_segments)
+list_transcripts = _in_thread(db.list_transcripts)
+search_transcripts = _in_thread(db.search_transcripts)
+search_segments = _in_thread(db.search_segments)
+delete_video = _in_thread(db.delete_video)
@@ -0,0 +1,194 @@
+"""
+Audio decoding for transcription.
+
+Whisper works on 16 kHz mono float32 samples. Decoding the downloaded audio
+straight to that format with a single ffmpeg pass avoids re-encoding it to MP3
+first and having Whisper decode the MP3 again.
+"""
+
+import os
+import subprocess
+from collections.abc import Iterator
+
+import numpy as np
+import numpy.typing as npt
+
+# Sample rate expected by Whisper
+SAMPLE_RATE = 16000
+
+
+def _ffmpeg_decode_command(path: str, sample_rate: int, output: str) -> list[str]:
+    """Build the ffmpeg command decoding a file to mono float32 PCM."""
+    return [
+        "ffmpeg",
+        "-nostdin",
+        "-threads",
+        "0",
+        "-i",
+        path,
+        "-vn",
+        "-f",
+        "f32le",
+        "-ac",
+        "1",
+        "-ar",
+        str(sample_rate),
+        "-y",
+        output,
+    ]
+
+
+def decode_audio(
+    path: str, sample_rate: int = SAMPLE_RATE, mmap_path: str | None = None
+) -> npt.NDArray[np.float32]:
+    """
+    Decode any audio or video file to mono float32 PCM in one ffmpeg pass.
+
+    Args:
+        path: Path to the audio file, in any container/codec ffmpeg can read
+        sample_rate: Sample rate to resample to (default: 16 kHz for Whisper)
+        mmap_path: If given, the samples are written to this raw file and
+            memory-mapped instead of being held in memory
+
+    Returns:
+        One-dimensional float32 array of samples in [-1, 1]
+
+    Raises:
+        RuntimeError: If ffmpeg fails to decode the file
+    """
+    output = mmap_path or "-"
+    try:
+        process = subprocess.run(
+            _ffmpeg_decode_command(path, sample_rate, output),
+            capture_output=True,
+            check=True,
+        )
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(
+            f"Failed to decode audio: {e.stderr.decode(errors='replace')}"
+        ) from e
+
+    if mmap_path:
+        return open_pcm(mmap_path)
+    return np.frombuffer(process.stdout, dtype=np.float32)
+
+
+def stream_audio(
+    path: str, block_seconds: float = 60.0, sample_rate: int = SAMPLE_RATE
+) -> Iterator[npt.NDArray[np.float32]]:
+    """
+    Decode a file to mono float32 PCM through a pipe, one block at a time.
+
+    Only the current block is held in memory, however long the audio is.
+    Closing the generator early stops ffmpeg.
+
+    Args:
+        path: Path to the audio file, in any container/codec ffmpeg can read
+        block_seconds: Length of the blocks to yield; the last may be shorter
+        sample_rate: Sample rate to resample to (default: 16 kHz for Whisper)
+
+    Yields:
+        One-dimensional float32 arrays of consecutive samples
+
+    Raises:
+        RuntimeError: If ffmpeg fails to decode the file
+    """
+    command = _ffmpeg_decode_command(path, sample_rate, "-")
+    # Keep stderr short so it cannot fill its pipe while stdout is read
+    command[1:1] = ["-loglevel", "error"]
+    block_bytes = int(block_seconds * sample_rate) * 4
+
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        while data := process.stdout.read(block_bytes):
+            # A read can end inside a sample only at the end of the stream
+            usable = len(data) - len(data) % 4
+            yield np.frombuffer(data[:usable], dtype=np.float32)
+        _, stderr = process.communicate()
+        if process.returncode:
+            raise RuntimeError(
+                f"Failed to decode audio: {stderr.decode(errors='replace')}"
+            )
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+
+def open_pcm(path: str) -> npt.NDArray[np.float32]:
+    """
+    Memory-map a raw float32 PCM file written by decode_audio.
+
+    The mapping is copy-on-write, so callers may modify the samples without
+    touching the file.
+    """
+    if os.path.getsize(path) == 0:
+        return np.zeros(0, dtype=np.float32)
+    return np.memmap(path, dtype=np.float32, mode="c")
+
+
+def frame_energy(
+    samples: npt.NDArray[np.float32], frame_size: int
+) -> npt.NDArray[np.float32]:
+    """
+    Compute the RMS energy of consecutive non-overlapping frames.
+
+    The samples are processed in blocks so that hours of audio do not need a
+    second full-size temporary array.
+
+    Args:
+        samples: Mono audio samples
+        frame_size: Number of samples per frame
+
+    Returns:
+        One RMS value per complete frame
+    """
+    n_frames = len(samples) // frame_size
+    energy = np.empty(n_frames, dtype=np.float32)
+    block = 100_000
+    for first in range(0, n_frames, block):
+        last = min(first + block, n_frames)
+        frames = np.asarray(
+            samples[first * frame_size : last * frame_size], dtype=np.float32
+        ).reshape(last - first, frame_size)
+        energy[first:last] = np.sqrt(np.mean(np.square(frames), axis=1))
+    return energy
+
+
+def find_silence_splits(
+    samples: npt.NDArray[np.float32],
+    chunk_seconds: float,
+    sample_rate: int = SAMPLE_RATE,
+    search_seconds: float = 30.0,
+    frame_seconds: float = 0.03,
+) -> list[int]:
+    """
+    Choose split points roughly every chunk_seconds at the quietest moment.
+
+    Each split is placed at the lowest-energy frame within search_seconds of
+    the target position, so chunks are cut in pauses rather than mid-word.
+
+    Args:
+        samples: Mono audio samples
+        chunk_seconds: Desired chunk length in seconds
+        sample_rate: Sample rate of the audio
+        search_seconds: How far from the target position to look for silence
+        frame_seconds: Length of the frames energy is measured over
+
+    Returns:
+        Sample indices to split the audio at, in increasing order
+    """
+    frame_size = max(1, int(frame_seconds * sample_rate))
+    energy = frame_energy(samples, frame_size)
+    frames_per_second = sample_rate / frame_size
+    chunk_frames = int(chunk_seconds * frames_per_second)
+    search_frames = int(min(search_seconds, chunk_seconds / 2) * frames_per_second)
+
+    splits = []
+    target = chunk_frames
+    while target + search_frames < len(energy):
+        low = target - search_frames
+        quietest = low + int(np.argmin(energy[low : target + search_frames + 1]))
+        splits.append(quietest * frame_size + frame_size // 2)
+        target = quietest + chunk_frames
+    return splits
@@ -0,0 +1,323 @@
+"""
+Inference backends.
+
+A backend loads models and runs transcription for one Whisper implementation,
+and returns results in the shape of openai-whisper's ``transcribe`` ('text',
+'segments' as dictionaries, 'language'), so the rest of yt-whisper does not
+depend on which one is used.
+
+- openai-whisper: the reference PyTorch implementation (precision 'fp32' or
+  'fp16')
+- faster-whisper: CTranslate2 with quantized weights, several times faster on
+  CPU (compute type 'int8', 'int8_float16', 'float16' or 'float32'). It is an
+  optional dependency: ``pip install 'yt-whisper[faster-whisper]'``.
+"""
+
+from typing import Any
+
+DEFAULT_BACKEND = "openai-whisper"
+
+
+class Backend:
+    """Interface of an inference backend."""
+
+    name = ""
+    default_precision = ""
+    precisions: tuple[str, ...] = ()
+
+    def load(self, model_name: str, device: str | None, precision: str) -> Any:  # noqa: ANN401
+        """Load a model for the given device and precision."""
+        raise NotImplementedError
+
+    def transcribe(
+        self,
+        model: Any,  # noqa: ANN401
+        audio: Any,  # noqa: ANN401
+        language: str | None,
+        precision: str,
+    ) -> dict[str, Any]:
+        """Transcribe a file path or 16 kHz float32 samples with a loaded model."""
+        raise NotImplementedError
+
+    def detect_language(
+        self,
+        model: Any,  # noqa: ANN401
+        samples: Any,  # noqa: ANN401
+        precision: str,
+    ) -> tuple[str, float]:
+        """Identify the language of up to 30 seconds of 16 kHz float32 samples."""
+        raise NotImplementedError
+
+    def transcribe_windows(
+        self,
+        model: Any,  # noqa: ANN401
+        windows: list[Any],
+        languages: list[str | None],
+        precision: str,
+    ) -> list[dict[str, Any]]:
+        """
+        Transcribe windows of up to 30 seconds of 16 kHz float32 samples.
+
+        Segment timestamps are relative to the start of each window. Backends
+        without batched decoding transcribe the windows one after another.
+        """
+        return [
+            self.transcribe(model, window, language, precision)
+            for window, language in zip(windows, languages, strict=True)
+        ]
+
+
+# openai-whisper's sample rate and the length of one timestamp step
+WHISPER_SAMPLE_RATE = 16000
+TIMESTAMP_SECONDS = 0.02
+
+# model.transcribe's thresholds for dropping a window as silence
+NO_SPEECH_THRESHOLD = 0.6
+LOGPROB_THRESHOLD = -1.0
+
+
+def timestamped_segments(
+    tokens: list[int],
+    timestamp_begin: int,
+    decode: Any,  # noqa: ANN401
+    duration: float,
+) -> list[dict[str, Any]]:
+    """
+    Split decoded tokens into segments at Whisper's timestamp tokens.
+
+    Args:
+        tokens: Tokens of one window, without the start-of-transcript prefix
+        timestamp_begin: Id of the <|0.00|> token; larger ids are timestamps
+        decode: Function turning text tokens into a string
+        duration: Length of the window in seconds; the last segment ends
+            there if the model did not close it
+
+    Returns:
+        Segments with 'start', 'end', 'text' and 'tokens'
+    """
+    segments: list[dict[str, Any]] = []
+    start: float | None = None
+    text: list[int] = []
+    for token in tokens:
+        if token < timestamp_begin:
+            if start is None:
+                start = segments[-1]["end"] if segments else 0.0
+            text.append(token)
+            continue
+        time = min((token - timestamp_begin) * TIMESTAMP_SECONDS, duration)
+        if start is not None and text:
+            segments.append(
+                {"start": start, "end": time, "text": decode(text), "tokens": text}
+            )
+            start, text = None, []
+        else:
+            # The opening timestamp, or a repeated one between segments
+            start = time
+    if text:
+        start = 0.0 if start is None else start
+        segments.append(
+            {"start": start, "end": duration, "text": decode(text), "tokens": text}
+        )
+    return segments
+
+
+def _window_result(
+    result: Any,  # noqa: ANN401
+    tokenizer: Any,  # noqa: ANN401
+    duration: float,
+) -> dict[str, Any]:
+    """Turn an openai-whisper DecodingResult into a transcription result."""
+    if (
+        result.no_speech_prob > NO_SPEECH_THRESHOLD
+        and result.avg_logprob < LOGPROB_THRESHOLD
+    ):
+        return {"text": "", "segments": [], "language": result.language}
+    segments = timestamped_segments(
+        result.tokens, tokenizer.timestamp_begin, tokenizer.decode, duration
+    )
+    for segment in segments:
+        segment["avg_logprob"] = result.avg_logprob
+        segment["no_speech_prob"] = result.no_speech_prob
+    return {
+        "text": "".join(segment["text"] for segment in segments),
+        "segments": segments,
+        "language": result.language,
+    }
+
+
+class OpenAIWhisperBackend(Backend):
+    """The openai-whisper PyTorch implementation."""
+
+    name = "openai-whisper"
+    default_precision = "fp32"
+    precisions = ("fp32", "fp16")
+
+    def load(self, model_name: str, device: str | None, precision: str) -> Any:  # noqa: ANN401
+        import whisper
+
+        return whisper.load_model(model_name, device=device)
+
+    def transcribe(
+        self,
+        model: Any,  # noqa: ANN401
+        audio: Any,  # noqa: ANN401
+        language: str | None,
+        precision: str,
+    ) -> dict[str, Any]:
+        return model.transcribe(audio, language=language, fp16=precision == "fp16")
+
+    def detect_language(
+        self,
+        model: Any,  # noqa: ANN401
+        samples: Any,  # noqa: ANN401
+        precision: str,
+    ) -> tuple[str, float]:
+        import whisper
+
+        audio = whisper.pad_or_trim(samples)
+        mel = whisper.log_mel_spectrogram(audio, n_mels=model.dims.n_mels)
+        if precision == "fp16":
+            mel = mel.half()
+        _, probs = model.detect_language(mel.to(model.device))
+        language = max(probs, key=probs.get)
+        return language, float(probs[language])
+
+    def transcribe_windows(
+        self,
+        model: Any,  # noqa: ANN401
+        windows: list[Any],
+        languages: list[str | None],
+        precision: str,
+    ) -> list[dict[str, Any]]:
+        import torch
+
+        import whisper
+
+        # One (batch, n_mels, 3000) tensor through the encoder and decoder
+        mel = torch.stack(
+            [
+                whisper.log_mel_spectrogram(
+                    whisper.pad_or_trim(window), n_mels=model.dims.n_mels
+                )
+                for window in windows
+            ]
+        ).to(model.device)
+        if precision == "fp16":
+            mel = mel.half()
+
+        # DecodingOptions take one language, so windows are grouped by it
+        groups: dict[str | None, list[int]] = {}
+        for index, language in enumerate(languages):
+            groups.setdefault(language, []).append(index)
+
+        results: list[dict[str, Any]] = [{}] * len(windows)
+        for language, indexes in groups.items():
+            options = whisper.DecodingOptions(
+                language=language, fp16=precision == "fp16"
+            )
+            decoded = whisper.decode(model, mel[indexes], options)
+            for index, result in zip(indexes, decoded, strict=True):
+                tokenizer = whisper.tokenizer.get_tokenizer(
+                    model.is_multilingual,
+                    num_languages=model.num_languages,
+                    language=result.language,
+                    task="transcribe",
+                )
+                results[index] = _window_result(
+                    result, tokenizer, len(windows[index]) / WHISPER_SAMPLE_RATE
+                )
+        return results
+
+
+class FasterWhisperBackend(Backend):
+    """CTranslate2 inference through the faster-whisper package."""
+
+    name = "faster-whisper"
+    default_precision = "int8"
+    precisions = ("int8", "int8_float16", "int8_float32", "float16", "float32")
+
+    def load(self, model_name: str, device: str | None, precision: str) -> Any:  # noqa: ANN401
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            raise RuntimeError(
+                "The faster-whisper backend requires the faster-whisper package. "
+                "Install it with: pip install 'yt-whisper[faster-whisper]'"
+            ) from None
+
+        return WhisperModel(model_name, device=device or "auto", compute_type=precision)
+
+    def transcribe(
+        self,
+        model: Any,  # noqa: ANN401
+        audio: Any,  # noqa: ANN401
+        language: str | None,
+        precision: str,
+    ) -> dict[str, Any]:
+        # Segments are produced lazily as the audio is decoded
+        segments, info = model.transcribe(audio, language=language)
+        segments = [
+            {
+                "start": segment.start,
+                "end": segment.end,
+                "text": segment.text,
+                "tokens": list(segment.tokens),
+                "avg_logprob": segment.avg_logprob,
+                "no_speech_prob": segment.no_speech_prob,
+            }
+            for segment in segments
+        ]
+        return {
+            "text": "".join(segment["text"] for segment in segments),
+            "segments": segments,
+            "language": info.language,
+        }
+
+    def detect_language(
+        self,
+        model: Any,  # noqa: ANN401
+        samples: Any,  # noqa: ANN401
+        precision: str,
+    ) -> tuple[str, float]:
+        # Language ID runs before the first segment is decoded, so leaving the
+        # segment generator unconsumed skips decoding entirely
+        _, info = model.transcribe(samples, language=None)
+        return info.language, float(info.language_probability)
+
+
+BACKENDS: dict[str, Backend] = {
+    backend.name: backend
+    for backend in (OpenAIWhisperBackend(), FasterWhisperBackend())
+}
+
+
+def get_backend(name: str | None = None) -> Backend:
+    """
+    Look up a backend by name.
+
+    Raises:
+        ValueError: If there is no backend with that name
+    """
+    try:
+        return BACKENDS[name or DEFAULT_BACKEND]
+    except KeyError:
+        raise ValueError(
+            f"Unknown backend: {name}. Choose from: {', '.join(BACKENDS)}"
+        ) from None
+
+
+def resolve_precision(backend: str | None, precision: str | None) -> str:
+    """
+    Pick the backend's default precision if none is given, and validate it.
+
+    Raises:
+        ValueError: If the backend does not support the precision
+    """
+    selected = get_backend(backend)
+    precision = precision or selected.default_precision
+    if precision not in selected.precisions:
+        raise ValueError(
+            f"The {selected.name} backend does not support compute type "
+            f"{precision}. Choose from: {', '.join(selected.precisions)}"
+        )
+    return precision
@@ -0,0 +1,440 @@
+"""
+Batch transcription pipeline.
+
+Downloads run in a bounded pool of I/O workers while transcription workers
+consume finished audio from a queue, so network time overlaps with inference.
+"""
+
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, TextIO
+
+from .backends import DEFAULT_BACKEND, resolve_precision
+from .cache import AudioCache
+from .db import existing_ids, save_many
+from .lib import (
+    build_result,
+    extract_metadata,
+    extract_youtube_id,
+    fetch_audio,
+    run_transcription,
+    version_filter,
+)
+from .models import ModelCache
+from .playlists import is_collection_url, list_entries
+from .timing import peak_rss, reset_peak_rss
+
+if TYPE_CHECKING:
+    # Imported only when batching is used; it loads numpy
+    from .batching import BatchScheduler
+
+_DONE = object()
+
+
+class _ResultWriter:
+    """
+    Buffer finished results and save them in batches.
+
+    A batch is written once it holds ``batch_size`` results or its oldest
+    result has waited ``flush_interval`` seconds, so a crash loses little work
+    while fast runs still commit many videos per transaction.
+    """
+
+    def __init__(
+        self, db_path: str | None, batch_size: int, flush_interval: float
+    ) -> None:
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer: list[dict] = []
+        self._oldest = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, result: dict) -> None:
+        """Queue a result, writing the buffer if it is due."""
+        with self._lock:
+            if not self._buffer:
+                self._oldest = time.monotonic()
+            self._buffer.append(result)
+            due = (
+                len(self._buffer) >= self.batch_size
+                or time.monotonic() - self._oldest >= self.flush_interval
+            )
+            if due:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        """Write all buffered results."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if self._buffer:
+            save_many(self._buffer, self.db_path, batch_size=self.batch_size)
+            self._buffer = []
+
+
+def read_urls(stream: TextIO) -> list[str]:
+    """
+    Read URLs from a file-like object, one per line.
+
+    Blank lines and lines starting with '#' are ignored.
+    """
+    urls = []
+    for line in stream:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            urls.append(line)
+    return urls
+
+
+def _download_stage(
+    url: str,
+    youtube_id: str,
+    work_dir: str,
+    force: bool,
+    native_audio: bool,
+    cache: AudioCache | None,
+    ready: "queue.Queue[Any]",
+    failures: list[dict[str, str]],
+) -> None:
+    """Download one video and hand it to the transcription workers."""
+    from .audio import decode_audio
+
+    video_dir = os.path.join(work_dir, youtube_id)
+    os.makedirs(video_dir, exist_ok=True)
+    try:
+        audio_file, metadata_file = fetch_audio(
+            youtube_id, video_dir, force, native=native_audio, cache=cache
+        )
+        metadata, raw_metadata = extract_metadata(metadata_file)
+        if native_audio:
+            # Decode here so ffmpeg overlaps with inference; the PCM waits on
+            # disk rather than in memory while the video is queued
+            pcm_file = os.path.join(video_dir, f"ytw_pcm_{youtube_id}.f32")
+            decode_audio(audio_file, mmap_path=pcm_file)
+            if cache is None:
+                os.remove(audio_file)
+            audio_file = pcm_file
+    except Exception as e:
+        shutil.rmtree(video_dir, ignore_errors=True)
+        failures.append({"url": url, "id": youtube_id, "error": str(e)})
+        return
+
+    # Blocks when the transcription side falls behind, bounding disk usage
+    ready.put((url, youtube_id, video_dir, audio_file, metadata, raw_metadata))
+
+
+def _transcribe_stage(
+    ready: "queue.Queue[Any]",
+    model_cache: ModelCache | None,
+    scheduler: "BatchScheduler | None",
+    model_name: str,
+    language: str | None,
+    backend: str,
+    compute_type: str,
+    vad: bool,
+    stream: bool,
+    measure_rss: bool,
+    writer: _ResultWriter | None,
+    results: list[dict],
+    failures: list[dict[str, str]],
+    on_result: Callable[[dict], None] | None,
+) -> None:
+    """
+    Consume downloaded audio from the queue until the sentinel arrives.
+
+    With measure_rss, this is the only thread transcribing, and each result
+    gets the peak memory of its own transcription.
+    """
+    from .audio import open_pcm
+
+    while True:
+        item = ready.get()
+        if item is _DONE:
+            return
+
+        url, youtube_id, video_dir, audio_file, metadata, raw_metadata = item
+        try:
+            audio = open_pcm(audio_file) if audio_file.endswith(".f32") else audio_file
+            if measure_rss:
+                reset_peak_rss()
+            if scheduler:
+                transcription = scheduler.transcribe(audio, vad=vad)
+            else:
+                transcription = run_transcription(
+                    audio,
+                    model_name=model_name,
+                    language=language,
+                    backend=backend,
+                    compute_type=compute_type,
+                    vad=vad,
+                    model_cache=model_cache,
+                    stream=stream,
+                )
+            result = build_result(
+                youtube_id,
+                url,
+                metadata,
+                raw_metadata,
+                transcription["text"],
+                transcription["segments"],
+                model_name=transcription["model"],
+                language=transcription["language"],
+                language_probability=transcription["language_probability"],
+                backend=transcription["backend"],
+                options=transcription["options"],
+            )
+            if measure_rss:
+                result["peak_rss"] = peak_rss()
+            if "vad" in transcription:
+                result["vad"] = transcription["vad"]
+            if writer:
+                writer.add(result)
+            results.append(result)
+            if on_result:
+                on_result(result)
+        except Exception as e:
+            failures.append({"url": url, "id": youtube_id, "error": str(e)})
+        finally:
+            shutil.rmtree(video_dir, ignore_errors=True)
+
+
+def transcribe_batch(
+    urls: Iterable[str],
+    force: bool = False,
+    model_name: str = "base",
+    language: str | None = None,
+    download_workers: int = 4,
+    transcribe_workers: int = 1,
+    queue_size: int | None = None,
+    save: bool = True,
+    db_path: str | None = None,
+    on_result: Callable[[dict], None] | None = None,
+    write_batch_size: int = 100,
+    flush_interval: float = 30.0,
+    native_audio: bool = False,
+    use_cache: bool = False,
+    match_model: bool = True,
+    backend: str = DEFAULT_BACKEND,
+    compute_type: str | None = None,
+    vad: bool = False,
+    batch_size: int = 1,
+    stream: bool = False,
+) -> dict:
+    """
+    Download and transcribe many YouTube videos with overlapping stages.
+
+    Args:
+        urls: YouTube URLs to process. Playlist and channel URLs are expanded
+            into their videos.
+        force: Re-transcribe videos that are already in the database
+        model_name: Name of the Whisper model to use
+        language: Language code. If None, will auto-detect.
+        download_workers: Maximum number of concurrent downloads
+        transcribe_workers: Maximum number of concurrent transcriptions. Each
+            worker beyond the first loads its own copy of the model.
+        queue_size: Maximum number of downloaded videos waiting for
+            transcription (default: twice the number of download workers)
+        save: Whether to save results to the database
+        db_path: Optional custom path to the database file
+        on_result: Optional callback invoked with each finished result
+        write_batch_size: Maximum number of results saved per transaction
+        flush_interval: Maximum seconds a finished result waits to be saved
+        native_audio: Download the original audio stream and decode it once to
+            PCM instead of converting it to MP3 first
+        use_cache: Reuse audio from the on-disk audio cache and store new
+            downloads in it
+        match_model: Only skip videos that already have a transcript made with
+            the same model, backend and options (and language, if one is
+            given), so a run with a better model adds that version. If False,
+            any transcript counts.
+        backend: Inference backend ('openai-whisper' or 'faster-whisper')
+        compute_type: Precision or quantization for the backend
+        vad: Only transcribe the parts of each video that contain speech
+        batch_size: Decode up to this many 30-second windows, from as many
+            videos as are in flight, in one batched forward pass on a single
+            model (see yt_whisper.batching). 1 transcribes each video alone.
+        stream: Transcribe each video in bounded windows instead of all at
+            once, so memory does not grow with its length. Ignored with
+            batch_size above 1, which already works on windows.
+
+    Returns:
+        Dictionary with the results, failures and throughput summary,
+        including the process's 'peak_rss' in bytes during the run. Results
+        have their own 'peak_rss' when videos are transcribed one at a time
+        (one transcribe worker, no batching); concurrent transcriptions share
+        the process, so their memory cannot be told apart.
+
+    Raises:
+        ValueError: If batching is combined with model 'auto' and no language
+    """
+    from .language import AUTO_MODEL, route_model
+
+    start = time.perf_counter()
+    reset_peak_rss()
+    compute_type = resolve_precision(backend, compute_type)
+    stream = stream and batch_size <= 1
+
+    scheduler = None
+    if batch_size > 1:
+        from .batching import BatchScheduler
+
+        # Windows in one batch share a model, so it must be known up front
+        batch_model = model_name
+        if model_name == AUTO_MODEL:
+            if language is None:
+                raise ValueError("Batching with model 'auto' needs a language")
+            batch_model = route_model(language)
+        scheduler = BatchScheduler(
+            batch_model,
+            language,
+            batch_size=batch_size,
+            backend=backend,
+            compute_type=compute_type,
+        )
+        # Enough videos in flight to fill a batch even when they are short
+        transcribe_workers = max(transcribe_workers, batch_size)
+
+    results: list[dict] = []
+    failures: list[dict[str, str]] = []
+    skipped: list[str] = []
+
+    pending: dict[str, str] = {}
+    for url in urls:
+        if is_collection_url(url):
+            try:
+                _, entries = list_entries(url)
+            except Exception as e:
+                failures.append({"url": url, "id": "", "error": str(e)})
+                continue
+            for entry in entries:
+                pending.setdefault(entry["id"], entry["url"])
+            continue
+
+        youtube_id = extract_youtube_id(url)
+        if not youtube_id:
+            failures.append({"url": url, "id": "", "error": "Invalid YouTube URL"})
+            continue
+        pending.setdefault(youtube_id, url)
+
+    # Filter out finished videos with one query before any downloads start
+    if not force:
+        match = (
+            version_filter(
+                model_name,
+                language,
+                backend,
+                compute_type,
+                vad,
+                batched=batch_size > 1,
+                streamed=stream,
+            )
+            if match_model
+            else {}
+        )
+        done = existing_ids(pending, db_path=db_path, **match)
+        skipped = [youtube_id for youtube_id in pending if youtube_id in done]
+        for youtube_id in skipped:
+            del pending[youtube_id]
+
+    download_workers = max(1, download_workers)
+    transcribe_workers = max(1, transcribe_workers)
+    ready: queue.Queue[Any] = queue.Queue(maxsize=queue_size or 2 * download_workers)
+    writer = _ResultWriter(db_path, write_batch_size, flush_interval) if save else None
+    cache = AudioCache() if use_cache else None
+
+    # With --model auto a worker holds the language ID and the routed models
+    private_models = 3 if model_name == AUTO_MODEL else 1
+
+    if scheduler:
+        scheduler.start()
+    with tempfile.TemporaryDirectory() as work_dir:
+        consumers = []
+        for _ in range(transcribe_workers):
+            # A Whisper model must not be used by two threads at once, so
+            # extra workers get private models instead of the shared cache
+            model_cache = (
+                ModelCache(max_models=private_models)
+                if transcribe_workers > 1 and scheduler is None
+                else None
+            )
+            thread = threading.Thread(
+                target=_transcribe_stage,
+                args=(
+                    ready,
+                    model_cache,
+                    scheduler,
+                    model_name,
+                    language,
+                    backend,
+                    compute_type,
+                    vad,
+                    stream,
+                    transcribe_workers == 1 and scheduler is None,
+                    writer,
+                    results,
+                    failures,
+                    on_result,
+                ),
+                daemon=True,
+            )
+            thread.start()
+            consumers.append(thread)
+
+        with ThreadPoolExecutor(max_workers=download_workers) as pool:
+            for youtube_id, url in pending.items():
+                pool.submit(
+                    _download_stage,
+                    url,
+                    youtube_id,
+                    work_dir,
+                    force,
+                    native_audio,
+                    cache,
+                    ready,
+                    failures,
+                )
+
+        for _ in consumers:
+            ready.put(_DONE)
+        for thread in consumers:
+            thread.join()
+    if scheduler:
+        scheduler.close()
+
+    if writer:
+        writer.flush()
+
+    wall_time = time.perf_counter() - start
+    audio_seconds = sum(float(r.get("duration") or 0) for r in results)
+    skipped_audio = sum(r["vad"]["skipped_seconds"] for r in results if "vad" in r)
+
+    return {
+        "results": results,
+        "failures": failures,
+        "skipped": skipped,
+        "summary": {
+            "videos": len(results),
+            "failed": len(failures),
+            "skipped": len(skipped),
+            "wall_time": wall_time,
+            "audio_seconds": audio_seconds,
+            "skipped_audio_seconds": skipped_audio,
+            "videos_per_hour": len(results) * 3600 / wall_time if wall_time else 0.0,
+            "audio_seconds_per_second": audio_seconds / wall_time if wall_time else 0.0,
+            "mean_batch_size": scheduler.stats()["mean_batch_size"]
+            if scheduler
+            else 1.0,
+            "peak_rss": max(
+                [peak_rss() or 0, *(r.get("peak_rss") or 0 for r in results)]
+            )
+            or None,
+        },
+    }
@@ -0,0 +1,276 @@
+"""
+Dynamic batching of 30-second windows across videos.
+
+Whisper's encoder and decoder work on 30-second windows. Transcribing videos
+one at a time runs them with a batch size of one, which leaves most of the
+CPU's matrix throughput unused. The BatchScheduler splits the audio of every
+in-flight video into windows cut at pauses, gathers windows from all of them
+into batches on a single inference thread, and routes each window's segments
+back to its video on the original timeline.
+
+Windows are decoded independently, so the text of one window does not prompt
+the next as it does in ``model.transcribe``; a cut in a pause keeps sentences
+whole.
+"""
+
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from .audio import SAMPLE_RATE, decode_audio, find_silence_splits
+from .backends import DEFAULT_BACKEND, get_backend, resolve_precision
+from .lib import normalize_segments, transcription_options
+from .models import ModelCache, get_model
+
+# Target window length. A cut moves up to SEARCH_SECONDS to the quietest
+# moment, so windows stay within Whisper's 30 seconds.
+WINDOW_SECONDS = 24.0
+SEARCH_SECONDS = 5.0
+
+DEFAULT_BATCH_SIZE = 8
+
+# How long a partial batch waits for windows from other videos
+DEFAULT_MAX_WAIT = 0.05
+
+_STOP = object()
+
+
+def plan_windows(
+    samples: npt.NDArray[np.float32], sample_rate: int = SAMPLE_RATE
+) -> list[tuple[int, int]]:
+    """
+    Split audio into consecutive windows of at most 30 seconds, cut at pauses.
+
+    Returns:
+        (first_sample, last_sample) of each window, covering all the samples
+    """
+    if not len(samples):
+        return []
+    splits = find_silence_splits(
+        samples, WINDOW_SECONDS, sample_rate, search_seconds=SEARCH_SECONDS
+    )
+    bounds = [0, *splits, len(samples)]
+    return list(zip(bounds[:-1], bounds[1:], strict=True))
+
+
+class _Video:
+    """A video waiting for the results of its windows."""
+
+    def __init__(self, windows: int, future: Future) -> None:
+        self.results: list[dict[str, Any] | None] = [None] * windows
+        self.remaining = windows
+        self.future = future
+
+
+class BatchScheduler:
+    """
+    Transcribe windows from many videos in shared batches on one thread.
+
+    Any number of threads can call transcribe() at once; each call blocks
+    until its video is done. The inference thread takes the first waiting
+    window and adds windows that arrive within max_wait until the batch is
+    full, so a lone video is not held back while several videos fill batches.
+
+    Args:
+        model_name: Name of the Whisper model to use
+        language: Language code for every video. If None, each window
+            detects its own and a video gets the most common one.
+        batch_size: Maximum number of windows per forward pass
+        max_wait: Seconds a partial batch waits for more windows
+        backend: Inference backend ('openai-whisper' or 'faster-whisper')
+        compute_type: Precision or quantization for the backend
+        model_cache: Cache to load the model from instead of the shared one
+    """
+
+    def __init__(
+        self,
+        model_name: str = "base",
+        language: str | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_wait: float = DEFAULT_MAX_WAIT,
+        backend: str = DEFAULT_BACKEND,
+        compute_type: str | None = None,
+        model_cache: ModelCache | None = None,
+    ) -> None:
+        self.model_name = model_name
+        self.language = language
+        self.batch_size = max(1, batch_size)
+        self.max_wait = max_wait
+        self.backend = backend
+        self.compute_type = resolve_precision(backend, compute_type)
+        self.model_cache = model_cache
+        self.batches = 0
+        self.windows = 0
+        self._queue: queue.Queue[Any] = queue.Queue()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> "BatchScheduler":  # noqa: PYI034
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def start(self) -> None:
+        """Start the inference thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def close(self) -> None:
+        """Finish the queued windows and stop the inference thread."""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> dict[str, float]:
+        """Number of batches and windows run, and the mean batch size."""
+        return {
+            "batches": self.batches,
+            "windows": self.windows,
+            "mean_batch_size": self.windows / self.batches if self.batches else 0.0,
+        }
+
+    def submit(self, samples: npt.NDArray[np.float32]) -> Future:
+        """
+        Queue the windows of 16 kHz float32 samples for transcription.
+
+        Returns:
+            Future for the transcription, see transcribe()
+        """
+        future: Future = Future()
+        windows = plan_windows(samples)
+        if not windows:
+            future.set_result(self._merge([], []))
+            return future
+
+        video = _Video(len(windows), future)
+        for index, (first, last) in enumerate(windows):
+            self._queue.put((video, index, first / SAMPLE_RATE, samples[first:last]))
+        return future
+
+    def transcribe(self, audio: Any, vad: bool = False) -> dict[str, Any]:  # noqa: ANN401
+        """
+        Transcribe a file path or 16 kHz float32 samples in shared batches.
+
+        Decoding and voice activity detection run on the calling thread, so
+        they overlap with inference for other videos.
+
+        Args:
+            audio: Path to the audio file, or 16 kHz mono float32 samples
+            vad: Only transcribe the parts of the audio that contain speech
+
+        Returns:
+            Dictionary with the 'text', 'segments', 'language',
+            'language_probability', 'model', 'backend' and 'options', as from
+            run_transcription().
+            With vad, also 'vad'.
+        """
+        from .vad import find_speech, join_regions, remap_segments, speech_stats
+
+        samples = decode_audio(audio) if isinstance(audio, str) else audio
+        if not vad:
+            result = self.submit(samples).result()
+        else:
+            regions = find_speech(samples)
+            stats = speech_stats(regions, len(samples))
+            result = self.submit(join_regions(samples, regions)).result()
+            result["segments"] = remap_segments(result["segments"], regions)
+            result["vad"] = stats
+        result["options"] = transcription_options(self.compute_type, vad, batched=True)
+        return result
+
+    def _next_batch(self) -> list[Any] | None:
+        """Wait for a window, then gather more until the batch is full or due."""
+        item = self._queue.get()
+        if item is _STOP:
+            return None
+        batch = [item]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is _STOP:
+                # Finish this batch first, then stop
+                self._queue.put(_STOP)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self) -> None:
+        load = self.model_cache.get if self.model_cache else get_model
+        backend = get_backend(self.backend)
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                model = load(
+                    self.model_name, precision=self.compute_type, backend=self.backend
+                )
+                results = backend.transcribe_windows(
+                    model,
+                    [samples for _, _, _, samples in batch],
+                    [self.language] * len(batch),
+                    self.compute_type,
+                )
+            except Exception as e:
+                for video in {id(item[0]): item[0] for item in batch}.values():
+                    if not video.future.done():
+                        video.future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.windows += len(batch)
+            for (video, index, offset, _), result in zip(batch, results, strict=True):
+                self._route(video, index, offset, result)
+
+    def _route(
+        self, video: _Video, index: int, offset: float, result: dict[str, Any]
+    ) -> None:
+        """Store a window's result on the original timeline of its video."""
+        if video.future.done():
+            # Another window of the video failed
+            return
+        result["segments"] = [
+            {
+                **segment,
+                "start": segment["start"] + offset,
+                "end": segment["end"] + offset,
+            }
+            for segment in result.get("segments") or []
+        ]
+        video.results[index] = result
+        video.remaining -= 1
+        if not video.remaining:
+            segments = [
+                segment for window in video.results for segment in window["segments"]
+            ]
+            languages = [window.get("language") for window in video.results]
+            video.future.set_result(self._merge(segments, languages))
+
+    def _merge(
+        self, segments: list[dict[str, Any]], languages: list[str | None]
+    ) -> dict[str, Any]:
+        """Build the result of a video from the segments of its windows."""
+        language = self.language
+        if language is None:
+            counts = Counter(lang for lang in languages if lang)
+            language = counts.most_common(1)[0][0] if counts else None
+        return {
+            "text": "".join(segment["text"] for segment in segments),
+            "segments": normalize_segments(segments),
+            "language": language,
+            "language_probability": None,
+            "model": self.model_name,
+            "backend": self.backend,
+        }
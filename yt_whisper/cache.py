@@ -0,0 +1,265 @@
+"""
+Content-addressed on-disk cache of downloaded audio.
+
+Entries are keyed by YouTube ID and audio format, so re-running a video with a
+different model reuses the audio instead of downloading it again. Each entry
+records the SHA-256 of its audio file, which is verified before reuse, and the
+least recently used entries are evicted when the cache grows past its size
+limit. Lookups, stores and evictions hold a lock file in the cache directory,
+so threads and processes using the same cache take turns.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from .storage import get_audio_cache_dir
+
+# Default cache size limit, overridable with YT_WHISPER_CACHE_SIZE (e.g. "20G")
+DEFAULT_MAX_SIZE = "5G"
+
+_ENTRY_FILE = "entry.json"
+_LOCK_FILE = ".lock"
+_SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+
+def parse_size(size: str) -> int:
+    """
+    Parse a human readable size such as '500M' or '2.5G' into bytes.
+
+    Raises:
+        ValueError: If the size cannot be parsed
+    """
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)i?B?\s*", size.upper())
+    if not match:
+        raise ValueError(f"Invalid size: {size!r}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+
+
+def format_size(num_bytes: int) -> str:
+    """Format a byte count for display, e.g. '1.5G'."""
+    value = float(num_bytes)
+    for unit in ("B", "K", "M", "G"):
+        if value < 1024:
+            return f"{value:.1f}{unit}" if unit != "B" else f"{int(value)}B"
+        value /= 1024
+    return f"{value:.1f}T"
+
+
+# Lock per cache directory shared by all AudioCache instances in this process;
+# the lock file only excludes other processes where fcntl is available
+_dir_locks: dict[Path, threading.Lock] = {}
+_dir_locks_guard = threading.Lock()
+
+
+def _dir_lock(cache_dir: Path) -> threading.Lock:
+    """Return the process-wide lock of a cache directory."""
+    with _dir_locks_guard:
+        return _dir_locks.setdefault(cache_dir.resolve(), threading.Lock())
+
+
+def _sha256(path: Path) -> str:
+    """Hash a file in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AudioCache:
+    """
+    Size-bounded LRU cache of downloaded audio files.
+
+    Args:
+        cache_dir: Cache directory (default: the platform-specific data directory)
+        max_bytes: Size limit in bytes (default: YT_WHISPER_CACHE_SIZE or 5G)
+    """
+
+    def __init__(
+        self, cache_dir: str | Path | None = None, max_bytes: int | None = None
+    ) -> None:
+        self.cache_dir = Path(cache_dir) if cache_dir else get_audio_cache_dir()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        if max_bytes is None:
+            max_bytes = parse_size(
+                os.environ.get("YT_WHISPER_CACHE_SIZE", DEFAULT_MAX_SIZE)
+            )
+        self.max_bytes = max_bytes
+        self._thread_lock = _dir_lock(self.cache_dir)
+
+    @contextmanager
+    def _lock(self) -> Iterator[None]:
+        """Hold the cache directory against other threads and processes."""
+        with self._thread_lock:
+            try:
+                import fcntl
+            except ImportError:
+                yield
+                return
+            with open(self.cache_dir / _LOCK_FILE, "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _entry_dir(self, youtube_id: str, audio_format: str) -> Path:
+        return self.cache_dir / f"{youtube_id}-{audio_format}"
+
+    def _read_entry(self, entry_dir: Path) -> dict[str, Any] | None:
+        try:
+            with open(entry_dir / _ENTRY_FILE, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def _write_entry(self, entry_dir: Path, entry: dict[str, Any]) -> None:
+        tmp_file = entry_dir / f".{_ENTRY_FILE}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_file, entry_dir / _ENTRY_FILE)
+
+    def lookup(self, youtube_id: str, audio_format: str) -> tuple[str, str] | None:
+        """
+        Find cached audio for a video, verifying its checksum.
+
+        Args:
+            youtube_id: The YouTube video ID
+            audio_format: Audio format of the entry ('mp3' or 'native')
+
+        Returns:
+            Tuple of (audio_file_path, metadata_file_path), or None on a miss.
+            Corrupt entries are removed and reported as a miss.
+        """
+        entry_dir = self._entry_dir(youtube_id, audio_format)
+        with self._lock():
+            entry = self._read_entry(entry_dir)
+            if entry is None:
+                return None
+
+            audio_file = entry_dir / entry["audio"]
+            metadata_file = entry_dir / entry["metadata"]
+            try:
+                valid = (
+                    metadata_file.exists() and _sha256(audio_file) == entry["sha256"]
+                )
+            except OSError:
+                valid = False
+            if not valid:
+                print(f"Discarding corrupt cache entry: {entry_dir}")
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                return None
+
+            entry["last_used"] = time.time()
+            self._write_entry(entry_dir, entry)
+
+        print(f"Using cached audio: {audio_file}")
+        return str(audio_file), str(metadata_file)
+
+    def store(
+        self, youtube_id: str, audio_format: str, audio_file: str, metadata_file: str
+    ) -> tuple[str, str]:
+        """
+        Move downloaded files into the cache.
+
+        Args:
+            youtube_id: The YouTube video ID
+            audio_format: Audio format of the entry ('mp3' or 'native')
+            audio_file: Path to the downloaded audio file
+            metadata_file: Path to the downloaded info JSON file
+
+        Returns:
+            Tuple of (audio_file_path, metadata_file_path) inside the cache
+        """
+        entry_dir = self._entry_dir(youtube_id, audio_format)
+
+        # Assemble the entry next to its final location, then swap it in
+        staging = Path(tempfile.mkdtemp(prefix=".staging-", dir=self.cache_dir))
+        audio_name = os.path.basename(audio_file)
+        metadata_name = os.path.basename(metadata_file)
+        shutil.move(audio_file, staging / audio_name)
+        shutil.move(metadata_file, staging / metadata_name)
+        self._write_entry(
+            staging,
+            {
+                "id": youtube_id,
+                "format": audio_format,
+                "audio": audio_name,
+                "metadata": metadata_name,
+                "sha256": _sha256(staging / audio_name),
+                "size": (staging / audio_name).stat().st_size
+                + (staging / metadata_name).stat().st_size,
+                "last_used": time.time(),
+            },
+        )
+
+        with self._lock():
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(staging, entry_dir)
+
+        self.prune(exclude=entry_dir)
+        return str(entry_dir / audio_name), str(entry_dir / metadata_name)
+
+    def _entries(self) -> list[tuple[Path, dict[str, Any]]]:
+        entries = []
+        for entry_dir in self.cache_dir.iterdir():
+            if entry_dir.is_dir() and not entry_dir.name.startswith("."):
+                entry = self._read_entry(entry_dir)
+                if entry is not None:
+                    entries.append((entry_dir, entry))
+        return entries
+
+    def stats(self) -> dict[str, Any]:
+        """Report the number of entries and bytes used by the cache."""
+        with self._lock():
+            entries = self._entries()
+        return {
+            "path": str(self.cache_dir),
+            "entries": len(entries),
+            "bytes": sum(entry["size"] for _, entry in entries),
+            "max_bytes": self.max_bytes,
+        }
+
+    def prune(self, max_bytes: int | None = None, exclude: Path | None = None) -> int:
+        """
+        Evict least recently used entries until the cache fits its size limit.
+
+        Args:
+            max_bytes: Size limit to prune to (default: the cache's limit)
+            exclude: Entry directory that must not be evicted
+
+        Returns:
+            int: Number of entries removed
+        """
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        removed = 0
+        with self._lock():
+            entries = sorted(self._entries(), key=lambda item: item[1]["last_used"])
+            total = sum(entry["size"] for _, entry in entries)
+            for entry_dir, entry in entries:
+                if total <= limit:
+                    break
+                if entry_dir == exclude:
+                    continue
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                total -= entry["size"]
+                removed += 1
+        return removed
+
+    def clear(self) -> int:
+        """Remove every entry from the cache and return how many were removed."""
+        with self._lock():
+            entries = self._entries()
+            for entry_dir, _ in entries:
+                shutil.rmtree(entry_dir, ignore_errors=True)
+        return len(entries)
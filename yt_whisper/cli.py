@@ -6,40 +6,836 @@ from typing import TextIO
 
 import click
 
-from . import __version__
-from .db import delete_video, get_db_path, get_transcript, list_transcripts, save_to_db
-from .lib import download_and_transcribe, extract_youtube_id, is_ffmpeg_available
+from .backends import BACKENDS, DEFAULT_BACKEND, resolve_precision
+from .batch import read_urls, transcribe_batch
+from .cache import AudioCache, format_size, parse_size
+from .client import DaemonUnavailableError, daemon_client, via_daemon
+from .client import socket_path as default_socket_path
+from .db import (
+    compact_metadata,
+    delete_video,
+    encode_cursor,
+    existing_ids,
+    get_db_path,
+    get_segments,
+    get_transcript,
+    get_versions,
+    get_video_info,
+    iter_transcripts,
+    list_channels,
+    list_transcripts,
+    record_run,
+    save_to_db,
+    search_segments,
+    search_transcripts,
+)
+from .jobs import (
+    DEFAULT_MAX_ATTEMPTS,
+    enqueue,
+    job_counts,
+    retry_failed,
+    run_worker,
+)
+from .lib import (
+    download_and_detect_language,
+    download_and_transcribe,
+    extract_youtube_id,
+    is_ffmpeg_available,
+    version_filter,
+)
+from .playlists import is_collection_url, sync_channel
+from .timing import Timings, format_profile
+
+
+def _require_ffmpeg() -> None:
+    """Exit with an error message if FFmpeg is not available."""
+    if not is_ffmpeg_available():
+        click.echo(
+            "Error: FFmpeg is not installed or not found in your system's PATH. "
+            "FFmpeg is required for audio processing. "
+            "Please install it and try again. "
+            "You can find installation instructions at https://ffmpeg.org/download.html",
+            err=True,
+        )
+        sys.exit(1)
+
+
+def _check_compute_type(backend: str, compute_type: str | None) -> str:
+    """Resolve the compute type for a backend, or fail as a usage error."""
+    try:
+        return resolve_precision(backend, compute_type)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="'--compute-type'") from None
+
+
+def _print_version(ctx: click.Context, param: click.Parameter, value: bool) -> None:
+    """Print the version, which is only looked up when asked for."""
+    if not value or ctx.resilient_parsing:
+        return
+    from . import __version__
+
+    click.echo(f"{ctx.find_root().info_name}, version {__version__}")
+    ctx.exit()
+
+
+@click.group()
+@click.option(
+    "--version",
+    is_flag=True,
+    expose_value=False,
+    is_eager=True,
+    callback=_print_version,
+    help="Show the version and exit.",
+)
+def cli() -> None:
+    """Download and transcribe YouTube videos to sqliteusing Whisper.
+
+    Use the 'db' command to view the current database location.
+    """
+    pass
+
+
+@cli.command()
+@click.argument("url")
+@click.option(
+    "-f",
+    "--force",
+    is_flag=True,
+    help="Force re-download and transcription even if already in database",
+)
+@click.option("--no-save", is_flag=True, help="Don't save to database")
+@click.option(
+    "--db-path",
+    help="Custom path to SQLite database",
+    default=None,
+    type=click.Path(dir_okay=False),
+)
+@click.option(
+    "--model",
+    default="base",
+    help="Whisper model to use (tiny, base, small, medium, large), or auto to "
+    "detect the language and pick an English-only or multilingual model",
+    show_default=True,
+)
+@click.option(
+    "--language",
+    help="Language code (e.g., 'en', 'es', 'fr'). Auto-detected if not specified.",
+    default=None,
+)
+@click.option(
+    "--native-audio",
+    is_flag=True,
+    help="Decode the original audio stream directly instead of converting to MP3",
+)
+@click.option(
+    "--cache",
+    "use_cache",
+    is_flag=True,
+    help="Reuse downloaded audio from the audio cache and add new downloads to it",
+)
+@click.option(
+    "--workers",
+    default=1,
+    help="Split long videos at pauses and transcribe the chunks in this many "
+    "processes (one model each)",
+    show_default=True,
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Print how long each stage took and record the timings in the runs table",
+)
+@click.option(
+    "--backend",
+    type=click.Choice(list(BACKENDS)),
+    default=DEFAULT_BACKEND,
+    help="Inference backend. faster-whisper runs quantized models, much faster "
+    "on CPU (pip install faster-whisper)",
+    show_default=True,
+)
+@click.option(
+    "--compute-type",
+    default=None,
+    help="Precision: fp32 or fp16 for openai-whisper; int8, int8_float16, "
+    "float16 or float32 for faster-whisper (default: fp32 / int8)",
+)
+@click.option(
+    "--vad",
+    is_flag=True,
+    help="Skip stretches without speech (intros, outros, dead air) and only "
+    "transcribe the rest",
+)
+@click.option(
+    "--stream",
+    is_flag=True,
+    help="Decode and transcribe in 30 second windows so memory stays flat "
+    "however long the video is",
+)
+def transcribe(
+    url: str,
+    force: bool,
+    no_save: bool,
+    db_path: str | None,
+    model: str,
+    language: str | None,
+    native_audio: bool,
+    use_cache: bool,
+    workers: int,
+    profile: bool,
+    backend: str,
+    compute_type: str | None,
+    vad: bool,
+    stream: bool,
+) -> None:
+    """
+    Download and transcribe a YouTube video, playlist or channel.
+
+    Example usage:
+        yt-whisper transcribe https://www.youtube.com/watch?v=VIDEO_ID
+        yt-whisper transcribe https://www.youtube.com/@CHANNEL
+    """
+    # Check for FFmpeg first
+    _require_ffmpeg()
+    compute_type = _check_compute_type(backend, compute_type)
+
+    if is_collection_url(url):
+        # Playlists and channels go through the batch pipeline
+        batch = transcribe_batch(
+            [url],
+            force=force,
+            model_name=model,
+            language=language,
+            save=not no_save,
+            db_path=db_path,
+            on_result=lambda r: _report_result(r, memory=stream),
+            native_audio=native_audio,
+            use_cache=use_cache,
+            backend=backend,
+            compute_type=compute_type,
+            vad=vad,
+            stream=stream,
+        )
+        _print_batch_summary(batch)
+        if batch["failures"]:
+            sys.exit(1)
+        return
+
+    try:
+        # Validate URL
+        youtube_id = extract_youtube_id(url)
+        if not youtube_id:
+            click.echo(f"Error: Could not extract YouTube ID from URL: {url}", err=True)
+            sys.exit(1)
+
+        # Check if already in database
+        existing = (
+            None if force else via_daemon(get_video_info, db_path)(youtube_id, db_path)
+        )
+        match = version_filter(
+            model, language, backend, compute_type, vad, streamed=stream
+        )
+        if existing and match:
+            # A transcript made another way is kept; this one is added as a
+            # version and shown by get if it is better
+            done = via_daemon(existing_ids, db_path)(
+                [youtube_id], db_path=db_path, **match
+            )
+            if not done:
+                click.echo(
+                    f"Adding a {match['model_name']} transcript to: {existing['title']}"
+                )
+                existing = None
+        if existing:
+            click.echo(f"Video already transcribed: {existing['title']}")
+            click.echo(f"Channel: {existing['channel']}")
+            click.echo(f"Author: {existing.get('author', 'Unknown')}")
+            click.echo(f"To view the transcript, use: yt-whisper get {youtube_id}")
+            click.echo("To force re-transcription, use the -f/--force flag")
+            sys.exit(0)
+
+        # Download and transcribe, with the daemon's warm models if one runs
+        options = {
+            "force": force,
+            "model_name": model,
+            "language": language,
+            "native_audio": native_audio,
+            "use_cache": use_cache,
+            "workers": workers,
+            "backend": backend,
+            "compute_type": compute_type,
+            "vad": vad,
+            "stream": stream,
+        }
+        result = None
+        client = daemon_client(db_path)
+        if client is not None:
+            try:
+                result = client.transcribe(url, save=not no_save, **options)
+            except DaemonUnavailableError:
+                pass
+        saved = result is not None and not no_save
+        if result is None:
+            result = download_and_transcribe(url, **options)
+
+        # Print summary
+        click.echo(f"Successfully transcribed: {result['title']}")
+        click.echo(f"Channel: {result['channel']}")
+        click.echo(f"Author: {result['author']}")
+        click.echo(f"YouTube ID: {result['id']}")
+        click.echo(f"Duration: {result['duration']} seconds")
+        if "vad" in result:
+            stats = result["vad"]
+            click.echo(
+                f"Skipped without speech: {stats['skipped_seconds']:.1f} of "
+                f"{stats['audio_seconds']:.1f} seconds"
+            )
+
+        # Save to database unless --no-save flag is used
+        timings = Timings()
+        timings.spans.update(result.get("timings", {}))
+        if not no_save:
+            if not saved:
+                with timings.span("db_write"):
+                    save_to_db(result, db_path)
+            db_file = db_path or get_db_path()
+            click.echo(f"Saved to database: {db_file}")
+
+        if profile or stream:
+            if result.get("peak_rss"):
+                click.echo(f"Peak memory: {format_size(result['peak_rss'])}")
+        if profile:
+            click.echo()
+            for line in format_profile(timings.as_dict(), result["duration"] or 0):
+                click.echo(line)
+            if not no_save:
+                record_run(
+                    youtube_id,
+                    timings.as_dict(),
+                    # With --model auto, the model the language was routed to
+                    model_name=result.get("model") or model,
+                    audio_duration=result["duration"],
+                    db_path=db_path,
+                )
+
+    except Exception as e:
+        click.echo(f"Error: {str(e)}", err=True)
+        sys.exit(1)
+
+
+def _report_result(result: dict, memory: bool = False) -> None:
+    """Print a video finished by transcribe_batch(), with its peak memory."""
+    line = f"Transcribed: {result['title']} ({result['id']})"
+    if memory and result.get("peak_rss"):
+        line += f", peak memory {format_size(result['peak_rss'])}"
+    click.echo(line)
+
+
+def _print_batch_summary(batch: dict) -> None:
+    """Print the failures and throughput of a transcribe_batch() run."""
+    for failure in batch["failures"]:
+        click.echo(f"Failed: {failure['url']}: {failure['error']}", err=True)
+
+    summary = batch["summary"]
+    click.echo("-" * 80)
+    click.echo(
+        f"Transcribed: {summary['videos']} | Skipped: {summary['skipped']} | "
+        f"Failed: {summary['failed']}"
+    )
+    click.echo(
+        f"Wall time: {summary['wall_time']:.1f}s | "
+        f"Audio: {summary['audio_seconds']:.0f}s"
+    )
+    if summary.get("mean_batch_size", 1.0) > 1.0:
+        click.echo(f"Mean batch size: {summary['mean_batch_size']:.1f} windows")
+    if summary.get("peak_rss"):
+        click.echo(f"Peak memory: {format_size(summary['peak_rss'])}")
+    if summary.get("skipped_audio_seconds"):
+        click.echo(f"Skipped without speech: {summary['skipped_audio_seconds']:.0f}s")
+    click.echo(
+        f"Throughput: {summary['videos_per_hour']:.1f} videos/hour | "
+        f"{summary['audio_seconds_per_second']:.2f} audio-seconds per wall-second"
+    )
+
+
+@cli.command("detect-language")
+@click.argument("url")
+@click.option(
+    "--windows",
+    default=1,
+    help="Number of 30 second windows to sample across the audio",
+    show_default=True,
+)
+@click.option(
+    "--native-audio",
+    is_flag=True,
+    help="Decode the original audio stream directly instead of converting to MP3",
+)
+@click.option(
+    "--cache",
+    "use_cache",
+    is_flag=True,
+    help="Reuse downloaded audio from the audio cache and add new downloads to it",
+)
+@click.option(
+    "--backend",
+    type=click.Choice(list(BACKENDS)),
+    default=DEFAULT_BACKEND,
+    help="Inference backend",
+    show_default=True,
+)
+@click.option("--json", "output_json", is_flag=True, help="Output as JSON")
+def detect_language_command(
+    url: str,
+    windows: int,
+    native_audio: bool,
+    use_cache: bool,
+    backend: str,
+    output_json: bool,
+) -> None:
+    """
+    Identify the spoken language of a YouTube video without transcribing it.
+
+    Uses the tiny model on the first 30 seconds (or --windows sampled windows)
+    and shows which model `--model auto` would transcribe it with.
+
+    Example usage:
+        yt-whisper detect-language https://www.youtube.com/watch?v=VIDEO_ID
+    """
+    _require_ffmpeg()
+
+    try:
+        detected = download_and_detect_language(
+            url,
+            windows=windows,
+            native_audio=native_audio,
+            use_cache=use_cache,
+            backend=backend,
+        )
+    except Exception as e:
+        click.echo(f"Error: {str(e)}", err=True)
+        sys.exit(1)
+
+    if output_json:
+        click.echo(json.dumps(detected, indent=2))
+        return
+    click.echo(f"Language: {detected['language']} ({detected['probability']:.0%})")
+    click.echo(f"Model for --model auto: {detected['model']}")
+
+
+@cli.command("transcribe-batch")
+@click.argument("url_file", type=click.File("r"), default="-")
+@click.option(
+    "-f",
+    "--force",
+    is_flag=True,
+    help="Re-transcribe videos that are already in the database",
+)
+@click.option("--no-save", is_flag=True, help="Don't save to database")
+@click.option(
+    "--db-path",
+    help="Custom path to SQLite database",
+    default=None,
+    type=click.Path(dir_okay=False),
+)
+@click.option(
+    "--model",
+    default="base",
+    help="Whisper model to use (tiny, base, small, medium, large), or auto to "
+    "detect the language and pick an English-only or multilingual model",
+    show_default=True,
+)
+@click.option(
+    "--language",
+    help="Language code (e.g., 'en', 'es', 'fr'). Auto-detected if not specified.",
+    default=None,
+)
+@click.option(
+    "--download-workers",
+    default=4,
+    help="Maximum number of concurrent downloads",
+    show_default=True,
+)
+@click.option(
+    "--transcribe-workers",
+    default=1,
+    help="Maximum number of concurrent transcriptions (one model each)",
+    show_default=True,
+)
+@click.option(
+    "--batch-size",
+    default=1,
+    help="Decode up to this many 30-second windows from several videos in one "
+    "batched pass on a single model",
+    show_default=True,
+)
+@click.option(
+    "--queue-size",
+    default=None,
+    type=int,
+    help="Maximum downloaded videos waiting for transcription",
+)
+@click.option(
+    "--write-batch-size",
+    default=100,
+    help="Maximum number of results saved per database transaction",
+    show_default=True,
+)
+@click.option(
+    "--native-audio",
+    is_flag=True,
+    help="Decode the original audio stream directly instead of converting to MP3",
+)
+@click.option(
+    "--cache",
+    "use_cache",
+    is_flag=True,
+    help="Reuse downloaded audio from the audio cache and add new downloads to it",
+)
+@click.option(
+    "--match-model/--any-model",
+    default=True,
+    help="Skip only videos that already have a transcript made with the same "
+    "model, backend and options (and language), or videos with any transcript",
+    show_default=True,
+)
+@click.option(
+    "--backend",
+    type=click.Choice(list(BACKENDS)),
+    default=DEFAULT_BACKEND,
+    help="Inference backend. faster-whisper runs quantized models, much faster "
+    "on CPU (pip install faster-whisper)",
+    show_default=True,
+)
+@click.option(
+    "--compute-type",
+    default=None,
+    help="Precision: fp32 or fp16 for openai-whisper; int8, int8_float16, "
+    "float16 or float32 for faster-whisper (default: fp32 / int8)",
+)
+@click.option(
+    "--vad",
+    is_flag=True,
+    help="Skip stretches without speech (intros, outros, dead air) and only "
+    "transcribe the rest",
+)
+@click.option(
+    "--stream",
+    is_flag=True,
+    help="Decode and transcribe in 30 second windows so memory stays flat "
+    "however long the video is",
+)
+def transcribe_batch_command(
+    url_file: TextIO,
+    force: bool,
+    no_save: bool,
+    db_path: str | None,
+    model: str,
+    language: str | None,
+    download_workers: int,
+    transcribe_workers: int,
+    batch_size: int,
+    queue_size: int | None,
+    write_batch_size: int,
+    native_audio: bool,
+    use_cache: bool,
+    match_model: bool,
+    backend: str,
+    compute_type: str | None,
+    vad: bool,
+    stream: bool,
+) -> None:
+    """
+    Download and transcribe many YouTube videos.
+
+    URLs are read one per line from URL_FILE, or from stdin if omitted.
+
+    Example usage:
+        yt-whisper transcribe-batch urls.txt --download-workers 8
+    """
+    _require_ffmpeg()
+    compute_type = _check_compute_type(backend, compute_type)
+    if batch_size > 1 and model == "auto" and language is None:
+        raise click.BadParameter(
+            "Batching with --model auto needs --language", param_hint="'--batch-size'"
+        )
+
+    urls = read_urls(url_file)
+    if not urls:
+        click.echo("No URLs to process.")
+        return
+
+    batch = transcribe_batch(
+        urls,
+        force=force,
+        model_name=model,
+        language=language,
+        download_workers=download_workers,
+        transcribe_workers=transcribe_workers,
+        queue_size=queue_size,
+        save=not no_save,
+        db_path=db_path,
+        on_result=lambda r: _report_result(r, memory=stream),
+        write_batch_size=write_batch_size,
+        native_audio=native_audio,
+        use_cache=use_cache,
+        match_model=match_model,
+        backend=backend,
+        compute_type=compute_type,
+        vad=vad,
+        stream=stream,
+        batch_size=batch_size,
+    )
+
+    _print_batch_summary(batch)
+    if batch["failures"]:
+        sys.exit(1)
+
+
+@cli.group()
+def jobs() -> None:
+    """Manage the persistent job queue processed by `yt-whisper worker`."""
+    pass
+
+
+@jobs.command("add")
+@click.argument("url_file", type=click.File("r"), default="-")
+@click.option(
+    "--db-path",
+    help="Custom path to SQLite database",
+    default=None,
+    type=click.Path(dir_okay=False),
+)
+@click.option(
+    "-f",
+    "--force",
+    is_flag=True,
+    help="Queue videos again even if they are already transcribed or queued",
+)
+@click.option(
+    "--model",
+    default="base",
+    help="Model the worker will use; videos with a transcript from it (and the "
+    "same language, backend and options) are skipped",
+    show_default=True,
+)
+@click.option("--language", default=None, help="Language the worker will use")
+@click.option(
+    "--backend",
+    type=click.Choice(list(BACKENDS)),
+    default=DEFAULT_BACKEND,
+    help="Backend the worker will use",
+    show_default=True,
+)
+@click.option("--compute-type", default=None, help="Precision the worker will use")
+@click.option("--vad", is_flag=True, help="The worker will run with --vad")
+@click.option("--stream", is_flag=True, help="The worker will run with --stream")
+def jobs_add(
+    url_file: TextIO,
+    db_path: str | None,
+    force: bool,
+    model: str,
+    language: str | None,
+    backend: str,
+    compute_type: str | None,
+    vad: bool,
+    stream: bool,
+) -> None:
+    """
+    Queue videos for transcription.
+
+    URLs are read one per line from URL_FILE, or from stdin if omitted. Videos
+    that already have the transcript the worker will make are skipped; give
+    the worker's --model and other options to match them.
+    """
+    compute_type = _check_compute_type(backend, compute_type)
+    version = version_filter(
+        model, language, backend, compute_type, vad, streamed=stream
+    )
+    result = enqueue(read_urls(url_file), db_path, force=force, version=version)
+    for url in result["invalid"]:
+        click.echo(f"Error: Could not extract YouTube ID from URL: {url}", err=True)
+    click.echo(
+        f"Queued: {len(result['queued'])} | Skipped: {len(result['skipped'])} | "
+        f"Invalid: {len(result['invalid'])}"
+    )
+
+
+@jobs.command("status")
+@click.option(
+    "--db-path",
+    help="Custom path to SQLite database",
+    default=None,
+    type=click.Path(dir_okay=False),
+)
+def jobs_status(db_path: str | None) -> None:
+    """Show how many jobs are in each status."""
+    for status, count in job_counts(db_path).items():
+        click.echo(f"{status:<13} {count}")
+
+
+@jobs.command("retry")
+@click.option(
+    "--db-path",
+    help="Custom path to SQLite database",
+    default=None,
+    type=click.Path(dir_okay=False),
+)
+def jobs_retry(db_path: str | None) -> None:
+    """Queue failed jobs again."""
+    click.echo(f"Requeued {retry_failed(db_path)} failed jobs.")
+
 
+@cli.command()
+@click.option(
+    "--db-path",
+    help="Custom path to SQLite database",
+    default=None,
+    type=click.Path(dir_okay=False),
+)
+@click.option(
+    "--model",
+    default="base",
+    help="Whisper model to use (tiny, base, small, medium, large), or auto to "
+    "detect the language and pick an English-only or multilingual model",
+    show_default=True,
+)
+@click.option(
+    "--language",
+    help="Language code (e.g., 'en', 'es', 'fr'). Auto-detected if not specified.",
+    default=None,
+)
+@click.option(
+    "--native-audio",
+    is_flag=True,
+    help="Decode the original audio stream directly instead of converting to MP3",
+)
+@click.option(
+    "--cache",
+    "use_cache",
+    is_flag=True,
+    help="Reuse downloaded audio from the audio cache and add new downloads to it",
+)
+@click.option("--max-jobs", type=int, default=None, help="Stop after this many jobs")
+@click.option(
+    "--max-attempts",
+    default=DEFAULT_MAX_ATTEMPTS,
+    help="Attempts before a job is marked failed",
+    show_default=True,
+)
+@click.option(
+    "--wait",
+    "poll_interval",
+    type=float,
+    default=None,
+    help="Keep running when the queue is empty, checking every this many seconds",
+)
+@click.option(
+    "--backend",
+    type=click.Choice(list(BACKENDS)),
+    default=DEFAULT_BACKEND,
+    help="Inference backend. faster-whisper runs quantized models, much faster "
+    "on CPU (pip install faster-whisper)",
+    show_default=True,
+)
+@click.option(
+    "--compute-type",
+    default=None,
+    help="Precision: fp32 or fp16 for openai-whisper; int8, int8_float16, "
+    "float16 or float32 for faster-whisper (default: fp32 / int8)",
+)
+@click.option(
+    "--vad",
+    is_flag=True,
+    help="Skip stretches without speech (intros, outros, dead air) and only "
+    "transcribe the rest",
+)
+@click.option(
+    "--stream",
+    is_flag=True,
+    help="Decode and transcribe in 30 second windows so memory stays flat "
+    "however long the video is",
+)
+def worker(
+    db_path: str | None,
+    model: str,
+    language: str | None,
+    native_audio: bool,
+    use_cache: bool,
+    max_jobs: int | None,
+    max_attempts: int,
+    poll_interval: float | None,
+    backend: str,
+    compute_type: str | None,
+    vad: bool,
+    stream: bool,
+) -> None:
+    """
+    Process queued jobs until the queue is empty.
 
-@click.group()
-@click.version_option(version=__version__)
-def cli() -> None:
-    """Download and transcribe YouTube videos to sqliteusing Whisper.
+    Several workers can share one database. Interrupted jobs are picked up
+    again when a worker restarts.
 
-    Use the 'db' command to view the current database location.
+    Example usage:
+        yt-whisper jobs add urls.txt
+        yt-whisper worker --model small
     """
-    pass
+    _require_ffmpeg()
+    compute_type = _check_compute_type(backend, compute_type)
+
+    def report(job: dict) -> None:
+        if job["status"] == "done":
+            memory = ""
+            if stream and job.get("peak_rss"):
+                memory = f" (peak memory {format_size(job['peak_rss'])})"
+            click.echo(f"Done: {job['video_id']}{memory}")
+        else:
+            click.echo(
+                f"Failed ({job['status']}): {job['video_id']}: {job['error']}",
+                err=True,
+            )
+
+    processed = run_worker(
+        db_path,
+        model_name=model,
+        language=language,
+        native_audio=native_audio,
+        use_cache=use_cache,
+        max_jobs=max_jobs,
+        max_attempts=max_attempts,
+        poll_interval=poll_interval,
+        on_job=report,
+        backend=backend,
+        compute_type=compute_type,
+        vad=vad,
+        stream=stream,
+    )
+    click.echo(f"Processed: {processed['done']} done | {processed['failed']} failed")
 
 
 @cli.command()
-@click.argument("url")
-@click.option(
-    "-f",
-    "--force",
-    is_flag=True,
-    help="Force re-download and transcription even if already in database",
-)
-@click.option("--no-save", is_flag=True, help="Don't save to database")
+@click.argument("urls", nargs=-1)
 @click.option(
     "--db-path",
     help="Custom path to SQLite database",
     default=None,
     type=click.Path(dir_okay=False),
 )
+@click.option(
+    "--limit",
+    type=int,
+    default=None,
+    help="Maximum number of videos to queue from a channel's first sync",
+)
+@click.option(
+    "--queue-only",
+    is_flag=True,
+    help="Only queue new videos; leave them for `yt-whisper worker`",
+)
 @click.option(
     "--model",
     default="base",
-    help="Whisper model to use (tiny, base, small, medium, large)",
+    help="Whisper model to use (tiny, base, small, medium, large), or auto to "
+    "detect the language and pick an English-only or multilingual model",
     show_default=True,
 )
 @click.option(
@@ -47,83 +843,253 @@ def cli() -> None:
     help="Language code (e.g., 'en', 'es', 'fr'). Auto-detected if not specified.",
     default=None,
 )
-def transcribe(
-    url: str,
-    force: bool,
-    no_save: bool,
+@click.option(
+    "--backend",
+    type=click.Choice(list(BACKENDS)),
+    default=DEFAULT_BACKEND,
+    help="Inference backend. faster-whisper runs quantized models, much faster "
+    "on CPU (pip install faster-whisper)",
+    show_default=True,
+)
+@click.option(
+    "--compute-type",
+    default=None,
+    help="Precision: fp32 or fp16 for openai-whisper; int8, int8_float16, "
+    "float16 or float32 for faster-whisper (default: fp32 / int8)",
+)
+@click.option(
+    "--vad",
+    is_flag=True,
+    help="Skip stretches without speech (intros, outros, dead air) and only "
+    "transcribe the rest",
+)
+@click.option(
+    "--stream",
+    is_flag=True,
+    help="Decode and transcribe in 30 second windows so memory stays flat "
+    "however long the video is",
+)
+def sync(
+    urls: tuple[str, ...],
     db_path: str | None,
+    limit: int | None,
+    queue_only: bool,
     model: str,
     language: str | None,
+    backend: str,
+    compute_type: str | None,
+    vad: bool,
+    stream: bool,
 ) -> None:
     """
-    Download and transcribe a YouTube video.
+    Fetch and transcribe new videos from channels and playlists.
+
+    With URLS, those channels or playlists are synced and remembered; without,
+    every previously synced one is. Only videos uploaded since the last sync
+    are listed for channels.
 
     Example usage:
-        yt-whisper transcribe https://www.youtube.com/watch?v=VIDEO_ID
+        yt-whisper sync https://www.youtube.com/@CHANNEL
+        yt-whisper sync
     """
-    # Check for FFmpeg first
-    if not is_ffmpeg_available():
-        click.echo(
-            "Error: FFmpeg is not installed or not found in your system's PATH. "
-            "FFmpeg is required for audio processing. "
-            "Please install it and try again. "
-            "You can find installation instructions at https://ffmpeg.org/download.html",
-            err=True,
-        )
-        sys.exit(1)
+    urls = urls or tuple(channel["url"] for channel in list_channels(db_path))
+    if not urls:
+        click.echo("Nothing to sync. Pass a channel or playlist URL.")
+        return
 
-    try:
-        # Validate URL
-        youtube_id = extract_youtube_id(url)
-        if not youtube_id:
-            click.echo(f"Error: Could not extract YouTube ID from URL: {url}", err=True)
+    for url in urls:
+        if not is_collection_url(url):
+            click.echo(f"Error: Not a channel or playlist URL: {url}", err=True)
             sys.exit(1)
 
-        # Check if already in database
-        existing = get_transcript(youtube_id, db_path)
-        if existing and not force:
-            click.echo(f"Video already transcribed: {existing['title']}")
-            click.echo(f"Channel: {existing['channel']}")
-            click.echo(f"Author: {existing.get('author', 'Unknown')}")
-            click.echo(f"To view the transcript, use: yt-whisper get {youtube_id}")
-            click.echo("To force re-transcription, use the -f/--force flag")
-            sys.exit(0)
+    if not queue_only:
+        _require_ffmpeg()
+    compute_type = _check_compute_type(backend, compute_type)
+    version = version_filter(
+        model, language, backend, compute_type, vad, streamed=stream
+    )
 
-        # Download and transcribe
-        result = download_and_transcribe(
-            url, force=force, model_name=model, language=language
-        )
+    for url in urls:
+        try:
+            queued = sync_channel(url, db_path, limit=limit, version=version)
+        except Exception as e:
+            click.echo(f"Error: Could not list {url}: {e}", err=True)
+            continue
+        click.echo(f"{url}: {len(queued)} new videos queued")
 
-        # Print summary
-        click.echo(f"Successfully transcribed: {result['title']}")
-        click.echo(f"Channel: {result['channel']}")
-        click.echo(f"Author: {result['author']}")
-        click.echo(f"YouTube ID: {result['id']}")
-        click.echo(f"Duration: {result['duration']} seconds")
+    if queue_only:
+        return
 
-        # Save to database unless --no-save flag is used
-        if not no_save:
-            save_to_db(result, db_path)
-            db_file = db_path or get_db_path()
-            click.echo(f"Saved to database: {db_file}")
+    processed = run_worker(
+        db_path,
+        model_name=model,
+        language=language,
+        on_job=lambda job: click.echo(f"{job['status'].title()}: {job['video_id']}"),
+        backend=backend,
+        compute_type=compute_type,
+        vad=vad,
+        stream=stream,
+    )
+    click.echo(f"Processed: {processed['done']} done | {processed['failed']} failed")
 
-    except Exception as e:
-        click.echo(f"Error: {str(e)}", err=True)
+
+@cli.command()
+@click.option(
+    "--db-path",
+    help="Custom path to SQLite database",
+    default=None,
+    type=click.Path(dir_okay=False),
+)
+@click.option(
+    "--socket",
+    "socket_path",
+    default=None,
+    type=click.Path(dir_okay=False),
+    help="Unix socket to listen on (default: the database path plus .sock)",
+)
+@click.option(
+    "--model",
+    default="base",
+    help="Model to keep loaded and use when a request does not name one",
+    show_default=True,
+)
+@click.option(
+    "--backend",
+    type=click.Choice(list(BACKENDS)),
+    default=DEFAULT_BACKEND,
+    help="Inference backend. faster-whisper runs quantized models, much faster "
+    "on CPU (pip install faster-whisper)",
+    show_default=True,
+)
+@click.option(
+    "--compute-type",
+    default=None,
+    help="Precision: fp32 or fp16 for openai-whisper; int8, int8_float16, "
+    "float16 or float32 for faster-whisper (default: fp32 / int8)",
+)
+def serve(
+    db_path: str | None,
+    socket_path: str | None,
+    model: str,
+    backend: str,
+    compute_type: str | None,
+) -> None:
+    """
+    Run a daemon that keeps models loaded and answers other commands.
+
+    While it runs, transcribe, get, list and search on the same database go
+    through the daemon instead of loading models and opening the database
+    themselves. Stop it with Ctrl+C.
+
+    Example usage:
+        yt-whisper serve --model small
+    """
+    from .server import Daemon
+    from .server import serve as run_server
+
+    compute_type = _check_compute_type(backend, compute_type)
+    daemon = Daemon(
+        db_path, model_name=model, backend=backend, compute_type=compute_type
+    )
+    click.echo(f"Loading model: {model}")
+    daemon.preload()
+
+    socket_path = socket_path or default_socket_path(db_path)
+    click.echo(f"Serving {daemon.db_path} on {socket_path}")
+    try:
+        run_server(daemon, socket_path)
+    except RuntimeError as e:
+        click.echo(f"Error: {e}", err=True)
         sys.exit(1)
 
 
+def _parse_timestamp(
+    ctx: click.Context, param: click.Parameter, value: str | None
+) -> float | None:
+    """Parse a time given as seconds, MM:SS or HH:MM:SS."""
+    if value is None:
+        return None
+    try:
+        seconds = 0.0
+        for part in value.split(":"):
+            seconds = seconds * 60 + float(part)
+    except ValueError:
+        raise click.BadParameter(
+            f"'{value}' is not a time in seconds, MM:SS or HH:MM:SS"
+        ) from None
+    return seconds
+
+
+def _format_timestamp(seconds: float) -> str:
+    """Format seconds as HH:MM:SS."""
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+
+
 @cli.command()
 @click.argument("youtube_id")
 @click.option("--db-path", help="Custom path to SQLite database", default=None)
 @click.option("--output", type=click.File("w"), help="Output file (default: stdout)")
-def get(youtube_id: str, db_path: str | None, output: TextIO | None) -> None:
+@click.option(
+    "--from",
+    "start",
+    callback=_parse_timestamp,
+    help="Only show the transcript from this time (seconds, MM:SS or HH:MM:SS)",
+)
+@click.option(
+    "--to",
+    "end",
+    callback=_parse_timestamp,
+    help="Only show the transcript up to this time (seconds, MM:SS or HH:MM:SS)",
+)
+@click.option(
+    "--model",
+    default=None,
+    help="Show the transcript made with this model instead of the best one",
+)
+@click.option(
+    "--versions",
+    "show_versions",
+    is_flag=True,
+    help="List the transcripts of the video made with different models",
+)
+def get(
+    youtube_id: str,
+    db_path: str | None,
+    output: TextIO | None,
+    start: float | None,
+    end: float | None,
+    model: str | None,
+    show_versions: bool,
+) -> None:
     """
     Get a transcript from the database.
 
+    A video can have transcripts made with several models; the most accurate
+    one is shown unless --model picks another.
+
     Example usage:
         yt-whisper get VIDEO_ID
+        yt-whisper get VIDEO_ID --from 1:30 --to 2:45
+        yt-whisper get VIDEO_ID --versions
     """
-    transcript = get_transcript(youtube_id, db_path)
+    if show_versions:
+        _print_versions(youtube_id, db_path)
+        return
+
+    if start is not None or end is not None:
+        if model is not None:
+            raise click.BadParameter(
+                "Timestamps are only stored for the best transcript",
+                param_hint="'--model'",
+            )
+        _get_time_range(youtube_id, db_path, output, start, end)
+        return
+
+    transcript = via_daemon(get_transcript, db_path)(
+        youtube_id, db_path, include_metadata=False, model_name=model
+    )
 
     if not transcript:
         click.echo(f"Error: No transcript found for YouTube ID: {youtube_id}", err=True)
@@ -142,18 +1108,116 @@ def get(youtube_id: str, db_path: str | None, output: TextIO | None) -> None:
         click.echo(transcript["transcription"])
 
 
+def _print_versions(youtube_id: str, db_path: str | None) -> None:
+    """Print the transcript versions of a video, best first."""
+    versions = via_daemon(get_versions, db_path)(youtube_id, db_path)
+
+    if not versions:
+        click.echo(f"Error: No transcript found for YouTube ID: {youtube_id}", err=True)
+        sys.exit(1)
+
+    click.echo(f"Found {len(versions)} transcripts (best first):")
+    click.echo("-" * 80)
+    for version in versions:
+        click.echo(
+            f"Model: {version['model'] or 'unknown'} | "
+            f"Language: {version['language'] or 'unknown'} | "
+            f"Backend: {version['backend'] or 'unknown'} | "
+            f"Options: {version['options_hash'] or 'unknown'}"
+        )
+        click.echo(
+            f"Characters: {version['characters']} | Created: {version['created_at']}"
+        )
+        click.echo("-" * 80)
+
+
+def _get_time_range(
+    youtube_id: str,
+    db_path: str | None,
+    output: TextIO | None,
+    start: float | None,
+    end: float | None,
+) -> None:
+    """Print the segments of a transcript that fall in a time range."""
+    video = via_daemon(get_video_info, db_path)(youtube_id, db_path)
+
+    if not video:
+        click.echo(f"Error: No transcript found for YouTube ID: {youtube_id}", err=True)
+        sys.exit(1)
+
+    segments = via_daemon(get_segments, db_path)(youtube_id, start, end, db_path)
+
+    if not segments:
+        click.echo(
+            "Error: No timestamped segments in this range. Videos transcribed "
+            "before segments were stored need to be re-transcribed with --force.",
+            err=True,
+        )
+        sys.exit(1)
+
+    if output:
+        output.write(" ".join(segment["text"] for segment in segments))
+        click.echo(f"Transcript written to {output.name}")
+        return
+
+    click.echo(f"Title: {video['title']}")
+    click.echo(f"Channel: {video.get('channel', 'Unknown')}")
+    click.echo(f"Author: {video.get('author', 'Unknown')}")
+    click.echo(
+        f"URL: https://www.youtube.com/watch?v={youtube_id}"
+        f"&t={int(segments[0]['start'])}s"
+    )
+    click.echo("\nTranscription:")
+    click.echo("-" * 40)
+    for segment in segments:
+        click.echo(
+            f"[{_format_timestamp(segment['start'])} - "
+            f"{_format_timestamp(segment['end'])}] {segment['text']}"
+        )
+
+
 @cli.command()
-@click.option("--limit", default=10, help="Maximum number of items to show")
+@click.option(
+    "--limit",
+    type=int,
+    default=None,
+    help="Maximum number of items to show (default: 10, or all with --jsonl)",
+)
 @click.option("--db-path", help="Custom path to SQLite database", default=None)
 @click.option("--json", "output_json", is_flag=True, help="Output as JSON")
-def list(limit: int, db_path: str | None, output_json: bool) -> None:
+@click.option(
+    "--jsonl",
+    "output_jsonl",
+    is_flag=True,
+    help="Stream one JSON object per line as rows are read (for large exports)",
+)
+@click.option("--after", help="Cursor from a previous page to continue after")
+def list(
+    limit: int | None,
+    db_path: str | None,
+    output_json: bool,
+    output_jsonl: bool,
+    after: str | None,
+) -> None:
     """
-    List transcripts in the database.
+    List transcripts in the database, newest first.
 
     Example usage:
         yt-whisper list --limit 20
+        yt-whisper list --limit 20 --after CURSOR
+        yt-whisper list --jsonl > transcripts.jsonl
     """
-    transcripts = list_transcripts(limit, db_path)
+    try:
+        if output_jsonl:
+            # Each row carries its cursor, so an interrupted export can resume
+            for transcript in iter_transcripts(db_path, after=after, limit=limit):
+                click.echo(json.dumps(transcript))
+            return
+
+        limit = 10 if limit is None else limit
+        transcripts = via_daemon(list_transcripts, db_path)(limit, db_path, after=after)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="'--after'") from None
 
     if not transcripts:
         click.echo("No transcripts found in the database.")
@@ -173,16 +1237,37 @@ def list(limit: int, db_path: str | None, output_json: bool) -> None:
             )
             click.echo("-" * 80)
 
+        if len(transcripts) == limit:
+            click.echo(f"Next page: --after {encode_cursor(transcripts[-1])}")
+
 
 @cli.command()
 @click.argument("query")
 @click.option("--db-path", help="Custom path to SQLite database", default=None)
-def search(query: str, db_path: str | None) -> None:
+@click.option("--limit", default=20, help="Maximum number of matches to show")
+@click.option("--offset", default=0, help="Number of matches to skip")
+@click.option(
+    "--moments",
+    is_flag=True,
+    help="Show the timestamped transcript segments where the query is said",
+)
+@click.option("--video", "youtube_id", help="With --moments, only search this video")
+def search(
+    query: str,
+    db_path: str | None,
+    limit: int,
+    offset: int,
+    moments: bool,
+    youtube_id: str | None,
+) -> None:
     """
-    Search for keyword in title, author, channel, and description.
+    Search titles, authors, channels, descriptions and transcripts.
+
+    Matches are ranked by relevance.
 
     Example usage:
         yt-whisper search "climate change"
+        yt-whisper search "climate change" --moments
     """
     if db_path is None:
         db_path = get_db_path()
@@ -191,52 +1276,148 @@ def search(query: str, db_path: str | None) -> None:
         click.echo("Database not found. No transcripts available.")
         return
 
-    import sqlite3
-
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-
-    # Search in author, channel, and description fields
-    cursor.execute(
-        """
-    SELECT id, title, channel, author, description, created_at
-    FROM videos
-    WHERE title LIKE ?
-       OR channel LIKE ?
-       OR author LIKE ?
-       OR description LIKE ?
-    ORDER BY created_at DESC
-    """,
-        (f"%{query}%", f"%{query}%", f"%{query}%", f"%{query}%"),
-    )
+    if moments:
+        _search_moments(query, youtube_id, limit, db_path)
+        return
 
-    rows = cursor.fetchall()
-    conn.close()
+    rows = via_daemon(search_transcripts, db_path)(
+        query,
+        limit=limit,
+        offset=offset,
+        db_path=db_path,
+        highlight=(click.style("", bold=True, reset=False), click.style("")),
+    )
 
     if not rows:
         click.echo(f"No matches found for query: '{query}'")
         return
 
-    click.echo(f"Found {len(rows)} matches for query: '{query}'")
+    if offset:
+        click.echo(
+            f"Showing matches {offset + 1}-{offset + len(rows)} for query: '{query}'"
+        )
+    else:
+        click.echo(f"Found {len(rows)} matches for query: '{query}'")
     click.echo("-" * 80)
 
     for row in rows:
-        row = dict(row)
         click.echo(f"ID: {row['id']} | Title: {row['title']}")
         click.echo(
             f"Channel: {row.get('channel', 'Unknown')} | Created: {row['created_at']}"
         )
+        if row.get("snippet"):
+            click.echo(f"  {row['snippet']}")
         click.echo(f"Watch: https://www.youtube.com/watch?v={row['id']}")
         click.echo("-" * 80)
 
+    if len(rows) == limit:
+        click.echo(
+            f'More results: yt-whisper search "{query}" --offset {offset + limit}'
+        )
     click.echo("To view a transcript, use: yt-whisper get VIDEO_ID")
 
 
+def _search_moments(
+    query: str, youtube_id: str | None, limit: int, db_path: str
+) -> None:
+    """Print the transcript segments matching a query, with watch links."""
+    segments = via_daemon(search_segments, db_path)(
+        query, youtube_id, limit=limit, db_path=db_path
+    )
+
+    if not segments:
+        click.echo(f"No moments found for query: '{query}'")
+        return
+
+    click.echo(f"Found {len(segments)} moments for query: '{query}'")
+    click.echo("-" * 80)
+
+    for segment in segments:
+        click.echo(
+            f"{segment['title']} [{_format_timestamp(segment['start'])}] "
+            f"{segment['text']}"
+        )
+        click.echo(
+            f"Watch: https://www.youtube.com/watch?v={segment['video_id']}"
+            f"&t={int(segment['start'])}s"
+        )
+        click.echo("-" * 80)
+
+
+@cli.group()
+def cache() -> None:
+    """Manage the on-disk audio cache used with --cache."""
+    pass
+
+
+@cache.command("stats")
+def cache_stats() -> None:
+    """Show the location, entry count and size of the audio cache."""
+    stats = AudioCache().stats()
+    click.echo(f"Audio cache: {click.style(stats['path'], fg='green')}")
+    click.echo(f"Entries: {stats['entries']}")
+    click.echo(
+        f"Size: {format_size(stats['bytes'])} of {format_size(stats['max_bytes'])}"
+    )
+
+
+@cache.command("prune")
+@click.option(
+    "--max-size",
+    help="Size to shrink the cache to, e.g. 500M or 2G (default: the cache limit)",
+    default=None,
+)
+def cache_prune(max_size: str | None) -> None:
+    """Evict least recently used audio until the cache fits its size limit."""
+    try:
+        max_bytes = parse_size(max_size) if max_size else None
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint="--max-size") from None
+
+    removed = AudioCache().prune(max_bytes)
+    click.echo(f"Removed {removed} cache entries.")
+
+
+@cache.command("clear")
+@click.option("--yes", is_flag=True, help="Skip confirmation prompt")
+def cache_clear(yes: bool) -> None:
+    """Remove all audio from the cache."""
+    if not yes and not click.confirm("Remove all cached audio?"):
+        click.echo("Operation cancelled.")
+        return
+
+    removed = AudioCache().clear()
+    click.echo(f"Removed {removed} cache entries.")
+
+
 @cli.command()
-def db() -> None:
+@click.option(
+    "--db-path",
+    help="Custom path to SQLite database",
+    default=None,
+    type=click.Path(dir_okay=False),
+)
+@click.option(
+    "--vacuum",
+    is_flag=True,
+    help="Move raw metadata to compressed storage and reclaim unused space",
+)
+def db(db_path: str | None, vacuum: bool) -> None:
     """Show the current database path and usage information."""
-    current_path = get_db_path()
+    current_path = db_path or get_db_path()
+    if vacuum:
+        if not os.path.exists(current_path):
+            click.echo(f"Error: Database not found: {current_path}", err=True)
+            sys.exit(1)
+        size_before = os.path.getsize(current_path)
+        moved = compact_metadata(current_path)
+        size_after = os.path.getsize(current_path)
+        click.echo(f"Compressed metadata of {moved} videos.")
+        click.echo(
+            f"Database size: {format_size(size_before)} -> {format_size(size_after)}"
+        )
+        return
+
     click.echo(f"Current database path: {click.style(current_path, fg='green')}")
     click.echo(
         "\nTo use a custom database path, use the --db-path option with any command:"
@@ -268,7 +1449,7 @@ def delete(youtube_id: str, db_path: str | None, yes: bool) -> None:
         yt-whisper delete VIDEO_ID
     """
     # First check if the video exists
-    transcript = get_transcript(youtube_id, db_path)
+    transcript = get_video_info(youtube_id, db_path)
 
     if not transcript:
         click.echo(f"Error: No transcript found for YouTube ID: {youtube_id}", err=True)
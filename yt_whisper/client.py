@@ -0,0 +1,151 @@
+"""
+Client for the `yt-whisper serve` daemon.
+
+The daemon listens on a Unix socket next to the database file (or, for the
+default database, on the path in YT_WHISPER_SOCKET), so finding out whether one
+is running costs a single stat call. CLI commands route their queries through
+it with via_daemon() and fall back to querying SQLite themselves when no daemon
+answers.
+"""
+
+import functools
+import json
+import os
+import socket
+from collections.abc import Callable
+from typing import Any
+
+from .db import get_db_path
+
+
+class DaemonUnavailableError(ConnectionError):
+    """No daemon is listening at the address."""
+
+
+class DaemonError(RuntimeError):
+    """The daemon failed to handle a request."""
+
+
+def socket_path(db_path: str | None = None) -> str:
+    """
+    Unix socket the daemon serving a database listens on.
+
+    YT_WHISPER_SOCKET only moves the socket of the default database, so a
+    command given another database never reaches a daemon serving that one.
+    """
+    default = get_db_path()
+    if db_path is None or db_path == default:
+        return os.environ.get("YT_WHISPER_SOCKET") or f"{default}.sock"
+    return f"{db_path}.sock"
+
+
+class Client:
+    """
+    Thin JSON-over-HTTP client for the daemon's Unix socket.
+
+    Args:
+        socket_path: Unix socket to connect to
+        timeout: Seconds to wait for a response (default: no limit, as a
+            transcription can take a long time)
+    """
+
+    def __init__(self, socket_path: str, timeout: float | None = None) -> None:
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def _connection(self) -> Any:  # noqa: ANN401
+        # http.client is only imported when a daemon is actually used
+        import http.client
+
+        path, timeout = self.socket_path, self.timeout
+
+        class UnixHTTPConnection(http.client.HTTPConnection):
+            def connect(self) -> None:
+                self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                self.sock.settimeout(timeout)
+                self.sock.connect(path)
+
+        return UnixHTTPConnection("localhost", timeout=timeout)
+
+    def request(self, method: str, path: str, body: Any = None) -> Any:  # noqa: ANN401
+        """
+        Send a request and decode the JSON response.
+
+        Raises:
+            DaemonUnavailableError: If no daemon is listening
+            ValueError: If the daemon rejected the arguments
+            DaemonError: If the request failed in the daemon
+        """
+        connection = self._connection()
+        try:
+            try:
+                connection.request(
+                    method,
+                    path,
+                    body=None if body is None else json.dumps(body),
+                    headers={"Content-Type": "application/json"},
+                )
+            except OSError as e:
+                # Includes a stale socket file left behind by a daemon that died
+                raise DaemonUnavailableError(str(e)) from e
+            response = connection.getresponse()
+            payload = json.loads(response.read() or b"null")
+        finally:
+            connection.close()
+
+        if response.status >= 400:
+            message = payload.get("error", response.reason)
+            if payload.get("type") == "ValueError":
+                raise ValueError(message)
+            raise DaemonError(message)
+        return payload["result"]
+
+    def health(self) -> dict[str, Any]:
+        """Report the daemon's database, model and request count."""
+        return self.request("GET", "/health")
+
+    def call(self, name: str, **kwargs: Any) -> Any:  # noqa: ANN401
+        """
+        Run one of the daemon's functions on its database, see server.FUNCTIONS.
+        """
+        return self.request("POST", f"/call/{name}", {"kwargs": kwargs})
+
+    def transcribe(self, url: str, **options: Any) -> dict:  # noqa: ANN401
+        """Download, transcribe and save a video in the daemon."""
+        return self.call("transcribe", url=url, **options)
+
+
+def daemon_client(db_path: str | None = None) -> Client | None:
+    """Return a client for the daemon serving a database, if its socket exists."""
+    path = socket_path(db_path)
+    return Client(path) if os.path.exists(path) else None
+
+
+def via_daemon(func: Callable, db_path: str | None = None) -> Callable:
+    """
+    Route a database function through the daemon when one is running.
+
+    Returns func itself when there is no daemon socket, and otherwise a
+    function that calls func by name in the daemon, falling back to func if
+    the daemon does not answer or fails. Arguments are sent by name, except
+    db_path: the daemon serving db_path always uses its own database, so calls
+    naming another database run func directly.
+    """
+    client = daemon_client(db_path)
+    if client is None:
+        return func
+
+    @functools.wraps(func)
+    def call(*args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+        import inspect
+
+        named = inspect.signature(func).bind(*args, **kwargs).arguments
+        if named.pop("db_path", None) not in (None, db_path):
+            return func(*args, **kwargs)
+        try:
+            return client.call(func.__name__, **named)
+        except (DaemonUnavailableError, DaemonError):
+            # A failure inside the daemon is reported by running func here
+            return func(*args, **kwargs)
+
+    return call
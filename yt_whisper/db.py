@@ -1,7 +1,55 @@
 # yt_whisper/db.py
+import base64
+import binascii
 import json
 import os
 import sqlite3
+import threading
+import zlib
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from itertools import islice
+
+from .storage import BUSY_TIMEOUT, tune_connection
+from .timing import real_time_factor
+
+# Columns of the videos table, in insert order
+VIDEO_COLUMNS = (
+    "id",
+    "url",
+    "title",
+    "channel",
+    "author",
+    "upload_date",
+    "duration",
+    "description",
+    "transcription",
+    "metadata",
+    "created_at",
+    "model",
+    "language",
+    "language_probability",
+)
+
+# Text columns of the videos table covered by the full-text index
+FTS_COLUMNS = ("title", "channel", "author", "description", "transcription")
+
+# Whisper never produces a segment longer than its 30 second window
+MAX_SEGMENT_SECONDS = 30.0
+
+# BM25 weights for FTS_COLUMNS: matches in titles rank above transcript matches
+FTS_WEIGHTS = (10.0, 5.0, 5.0, 2.0, 1.0)
+
+# Whisper model sizes from least to most accurate, for picking the best
+# transcript of a video
+MODEL_SIZES = ("tiny", "base", "small", "medium", "large")
+
+# Model of transcripts saved before the model was recorded: the default then
+LEGACY_MODEL = "base"
+
+# Columns identifying a version in the transcripts table
+VERSION_KEY = ("video_id", "model", "language", "backend", "options_hash")
 
 
 def get_db_path() -> str:
@@ -14,14 +62,120 @@ def get_db_path() -> str:
     return str(get_database_path("logs.db"))
 
 
-def init_db(db_path: str | None = None) -> None:
-    """Initialize the database if it doesn't exist."""
+# Per-thread connections, keyed by database path
+_local = threading.local()
+
+# Databases whose schema has been set up in this process, as (path, inode)
+_initialized: set[tuple[str, int]] = set()
+_schema_lock = threading.Lock()
+
+
+def _file_id(db_path: str) -> tuple[str, int]:
+    """Identify a database file, so a deleted and recreated file is noticed."""
+    return os.path.realpath(db_path), os.stat(db_path).st_ino
+
+
+def get_connection(db_path: str | None = None) -> sqlite3.Connection:
+    """
+    Get the calling thread's connection to the database.
+
+    Connections are opened once per thread and path and then reused, with WAL
+    mode and the other storage.SQLITE_PRAGMAS enabled so readers in other
+    threads or processes are not blocked by a writer. The schema is created the
+    first time a path is opened in this process.
+
+    Args:
+        db_path: Optional custom path to the database file
+
+    Returns:
+        sqlite3.Connection: Connection with rows returned as sqlite3.Row
+    """
     if db_path is None:
         db_path = get_db_path()
 
-    conn = sqlite3.connect(db_path)
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+
+    cached = connections.get(db_path)
+    if cached is not None:
+        conn, file_id = cached
+        try:
+            if _file_id(db_path) == file_id:
+                return conn
+        except FileNotFoundError:
+            pass
+        # The file was replaced; its inode may be reused by the new file
+        with _schema_lock:
+            _initialized.discard(file_id)
+        conn.close()
+        del connections[db_path]
+
+    # Ensure the directory exists
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT)
+    conn.row_factory = sqlite3.Row
+    tune_connection(conn)
+
+    file_id = _file_id(db_path)
+    with _schema_lock:
+        if file_id not in _initialized:
+            _create_schema(conn)
+            _initialized.add(file_id)
+
+    connections[db_path] = (conn, file_id)
+    return conn
+
+
+def close_connections() -> None:
+    """Close all connections opened by the calling thread."""
+    connections = getattr(_local, "connections", {})
+    for conn, _ in connections.values():
+        conn.close()
+    connections.clear()
+
+
+@contextmanager
+def transaction(db_path: str | None = None) -> Iterator[sqlite3.Connection]:
+    """
+    Run a block of statements in a single transaction.
+
+    The transaction is committed when the block exits normally and rolled back
+    if it raises.
+    """
+    conn = get_connection(db_path)
+    with conn:
+        yield conn
+
+
+def init_db(db_path: str | None = None) -> None:
+    """Initialize the database if it doesn't exist."""
+    get_connection(db_path)
+
+
+def _create_schema(conn: sqlite3.Connection) -> None:
+    """
+    Create the tables, indexes and triggers used by yt-whisper.
+
+    Setup and migrations run in one BEGIN IMMEDIATE transaction, so processes
+    opening the same database at once take turns and each sees what the
+    previous one created.
+    """
     cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        _create_tables(cursor)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
 
+
+def _create_tables(cursor: sqlite3.Cursor) -> None:
+    """Create missing tables and migrate older databases."""
     # Create videos table if it doesn't exist
     cursor.execute("""
     CREATE TABLE IF NOT EXISTS videos (
@@ -35,149 +189,1125 @@ def init_db(db_path: str | None = None) -> None:
         description TEXT,
         transcription TEXT NOT NULL,
         metadata TEXT,
+        created_at TEXT NOT NULL,
+        model TEXT,
+        language TEXT,
+        language_probability REAL
+    )
+    """)
+    _add_missing_columns(cursor)
+
+    # Newest-first listing and its keyset pagination walk this index
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_videos_created_at
+    ON videos (created_at DESC, id DESC)
+    """)
+
+    # Timestamped transcript segments, one row per Whisper segment
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS segments (
+        video_id TEXT NOT NULL REFERENCES videos(id) ON DELETE CASCADE,
+        seq INTEGER NOT NULL,
+        start_time REAL NOT NULL,
+        end_time REAL NOT NULL,
+        text TEXT NOT NULL,
+        tokens TEXT,
+        avg_logprob REAL,
+        no_speech_prob REAL,
+        PRIMARY KEY (video_id, seq)
+    )
+    """)
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_segments_video_start
+    ON segments (video_id, start_time)
+    """)
+
+    # Raw yt-dlp metadata, zlib-compressed JSON, loaded only when asked for
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS video_metadata (
+        video_id TEXT PRIMARY KEY REFERENCES videos(id) ON DELETE CASCADE,
+        data BLOB NOT NULL
+    )
+    """)
+
+    # Persistent work queue, one job per video; see jobs.py
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        video_id TEXT NOT NULL UNIQUE,
+        url TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'queued',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        error TEXT,
+        worker TEXT,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    )
+    """)
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, id)
+    """)
+
+    # Channels and playlists kept up to date by `yt-whisper sync`
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS channels (
+        url TEXT PRIMARY KEY,
+        title TEXT,
+        last_video_id TEXT,
+        last_synced_at TEXT NOT NULL
+    )
+    """)
+
+    # Per-stage timings of transcription runs, kept for profiling
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        video_id TEXT NOT NULL,
+        model TEXT,
+        audio_duration REAL,
+        timings TEXT NOT NULL,
+        total_seconds REAL NOT NULL,
+        real_time_factor REAL,
         created_at TEXT NOT NULL
     )
     """)
 
-    conn.commit()
-    conn.close()
+    _init_transcripts(cursor)
+    _init_fts(cursor)
+    _init_segments_fts(cursor)
 
 
-def save_to_db(data: dict, db_path: str | None = None) -> None:
-    """Save video data to the database."""
-    if db_path is None:
-        db_path = get_db_path()
+def _add_missing_columns(cursor: sqlite3.Cursor) -> None:
+    """
+    Add columns introduced after a database was created.
 
-    # Ensure the directory exists
-    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    Must run inside the schema transaction, so the columns read here cannot be
+    added by another process before the ALTERs.
+    """
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(videos)")}
+    added = {"model": "TEXT", "language": "TEXT", "language_probability": "REAL"}
+    for column, column_type in added.items():
+        if column not in columns:
+            cursor.execute(f"ALTER TABLE videos ADD COLUMN {column} {column_type}")
 
-    # Initialize the database if needed
-    init_db(db_path)
 
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+def _init_transcripts(cursor: sqlite3.Cursor) -> None:
+    """
+    Create the table of transcript versions.
 
-    # Check if the video already exists in the database
-    cursor.execute("SELECT id FROM videos WHERE id = ?", (data["id"],))
-    existing = cursor.fetchone()
+    A video can have one transcript per model, language, backend and options
+    hash (see lib.transcription_options); unknown values are stored as ''.
+    The videos row holds a copy of the best version, so listing and search
+    do not need to look at the others. Runs inside the schema transaction, so
+    the existing videos are backfilled exactly once.
+    """
+    if _has_table(cursor, "transcripts"):
+        return
 
-    if existing:
-        # Update existing record
-        cursor.execute(
-            """
-        UPDATE videos SET
-            url = ?,
-            title = ?,
-            channel = ?,
-            author = ?,
-            upload_date = ?,
-            duration = ?,
-            description = ?,
-            transcription = ?,
-            metadata = ?,
-            created_at = ?
-        WHERE id = ?
-        """,
+    cursor.execute("""
+    CREATE TABLE transcripts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        video_id TEXT NOT NULL REFERENCES videos(id) ON DELETE CASCADE,
+        model TEXT NOT NULL,
+        language TEXT NOT NULL,
+        backend TEXT NOT NULL,
+        options_hash TEXT NOT NULL,
+        transcription TEXT NOT NULL,
+        segments BLOB,
+        language_probability REAL,
+        created_at TEXT NOT NULL,
+        UNIQUE (video_id, model, language, backend, options_hash)
+    )
+    """)
+
+    # Videos saved before versions existed keep their transcript as the only
+    # version; its segments stay in the segments table
+    cursor.execute("""
+    INSERT INTO transcripts (
+        video_id, model, language, backend, options_hash, transcription,
+        language_probability, created_at
+    )
+    SELECT id, COALESCE(model, ''), COALESCE(language, ''), '', '',
+           transcription, language_probability, created_at
+    FROM videos
+    """)
+
+
+def _init_fts(cursor: sqlite3.Cursor) -> None:
+    """
+    Create the full-text index over the videos table.
+
+    The index is an external-content FTS5 table kept in sync by triggers, so the
+    text is not stored twice. Databases created before the index existed are
+    backfilled once when the table is first created. SQLite builds without FTS5
+    are left without an index and fall back to LIKE scans.
+    """
+    if _has_table(cursor, "videos_fts"):
+        return
+
+    try:
+        cursor.execute(f"""
+        CREATE VIRTUAL TABLE videos_fts USING fts5(
+            {", ".join(FTS_COLUMNS)},
+            content='videos',
+            content_rowid='rowid',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        """)
+    except sqlite3.OperationalError as e:
+        if not _fts5_missing(e):
+            raise
+        return
+
+    columns = ", ".join(FTS_COLUMNS)
+    new_values = ", ".join(f"new.{column}" for column in FTS_COLUMNS)
+    old_values = ", ".join(f"old.{column}" for column in FTS_COLUMNS)
+    # One statement per execute: executescript would commit the schema
+    # transaction halfway through
+    cursor.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS videos_fts_insert AFTER INSERT ON videos BEGIN
+        INSERT INTO videos_fts(rowid, {columns}) VALUES (new.rowid, {new_values});
+    END
+    """)
+    cursor.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS videos_fts_delete AFTER DELETE ON videos BEGIN
+        INSERT INTO videos_fts(videos_fts, rowid, {columns})
+        VALUES ('delete', old.rowid, {old_values});
+    END
+    """)
+    cursor.execute(f"""
+    CREATE TRIGGER IF NOT EXISTS videos_fts_update AFTER UPDATE ON videos BEGIN
+        INSERT INTO videos_fts(videos_fts, rowid, {columns})
+        VALUES ('delete', old.rowid, {old_values});
+        INSERT INTO videos_fts(rowid, {columns}) VALUES (new.rowid, {new_values});
+    END
+    """)
+
+    # Index rows that were written before the index existed
+    cursor.execute("INSERT INTO videos_fts(videos_fts) VALUES ('rebuild')")
+
+
+def _init_segments_fts(cursor: sqlite3.Cursor) -> None:
+    """Create the full-text index over segment text, like _init_fts."""
+    if _has_table(cursor, "segments_fts"):
+        return
+
+    try:
+        cursor.execute("""
+        CREATE VIRTUAL TABLE segments_fts USING fts5(
+            text,
+            content='segments',
+            content_rowid='rowid',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        """)
+    except sqlite3.OperationalError as e:
+        if not _fts5_missing(e):
+            raise
+        return
+
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS segments_fts_insert AFTER INSERT ON segments BEGIN
+        INSERT INTO segments_fts(rowid, text) VALUES (new.rowid, new.text);
+    END
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS segments_fts_delete AFTER DELETE ON segments BEGIN
+        INSERT INTO segments_fts(segments_fts, rowid, text)
+        VALUES ('delete', old.rowid, old.text);
+    END
+    """)
+
+    cursor.execute("INSERT INTO segments_fts(segments_fts) VALUES ('rebuild')")
+
+
+def _fts5_missing(error: sqlite3.OperationalError) -> bool:
+    """Check whether an error means FTS5 is not compiled into this SQLite."""
+    return "no such module: fts5" in str(error)
+
+
+def _has_table(cursor: sqlite3.Cursor, name: str) -> bool:
+    """Check whether a table (or virtual table) exists in the database."""
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    )
+    return cursor.fetchone() is not None
+
+
+def _fts_query(query: str) -> str:
+    """
+    Turn free text into an FTS5 query matching all of its words.
+
+    Each word is quoted so that characters with a meaning in the FTS5 query
+    syntax (quotes, hyphens, colons, ...) are searched for literally.
+    """
+    words = query.split()
+    return " ".join('"' + word.replace('"', '""') + '"' for word in words)
+
+
+def _compress_json(value: dict | list) -> bytes:
+    """Serialize raw metadata or transcript segments as zlib-compressed JSON."""
+    return zlib.compress(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+
+
+def model_rank(model_name: str | None) -> int:
+    """
+    Rank a model by accuracy, from 1 for tiny to 5 for large and turbo.
+
+    English-only (.en), distilled and versioned (large-v3) variants rank with
+    their size. Transcripts saved without a model rank as LEGACY_MODEL, so a
+    smaller draft does not replace them; other unknown models rank 0.
+    """
+    name = (model_name or LEGACY_MODEL).removesuffix(".en").removeprefix("distil-")
+    if name == "turbo":
+        name = "large"
+    for rank, size in enumerate(MODEL_SIZES, 1):
+        if name == size or name.startswith(f"{size}-"):
+            return rank
+    return 0
+
+
+def _model_condition(model_name: str) -> str:
+    """
+    SQL condition matching transcript versions made with a model.
+
+    Versions saved without a model ('') are taken to be LEGACY_MODEL ones, as
+    in model_rank.
+    """
+    return "model IN (?, '')" if model_name == LEGACY_MODEL else "model = ?"
+
+
+def _version_rank(row: sqlite3.Row) -> tuple:
+    """Sort key of transcript versions: the most accurate, then the newest."""
+    return model_rank(row["model"]), row["created_at"], row["id"]
+
+
+def _version_key(data: dict) -> tuple:
+    """The VERSION_KEY of a result dictionary."""
+    return (
+        data["id"],
+        data.get("model") or "",
+        data.get("language") or "",
+        data.get("backend") or "",
+        data.get("options_hash") or "",
+    )
+
+
+def _save_versions(conn: sqlite3.Connection, records: list[dict]) -> list[dict]:
+    """
+    Store the records as transcript versions and pick each video's best one.
+
+    Returns:
+        The records, with the transcript fields and segments of a better
+        stored version in place of a record's own where there is one
+    """
+    conn.executemany(
+        f"""
+    INSERT INTO transcripts (
+        {", ".join(VERSION_KEY)}, transcription, segments, language_probability,
+        created_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT({", ".join(VERSION_KEY)}) DO UPDATE SET
+        transcription = excluded.transcription,
+        segments = excluded.segments,
+        language_probability = excluded.language_probability,
+        created_at = excluded.created_at
+    """,
+        [
             (
-                data["url"],
-                data["title"],
-                data.get("channel", ""),
-                data.get("author", ""),
-                data.get("upload_date", ""),
-                data.get("duration", 0),
-                data.get("description", ""),
+                *_version_key(data),
                 data["transcription"],
-                json.dumps(data.get("metadata", {})),
+                None
+                if data.get("segments") is None
+                else _compress_json(data["segments"]),
+                data.get("language_probability"),
                 data["created_at"],
+            )
+            for data in records
+        ],
+    )
+
+    current = []
+    for data in records:
+        rows = conn.execute(
+            "SELECT * FROM transcripts WHERE video_id = ?", (data["id"],)
+        ).fetchall()
+        best = max(rows, key=_version_rank)
+        if tuple(best[column] for column in VERSION_KEY) != _version_key(data):
+            data = {
+                **data,
+                "transcription": best["transcription"],
+                "model": best["model"] or None,
+                "language": best["language"] or None,
+                "language_probability": best["language_probability"],
+                # Versions from before segments were versioned keep theirs in
+                # the segments table
+                "segments": None
+                if best["segments"] is None
+                else json.loads(zlib.decompress(best["segments"])),
+            }
+        current.append(data)
+    return current
+
+
+def _video_row(data: dict) -> tuple:
+    """Convert a result dictionary into a row for the videos table."""
+    return (
+        data["id"],
+        data["url"],
+        data["title"],
+        data.get("channel", ""),
+        data.get("author", ""),
+        data.get("upload_date", ""),
+        data.get("duration", 0),
+        data.get("description", ""),
+        data["transcription"],
+        None,  # Raw metadata lives in video_metadata
+        data["created_at"],
+        data.get("model"),
+        data.get("language"),
+        data.get("language_probability"),
+    )
+
+
+def save_many(
+    records: Iterable[dict], db_path: str | None = None, batch_size: int = 500
+) -> int:
+    """
+    Insert or update many videos with one commit per batch.
+
+    Each record is also stored as a version of the video's transcript, keyed
+    by model, language, backend and options hash. The videos row and segments
+    keep the best version, so saving a draft never replaces a better one.
+
+    Args:
+        records: Video data dictionaries as returned by download_and_transcribe
+        db_path: Optional custom path to the database file
+        batch_size: Number of records written per transaction
+
+    Returns:
+        int: Number of records saved
+    """
+    if db_path is None:
+        db_path = get_db_path()
+
+    columns = ", ".join(VIDEO_COLUMNS)
+    placeholders = ", ".join("?" for _ in VIDEO_COLUMNS)
+    updates = ", ".join(
+        f"{column} = excluded.{column}" for column in VIDEO_COLUMNS if column != "id"
+    )
+    sql = f"""
+    INSERT INTO videos ({columns}) VALUES ({placeholders})
+    ON CONFLICT(id) DO UPDATE SET {updates}
+    """
+
+    saved = 0
+    batch_size = max(1, batch_size)
+    records = iter(records)
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            break
+        metadata_rows = [
+            (data["id"], _compress_json(data.get("metadata") or {})) for data in batch
+        ]
+        with transaction(db_path) as conn:
+            conn.executemany(sql, [_video_row(data) for data in batch])
+            # A draft saved after a better transcript does not replace it
+            current = _save_versions(conn, batch)
+            conn.executemany(
+                sql,
+                [
+                    _video_row(best)
+                    for data, best in zip(batch, current, strict=True)
+                    if best is not data
+                ],
+            )
+            conn.executemany(
+                """
+                INSERT INTO video_metadata (video_id, data) VALUES (?, ?)
+                ON CONFLICT(video_id) DO UPDATE SET data = excluded.data
+                """,
+                metadata_rows,
+            )
+            _replace_segments(conn, current)
+        saved += len(batch)
+
+    return saved
+
+
+def _replace_segments(conn: sqlite3.Connection, records: list[dict]) -> None:
+    """Store the segments of records that carry them, replacing older ones."""
+    with_segments = [data for data in records if data.get("segments") is not None]
+    if not with_segments:
+        return
+
+    conn.executemany(
+        "DELETE FROM segments WHERE video_id = ?",
+        [(data["id"],) for data in with_segments],
+    )
+    conn.executemany(
+        """
+    INSERT INTO segments (
+        video_id, seq, start_time, end_time, text, tokens, avg_logprob,
+        no_speech_prob
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+        [
+            (
                 data["id"],
-            ),
-        )
-        print(f"Updated existing record for video ID: {data['id']}")
-    else:
-        # Insert new record
-        cursor.execute(
+                seq,
+                segment["start"],
+                segment["end"],
+                segment["text"],
+                json.dumps(segment.get("tokens", [])),
+                segment.get("avg_logprob"),
+                segment.get("no_speech_prob"),
+            )
+            for data in with_segments
+            for seq, segment in enumerate(data["segments"])
+        ],
+    )
+
+
+def save_to_db(data: dict, db_path: str | None = None) -> None:
+    """Save video data to the database."""
+    save_many([data], db_path)
+    print(f"Saved record for video ID: {data['id']}")
+
+
+def record_run(
+    youtube_id: str,
+    timings: dict[str, float],
+    model_name: str | None = None,
+    audio_duration: float | None = None,
+    db_path: str | None = None,
+) -> int:
+    """
+    Record the stage timings of a transcription run.
+
+    Args:
+        youtube_id: The YouTube video ID
+        timings: Span durations in seconds, keyed by stage name
+        model_name: Name of the Whisper model used
+        audio_duration: Duration of the transcribed audio in seconds
+        db_path: Optional custom path to the database file
+
+    Returns:
+        int: ID of the new runs row
+    """
+    with transaction(db_path) as conn:
+        cursor = conn.execute(
             """
-        INSERT INTO videos (
-            id, url, title, channel, author, upload_date, duration, description,
-            transcription, metadata, created_at
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
+            INSERT INTO runs (
+                video_id, model, audio_duration, timings, total_seconds,
+                real_time_factor, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
             (
-                data["id"],
-                data["url"],
-                data["title"],
-                data.get("channel", ""),
-                data.get("author", ""),
-                data.get("upload_date", ""),
-                data.get("duration", 0),
-                data.get("description", ""),
-                data["transcription"],
-                json.dumps(data.get("metadata", {})),
-                data["created_at"],
+                youtube_id,
+                model_name,
+                audio_duration,
+                json.dumps(timings),
+                sum(timings.values()),
+                real_time_factor(audio_duration or 0, timings),
+                datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
             ),
         )
-        print(f"Inserted new record for video ID: {data['id']}")
+    return cursor.lastrowid
 
-    conn.commit()
-    conn.close()
 
+def get_transcript(
+    youtube_id: str,
+    db_path: str | None = None,
+    include_metadata: bool = True,
+    model_name: str | None = None,
+) -> dict | None:
+    """
+    Get transcript for a YouTube video from the database.
+
+    Args:
+        youtube_id: The YouTube video ID
+        db_path: Optional custom path to the database file
+        include_metadata: Load and decode the raw yt-dlp metadata. If False,
+            the result has no 'metadata' key.
+        model_name: Return the newest transcript made with this model instead
+            of the best one
 
-def get_transcript(youtube_id: str, db_path: str | None = None) -> dict | None:
-    """Get transcript for a YouTube video from the database."""
+    Returns:
+        dict | None: Video fields, or None if the video (or its transcript
+        with model_name) is not in the database
+    """
     if db_path is None:
         db_path = get_db_path()
 
     if not os.path.exists(db_path):
         return None
 
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    columns = ", ".join(column for column in VIDEO_COLUMNS if column != "metadata")
+    row = (
+        get_connection(db_path)
+        .execute(f"SELECT {columns} FROM videos WHERE id = ?", (youtube_id,))
+        .fetchone()
+    )
+    if row is None:
+        return None
+
+    result = dict(row)
+    if model_name is not None:
+        version = (
+            get_connection(db_path)
+            .execute(
+                f"""
+            SELECT transcription, model, language, language_probability
+            FROM transcripts WHERE video_id = ? AND {_model_condition(model_name)}
+            ORDER BY created_at DESC, id DESC LIMIT 1
+            """,
+                (youtube_id, model_name),
+            )
+            .fetchone()
+        )
+        if version is None:
+            return None
+        result.update(
+            dict(version),
+            model=version["model"] or None,
+            language=version["language"] or None,
+        )
+    if include_metadata:
+        result["metadata"] = get_metadata(youtube_id, db_path)
+    return result
+
+
+def get_versions(youtube_id: str, db_path: str | None = None) -> list[dict]:
+    """
+    List the transcripts of a video without their text, best first.
+
+    Args:
+        youtube_id: The YouTube video ID
+        db_path: Optional custom path to the database file
+
+    Returns:
+        list: Model, language, backend, options hash, language probability,
+        creation time and length in characters of each version
+    """
+    if db_path is None:
+        db_path = get_db_path()
+
+    if not os.path.exists(db_path):
+        return []
+
+    rows = (
+        get_connection(db_path)
+        .execute(
+            """
+        SELECT id, model, language, backend, options_hash, language_probability,
+               created_at, length(transcription) AS characters
+        FROM transcripts WHERE video_id = ?
+        """,
+            (youtube_id,),
+        )
+        .fetchall()
+    )
+    versions = []
+    for row in sorted(rows, key=_version_rank, reverse=True):
+        version = dict(row)
+        del version["id"]
+        versions.append(version)
+    return versions
+
+
+def get_metadata(youtube_id: str, db_path: str | None = None) -> dict:
+    """
+    Get the raw yt-dlp metadata of a video.
+
+    Falls back to the legacy metadata column of videos for rows that have not
+    been moved by compact_metadata().
+
+    Returns:
+        dict: The metadata, or an empty dict if there is none
+    """
+    if db_path is None:
+        db_path = get_db_path()
+
+    if not os.path.exists(db_path):
+        return {}
+
+    conn = get_connection(db_path)
+    row = conn.execute(
+        "SELECT data FROM video_metadata WHERE video_id = ?", (youtube_id,)
+    ).fetchone()
+    try:
+        if row is not None:
+            return json.loads(zlib.decompress(row[0]))
+        row = conn.execute(
+            "SELECT metadata FROM videos WHERE id = ?", (youtube_id,)
+        ).fetchone()
+        if row is not None and row[0]:
+            return json.loads(row[0])
+    except (zlib.error, json.JSONDecodeError):
+        pass
+    return {}
+
+
+def compact_metadata(
+    db_path: str | None = None, batch_size: int = 500, vacuum: bool = True
+) -> int:
+    """
+    Move metadata stored inline in videos to the compressed video_metadata table.
+
+    Args:
+        db_path: Optional custom path to the database file
+        batch_size: Number of videos moved per transaction
+        vacuum: Run VACUUM afterwards so the freed pages are returned to the
+            file system
+
+    Returns:
+        int: Number of videos whose metadata was moved
+    """
+    moved = 0
+    while True:
+        with transaction(db_path) as conn:
+            rows = conn.execute(
+                "SELECT id, metadata FROM videos WHERE metadata IS NOT NULL LIMIT ?",
+                (batch_size,),
+            ).fetchall()
+            if not rows:
+                break
+            compressed = []
+            for youtube_id, metadata in rows:
+                try:
+                    parsed = json.loads(metadata) if metadata else {}
+                except json.JSONDecodeError:
+                    parsed = {}
+                compressed.append((youtube_id, _compress_json(parsed)))
+            # Metadata already in the side table is newer than the inline copy
+            conn.executemany(
+                """
+                INSERT INTO video_metadata (video_id, data) VALUES (?, ?)
+                ON CONFLICT(video_id) DO NOTHING
+                """,
+                compressed,
+            )
+            conn.executemany(
+                "UPDATE videos SET metadata = NULL WHERE id = ?",
+                [(youtube_id,) for youtube_id, _ in rows],
+            )
+        moved += len(rows)
+
+    if vacuum:
+        conn = get_connection(db_path)
+        conn.execute("VACUUM")
+        # In WAL mode the rebuilt pages only reach the main file on checkpoint
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return moved
+
+
+def get_video_info(youtube_id: str, db_path: str | None = None) -> dict | None:
+    """
+    Get the title, channel and author of a video without its transcript.
+
+    Args:
+        youtube_id: The YouTube video ID
+        db_path: Optional custom path to the database file
+
+    Returns:
+        dict | None: Video fields, or None if the video is not in the database
+    """
+    if db_path is None:
+        db_path = get_db_path()
+
+    if not os.path.exists(db_path):
+        return None
 
-    cursor.execute("SELECT * FROM videos WHERE id = ?", (youtube_id,))
+    cursor = get_connection(db_path).cursor()
+    cursor.execute(
+        """
+    SELECT id, url, title, channel, author, upload_date, duration, created_at,
+           model, language, language_probability
+    FROM videos WHERE id = ?
+    """,
+        (youtube_id,),
+    )
     row = cursor.fetchone()
 
-    conn.close()
+    return dict(row) if row else None
+
+
+def existing_ids(
+    youtube_ids: Iterable[str],
+    model_name: str | None = None,
+    language: str | None = None,
+    db_path: str | None = None,
+    backend: str | None = None,
+    options_hash: str | None = None,
+) -> set[str]:
+    """
+    Find which videos are already in the database, with one query per chunk.
+
+    With any of the filters, a video counts if one of its transcript versions
+    matches them all. Versions saved without a model (from before models were
+    recorded) count as LEGACY_MODEL, so asking for a better model queues them
+    again. A version without a backend or options ('' in the transcripts
+    table) matches any, but one without a language never matches a language.
 
-    if row:
-        result = dict(row)
-        # Parse metadata JSON if it exists
-        if result.get("metadata"):
-            try:
-                result["metadata"] = json.loads(result["metadata"])
-            except json.JSONDecodeError:
-                result["metadata"] = {}
+    Args:
+        youtube_ids: YouTube video IDs to check
+        model_name: Only count videos transcribed with this model
+        language: Only count videos transcribed in this language
+        db_path: Optional custom path to the database file
+        backend: Only count videos transcribed with this backend
+        options_hash: Only count videos transcribed with these options (see
+            lib.options_hash)
+
+    Returns:
+        set[str]: The IDs that are already transcribed
+    """
+    if db_path is None:
+        db_path = get_db_path()
+
+    if not os.path.exists(db_path):
+        return set()
+
+    table, column, filters, params = "videos", "id", "", []
+    for name, value in (
+        ("model", model_name),
+        ("language", language),
+        ("backend", backend),
+        ("options_hash", options_hash),
+    ):
+        if value is None:
+            continue
+        table, column = "transcripts", "video_id"
+        if name == "model":
+            filters += f" AND {_model_condition(value)}"
+        elif name == "language":
+            filters += " AND language = ?"
         else:
-            result["metadata"] = {}
-        return result
-    else:
+            filters += f" AND {name} IN (?, '')"
+        params.append(value)
+
+    conn = get_connection(db_path)
+    found: set[str] = set()
+    ids = iter(dict.fromkeys(youtube_ids))
+    # Stay well below SQLite's limit on the number of bound parameters
+    while chunk := list(islice(ids, 500)):
+        placeholders = ", ".join("?" for _ in chunk)
+        rows = conn.execute(
+            f"SELECT DISTINCT {column} FROM {table} "
+            f"WHERE {column} IN ({placeholders}){filters}",
+            [*chunk, *params],
+        )
+        found.update(row[0] for row in rows)
+    return found
+
+
+def get_channel(url: str, db_path: str | None = None) -> dict | None:
+    """Get the sync state of a channel or playlist, or None if never synced."""
+    if db_path is None:
+        db_path = get_db_path()
+
+    if not os.path.exists(db_path):
         return None
 
+    row = (
+        get_connection(db_path)
+        .execute("SELECT * FROM channels WHERE url = ?", (url,))
+        .fetchone()
+    )
+    return dict(row) if row else None
+
 
-def list_transcripts(limit: int = 10, db_path: str | None = None) -> list:
-    """List transcripts in the database."""
+def list_channels(db_path: str | None = None) -> list[dict]:
+    """List the channels and playlists that have been synced."""
     if db_path is None:
         db_path = get_db_path()
 
     if not os.path.exists(db_path):
         return []
 
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
+    rows = get_connection(db_path).execute("SELECT * FROM channels ORDER BY url")
+    return [dict(row) for row in rows]
+
+
+def update_channel(
+    url: str,
+    title: str | None,
+    last_video_id: str | None,
+    db_path: str | None = None,
+) -> None:
+    """Record the newest video seen by a sync of a channel or playlist."""
+    with transaction(db_path) as conn:
+        conn.execute(
+            """
+            INSERT INTO channels (url, title, last_video_id, last_synced_at)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                title = excluded.title,
+                last_video_id = excluded.last_video_id,
+                last_synced_at = excluded.last_synced_at
+            """,
+            (
+                url,
+                title,
+                last_video_id,
+                datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            ),
+        )
+
+
+def get_segments(
+    youtube_id: str,
+    start: float | None = None,
+    end: float | None = None,
+    db_path: str | None = None,
+) -> list[dict]:
+    """
+    Get the timestamped segments of a video that overlap a time range.
+
+    Only the matching segments are read, through the (video_id, start_time)
+    index.
+
+    Args:
+        youtube_id: The YouTube video ID
+        start: Start of the range in seconds (default: beginning of the video)
+        end: End of the range in seconds (default: end of the video)
+        db_path: Optional custom path to the database file
+
+    Returns:
+        list: Segments with 'start', 'end' and 'text', in playback order
+    """
+    if db_path is None:
+        db_path = get_db_path()
+
+    if not os.path.exists(db_path):
+        return []
+
+    conditions = ["video_id = ?"]
+    params: list = [youtube_id]
+    if start is not None:
+        # Segments never exceed Whisper's window, so this bounds the index scan
+        conditions.append("start_time >= ?")
+        params.append(start - MAX_SEGMENT_SECONDS)
+        conditions.append("end_time > ?")
+        params.append(start)
+    if end is not None:
+        conditions.append("start_time < ?")
+        params.append(end)
 
+    cursor = get_connection(db_path).cursor()
     cursor.execute(
-        """
-    SELECT id, title, channel, author, created_at
-    FROM videos
-    ORDER BY created_at DESC
+        f"""
+    SELECT start_time AS start, end_time AS "end", text
+    FROM segments
+    WHERE {" AND ".join(conditions)}
+    ORDER BY start_time
+    """,
+        params,
+    )
+
+    return [dict(row) for row in cursor.fetchall()]
+
+
+def search_segments(
+    query: str,
+    youtube_id: str | None = None,
+    limit: int = 20,
+    db_path: str | None = None,
+) -> list[dict]:
+    """
+    Find the moments in transcripts where the query words are said.
+
+    Args:
+        query: Words to search for; all of them must occur in the segment
+        youtube_id: Only search the segments of this video
+        limit: Maximum number of segments to return
+        db_path: Optional custom path to the database file
+
+    Returns:
+        list: Matching segments with 'video_id', 'title', 'start', 'end' and
+        'text', best match first
+    """
+    if db_path is None:
+        db_path = get_db_path()
+
+    if not os.path.exists(db_path) or not query.split():
+        return []
+
+    cursor = get_connection(db_path).cursor()
+    if not _has_table(cursor, "segments_fts"):
+        return []
+
+    video_filter = "AND s.video_id = ?" if youtube_id else ""
+    params: list = [_fts_query(query)]
+    if youtube_id:
+        params.append(youtube_id)
+    params.append(limit)
+
+    cursor.execute(
+        f"""
+    SELECT s.video_id, v.title, s.start_time AS start, s.end_time AS "end", s.text
+    FROM segments_fts
+    JOIN segments s ON s.rowid = segments_fts.rowid
+    JOIN videos v ON v.id = s.video_id
+    WHERE segments_fts MATCH ? {video_filter}
+    ORDER BY bm25(segments_fts)
     LIMIT ?
     """,
-        (limit,),
+        params,
     )
 
+    return [dict(row) for row in cursor.fetchall()]
+
+
+def encode_cursor(row: dict) -> str:
+    """Build the opaque pagination token pointing just past a listed row."""
+    position = json.dumps([row["created_at"], row["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(position.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(token: str) -> tuple[str, str]:
+    """
+    Read the (created_at, id) position from a pagination token.
+
+    Raises:
+        ValueError: If the token was not produced by encode_cursor
+    """
+    try:
+        created_at, youtube_id = json.loads(base64.urlsafe_b64decode(token))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise ValueError(f"Invalid cursor: {token}") from None
+    return str(created_at), str(youtube_id)
+
+
+def iter_transcripts(
+    db_path: str | None = None, after: str | None = None, limit: int | None = None
+) -> Iterator[dict]:
+    """
+    Stream transcripts, newest first, without loading them all into memory.
+
+    Pagination is keyset based: a page starts right after the row its cursor
+    points at, so every page is an index seek, however deep it is, and rows
+    added meanwhile do not shift later pages.
+
+    Args:
+        db_path: Optional custom path to the database file
+        after: Cursor of the last row of the previous page
+        limit: Maximum number of rows to yield (default: all)
+
+    Yields:
+        Dictionaries with the id, title, channel, author, created_at and the
+        'cursor' to pass as after to continue from that row
+
+    Raises:
+        ValueError: If the cursor is invalid
+    """
+    if db_path is None:
+        db_path = get_db_path()
+
+    position = decode_cursor(after) if after else None
+    if not os.path.exists(db_path):
+        return
+
+    sql = "SELECT id, title, channel, author, created_at FROM videos"
+    params: list = []
+    if position:
+        sql += " WHERE (created_at, id) < (?, ?)"
+        params.extend(position)
+    sql += " ORDER BY created_at DESC, id DESC"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+
+    # Iterating the cursor fetches rows from SQLite as they are consumed
+    for row in get_connection(db_path).execute(sql, params):
+        transcript = dict(row)
+        transcript["cursor"] = encode_cursor(transcript)
+        yield transcript
+
+
+def list_transcripts(
+    limit: int = 10, db_path: str | None = None, after: str | None = None
+) -> list:
+    """
+    List transcripts in the database, newest first.
+
+    Args:
+        limit: Maximum number of transcripts to return
+        db_path: Optional custom path to the database file
+        after: Cursor of the last transcript of the previous page, see
+            iter_transcripts
+
+    Returns:
+        List of dictionaries with the id, title, channel, author, created_at
+        and cursor of each transcript
+    """
+    return list(iter_transcripts(db_path, after=after, limit=limit))
+
+
+def search_transcripts(
+    query: str,
+    limit: int = 20,
+    offset: int = 0,
+    db_path: str | None = None,
+    highlight: tuple[str, str] = ("[", "]"),
+) -> list[dict]:
+    """
+    Search titles, channels, authors, descriptions and transcriptions.
+
+    Results are ranked by BM25 relevance and include a snippet of the best
+    matching field with the matched words wrapped in the highlight markers.
+
+    Args:
+        query: Words to search for; all of them must match
+        limit: Maximum number of results to return
+        offset: Number of results to skip, for paging
+        db_path: Optional custom path to the database file
+        highlight: Strings inserted before and after each matched word
+
+    Returns:
+        list: Matching videos, best match first
+    """
+    if db_path is None:
+        db_path = get_db_path()
+
+    if not os.path.exists(db_path) or not query.split():
+        return []
+
+    # Creates and backfills the index for databases from older versions
+    cursor = get_connection(db_path).cursor()
+
+    if _has_table(cursor, "videos_fts"):
+        weights = ", ".join(str(weight) for weight in FTS_WEIGHTS)
+        cursor.execute(
+            f"""
+        SELECT v.id, v.title, v.channel, v.author, v.created_at,
+               snippet(videos_fts, -1, ?, ?, '...', 16) AS snippet,
+               bm25(videos_fts, {weights}) AS rank
+        FROM videos_fts
+        JOIN videos v ON v.rowid = videos_fts.rowid
+        WHERE videos_fts MATCH ?
+        ORDER BY rank
+        LIMIT ? OFFSET ?
+        """,
+            (highlight[0], highlight[1], _fts_query(query), limit, offset),
+        )
+    else:
+        pattern = f"%{query}%"
+        where = " OR ".join(f"{column} LIKE ?" for column in FTS_COLUMNS)
+        cursor.execute(
+            f"""
+        SELECT id, title, channel, author, created_at,
+               substr(description, 1, 120) AS snippet, 0.0 AS rank
+        FROM videos
+        WHERE {where}
+        ORDER BY created_at DESC
+        LIMIT ? OFFSET ?
+        """,
+            (*[pattern] * len(FTS_COLUMNS), limit, offset),
+        )
+
     rows = cursor.fetchall()
-    conn.close()
 
     return [dict(row) for row in rows]
 
@@ -199,14 +1329,9 @@ def delete_video(youtube_id: str, db_path: str | None = None) -> bool:
     if not os.path.exists(db_path):
         return False
 
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
-    # Try to delete the video
-    cursor.execute("DELETE FROM videos WHERE id = ?", (youtube_id,))
-    rows_affected = cursor.rowcount
-
-    conn.commit()
-    conn.close()
+    with transaction(db_path) as conn:
+        # Try to delete the video
+        cursor = conn.execute("DELETE FROM videos WHERE id = ?", (youtube_id,))
+        rows_affected = cursor.rowcount
 
     return rows_affected > 0
@@ -0,0 +1,483 @@
+"""
+Persistent job queue stored in the SQLite database.
+
+Each video to transcribe is a row in the jobs table that moves through the
+statuses queued -> downloading -> transcribing -> done, or to failed after too
+many attempts. Workers claim jobs atomically, so several worker processes can
+share one database file, and a restarted worker resumes only unfinished work.
+Jobs left in progress by a worker that died are claimed again once they have
+not been updated for a while; a live worker keeps its job updated with a
+heartbeat. A worker stopped with Ctrl+C or SIGTERM puts its job back in the
+queue before exiting.
+"""
+
+import os
+import shutil
+import signal
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from .backends import DEFAULT_BACKEND
+from .cache import AudioCache
+from .db import (
+    close_connections,
+    existing_ids,
+    get_connection,
+    save_to_db,
+    transaction,
+)
+from .lib import (
+    build_result,
+    extract_metadata,
+    extract_youtube_id,
+    fetch_audio,
+    run_transcription,
+)
+from .timing import peak_rss, reset_peak_rss
+
+QUEUED = "queued"
+DOWNLOADING = "downloading"
+TRANSCRIBING = "transcribing"
+DONE = "done"
+FAILED = "failed"
+
+STATUSES = (QUEUED, DOWNLOADING, TRANSCRIBING, DONE, FAILED)
+
+# Attempts before a job is marked failed for good
+DEFAULT_MAX_ATTEMPTS = 3
+
+# In-progress jobs not updated for this long are assumed to be abandoned
+DEFAULT_STALE_SECONDS = 3600
+
+# How often a worker touches the job it is working on
+HEARTBEAT_SECONDS = 60.0
+
+
+def _timestamp(seconds_ago: float = 0) -> str:
+    """UTC timestamp in the format used by the database, optionally in the past."""
+    moment = datetime.now(timezone.utc) - timedelta(seconds=seconds_ago)
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def default_worker_id() -> str:
+    """Identify this process in the jobs table."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue(
+    urls: Iterable[str],
+    db_path: str | None = None,
+    force: bool = False,
+    version: dict[str, Any] | None = None,
+) -> dict[str, list[str]]:
+    """
+    Add videos to the job queue.
+
+    Args:
+        urls: YouTube URLs to transcribe
+        db_path: Optional custom path to the database file
+        force: Queue videos again even if they are already transcribed or have
+            a job, resetting their attempts
+        version: Filters for the transcript the worker will make (see
+            lib.version_filter). Videos without one are queued, including
+            ones whose job is done, so a worker with a better model adds that
+            version. Default: any transcript counts.
+
+    Returns:
+        Dictionary with the 'queued' video IDs and the 'skipped' and 'invalid'
+        entries
+    """
+    queued, skipped, invalid = [], [], []
+    pending: dict[str, str] = {}
+    for url in urls:
+        youtube_id = extract_youtube_id(url)
+        if not youtube_id:
+            invalid.append(url)
+        elif youtube_id not in pending:
+            pending[youtube_id] = url
+
+    done = set() if force else existing_ids(pending, db_path=db_path, **version or {})
+    now = _timestamp()
+    with transaction(db_path) as conn:
+        for youtube_id, url in pending.items():
+            if force:
+                conn.execute(
+                    """
+                    INSERT INTO jobs (video_id, url, created_at, updated_at)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(video_id) DO UPDATE SET
+                        url = excluded.url, status = 'queued', attempts = 0,
+                        error = NULL, worker = NULL, updated_at = excluded.updated_at
+                    """,
+                    (youtube_id, url, now, now),
+                )
+                queued.append(youtube_id)
+                continue
+
+            exists = youtube_id in done
+            # A finished job is queued again if its video lacks the version;
+            # queued, running and failed jobs are left alone
+            cursor = conn.execute(
+                """
+                INSERT INTO jobs (video_id, url, status, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(video_id) DO UPDATE SET
+                    status = 'queued', attempts = 0, error = NULL, worker = NULL,
+                    updated_at = excluded.updated_at
+                WHERE excluded.status = 'queued' AND jobs.status = 'done'
+                """,
+                (youtube_id, url, DONE if exists else QUEUED, now, now),
+            )
+            if cursor.rowcount and not exists:
+                queued.append(youtube_id)
+            else:
+                skipped.append(youtube_id)
+
+    return {"queued": queued, "skipped": skipped, "invalid": invalid}
+
+
+def claim_job(
+    worker_id: str,
+    db_path: str | None = None,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    stale_seconds: float = DEFAULT_STALE_SECONDS,
+) -> dict[str, Any] | None:
+    """
+    Atomically take the oldest runnable job and mark it as downloading.
+
+    Runnable jobs are queued ones and in-progress ones that have not been
+    updated for stale_seconds. Abandoned jobs that have used up their attempts
+    are marked failed, so `jobs retry` can queue them again. The claim runs in
+    a BEGIN IMMEDIATE transaction, so two workers never get the same job.
+
+    Returns:
+        The claimed job row as a dictionary, or None if there is no work left
+    """
+    conn = get_connection(db_path)
+    stale = _timestamp(stale_seconds)
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(
+            """
+            UPDATE jobs
+            SET status = 'failed', updated_at = ?,
+                error = COALESCE(error, 'Worker stopped during the last attempt')
+            WHERE status IN ('downloading', 'transcribing')
+                AND updated_at < ? AND attempts >= ?
+            """,
+            (_timestamp(), stale, max_attempts),
+        )
+        row = conn.execute(
+            """
+            SELECT * FROM jobs
+            WHERE attempts < ? AND (
+                status = 'queued'
+                OR (status IN ('downloading', 'transcribing') AND updated_at < ?)
+            )
+            ORDER BY id
+            LIMIT 1
+            """,
+            (max_attempts, stale),
+        ).fetchone()
+        if row is None:
+            conn.commit()
+            return None
+
+        conn.execute(
+            """
+            UPDATE jobs
+            SET status = ?, attempts = attempts + 1, worker = ?, updated_at = ?
+            WHERE id = ?
+            """,
+            (DOWNLOADING, worker_id, _timestamp(), row["id"]),
+        )
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+    job = dict(row)
+    job.update(status=DOWNLOADING, attempts=job["attempts"] + 1, worker=worker_id)
+    return job
+
+
+def update_job(
+    job_id: int, status: str, error: str | None = None, db_path: str | None = None
+) -> None:
+    """Record a job's progress or outcome."""
+    if status not in STATUSES:
+        raise ValueError(f"Unknown job status: {status}")
+    with transaction(db_path) as conn:
+        conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+            (status, error, _timestamp(), job_id),
+        )
+
+
+def touch_job(job_id: int, worker_id: str, db_path: str | None = None) -> None:
+    """Show that a worker is still working on a job it claimed."""
+    with transaction(db_path) as conn:
+        conn.execute(
+            """
+            UPDATE jobs SET updated_at = ?
+            WHERE id = ? AND worker = ? AND status IN ('downloading', 'transcribing')
+            """,
+            (_timestamp(), job_id, worker_id),
+        )
+
+
+def release_job(job_id: int, worker_id: str, db_path: str | None = None) -> None:
+    """
+    Queue a job a worker stopped working on, giving back its attempt.
+
+    Only jobs still claimed by worker_id are released, so a job another
+    worker has since taken over is left alone.
+    """
+    with transaction(db_path) as conn:
+        conn.execute(
+            """
+            UPDATE jobs
+            SET status = 'queued', attempts = MAX(attempts - 1, 0), worker = NULL,
+                updated_at = ?
+            WHERE id = ? AND worker = ? AND status IN ('downloading', 'transcribing')
+            """,
+            (_timestamp(), job_id, worker_id),
+        )
+
+
+@contextmanager
+def _exit_on_sigterm() -> Iterator[None]:
+    """Raise SystemExit on SIGTERM in the block, so cleanup code runs."""
+    if threading.current_thread() is not threading.main_thread():
+        # Signal handlers can only be installed from the main thread
+        yield
+        return
+
+    def handle(signum: int, frame: object) -> None:
+        raise SystemExit(128 + signum)
+
+    previous = signal.signal(signal.SIGTERM, handle)
+    try:
+        yield
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+
+
+@contextmanager
+def heartbeat(
+    job_id: int,
+    worker_id: str,
+    db_path: str | None = None,
+    interval: float = HEARTBEAT_SECONDS,
+) -> Iterator[None]:
+    """
+    Touch a job every interval seconds while the block runs.
+
+    Downloads and transcriptions with large models can take longer than the
+    stale timeout; without a heartbeat another worker would take the job over.
+    """
+    stop = threading.Event()
+
+    def beat() -> None:
+        try:
+            while not stop.wait(interval):
+                try:
+                    touch_job(job_id, worker_id, db_path)
+                except sqlite3.OperationalError:
+                    # A busy database delays this beat, not the job
+                    pass
+        finally:
+            close_connections()
+
+    thread = threading.Thread(target=beat, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def retry_failed(db_path: str | None = None) -> int:
+    """Queue failed jobs again with their attempts reset; returns how many."""
+    with transaction(db_path) as conn:
+        cursor = conn.execute(
+            """
+            UPDATE jobs SET status = 'queued', attempts = 0, updated_at = ?
+            WHERE status = 'failed'
+            """,
+            (_timestamp(),),
+        )
+    return cursor.rowcount
+
+
+def job_counts(db_path: str | None = None) -> dict[str, int]:
+    """Count jobs by status."""
+    counts = dict.fromkeys(STATUSES, 0)
+    rows = get_connection(db_path).execute(
+        "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+    )
+    counts.update({status: count for status, count in rows})
+    return counts
+
+
+def _process_job(
+    job: dict[str, Any],
+    db_path: str | None,
+    model_name: str,
+    language: str | None,
+    native_audio: bool,
+    use_cache: bool,
+    backend: str = DEFAULT_BACKEND,
+    compute_type: str | None = None,
+    vad: bool = False,
+    stream: bool = False,
+) -> None:
+    """Download, transcribe and save one claimed job."""
+    from .audio import decode_audio
+
+    temp_dir = tempfile.mkdtemp(prefix="ytw_job_")
+    try:
+        audio_file, metadata_file = fetch_audio(
+            job["video_id"],
+            temp_dir,
+            native=native_audio,
+            cache=AudioCache() if use_cache else None,
+        )
+        metadata, raw_metadata = extract_metadata(metadata_file)
+
+        update_job(job["id"], TRANSCRIBING, db_path=db_path)
+        audio = decode_audio(audio_file) if native_audio and not stream else audio_file
+        transcription = run_transcription(
+            audio,
+            model_name=model_name,
+            language=language,
+            backend=backend,
+            compute_type=compute_type,
+            vad=vad,
+            stream=stream,
+        )
+
+        save_to_db(
+            build_result(
+                job["video_id"],
+                job["url"],
+                metadata,
+                raw_metadata,
+                transcription["text"],
+                transcription["segments"],
+                model_name=transcription["model"],
+                language=transcription["language"],
+                language_probability=transcription["language_probability"],
+                backend=transcription["backend"],
+                options=transcription["options"],
+            ),
+            db_path,
+        )
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def run_worker(
+    db_path: str | None = None,
+    model_name: str = "base",
+    language: str | None = None,
+    native_audio: bool = False,
+    use_cache: bool = False,
+    worker_id: str | None = None,
+    max_jobs: int | None = None,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    stale_seconds: float = DEFAULT_STALE_SECONDS,
+    poll_interval: float | None = None,
+    on_job: Callable[[dict[str, Any]], None] | None = None,
+    backend: str = DEFAULT_BACKEND,
+    compute_type: str | None = None,
+    vad: bool = False,
+    stream: bool = False,
+) -> dict[str, int]:
+    """
+    Process jobs from the queue until it is empty.
+
+    Args:
+        db_path: Optional custom path to the database file
+        model_name: Name of the Whisper model to use
+        language: Language code. If None, will auto-detect.
+        native_audio: Decode the original audio stream instead of MP3
+        use_cache: Reuse audio from the on-disk audio cache
+        worker_id: Name recorded on claimed jobs (default: host and process ID)
+        max_jobs: Stop after this many jobs
+        max_attempts: Attempts before a job is marked failed
+        stale_seconds: Age after which an in-progress job is taken over
+        poll_interval: Keep waiting for new jobs, checking this often in
+            seconds, instead of stopping when the queue is empty
+        on_job: Called with each finished job, including its final status
+            and, if done, the 'peak_rss' in bytes while it was processed
+        backend: Inference backend ('openai-whisper' or 'faster-whisper')
+        compute_type: Precision or quantization for the backend
+        vad: Only transcribe the parts of each video that contain speech
+        stream: Transcribe each video in bounded windows so memory does not
+            grow with its length
+
+    Returns:
+        Dictionary with the number of jobs 'done' and 'failed' by this worker
+    """
+    worker_id = worker_id or default_worker_id()
+    processed = {DONE: 0, FAILED: 0}
+
+    with _exit_on_sigterm():
+        while max_jobs is None or sum(processed.values()) < max_jobs:
+            job = claim_job(worker_id, db_path, max_attempts, stale_seconds)
+            if job is None:
+                if poll_interval is None:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            # Jobs run one at a time, so the peak memory is this job's
+            reset_peak_rss()
+            try:
+                with heartbeat(
+                    job["id"],
+                    worker_id,
+                    db_path,
+                    min(HEARTBEAT_SECONDS, stale_seconds / 4),
+                ):
+                    _process_job(
+                        job,
+                        db_path,
+                        model_name,
+                        language,
+                        native_audio,
+                        use_cache,
+                        backend,
+                        compute_type,
+                        vad,
+                        stream,
+                    )
+            except (KeyboardInterrupt, SystemExit):
+                # Stopped by the user, not by the job: let the next worker have it
+                # now instead of after the stale timeout
+                release_job(job["id"], worker_id, db_path)
+                raise
+            except Exception as e:
+                # Leave the job for another attempt unless it has run out of them
+                status = FAILED if job["attempts"] >= max_attempts else QUEUED
+                update_job(job["id"], status, error=str(e), db_path=db_path)
+                job.update(status=status, error=str(e))
+                processed[FAILED] += 1
+            else:
+                update_job(job["id"], DONE, db_path=db_path)
+                job.update(status=DONE, peak_rss=peak_rss())
+                processed[DONE] += 1
+
+            if on_job:
+                on_job(job)
+
+    return processed
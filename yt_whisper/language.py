@@ -0,0 +1,93 @@
+"""
+Language identification and language-based model routing.
+
+Whisper identifies the language from a single 30 second window, which the
+smallest model does nearly as well as the largest. Detecting it up front with
+that model lets ``--model auto`` send English videos to a small English-only
+model and only pay for a large multilingual model when it is needed.
+"""
+
+import os
+from collections import Counter
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from .audio import SAMPLE_RATE, decode_audio
+from .backends import DEFAULT_BACKEND, get_backend, resolve_precision
+from .models import ModelCache, get_model
+
+# Model name that picks the model from the detected language
+AUTO_MODEL = "auto"
+
+# Model used for language identification
+DETECT_MODEL = "tiny"
+
+# Length of the audio window Whisper identifies the language from
+WINDOW_SECONDS = 30.0
+
+# Models --model auto routes to, overridable with environment variables
+ENGLISH_MODEL = os.environ.get("YT_WHISPER_ENGLISH_MODEL", "small.en")
+MULTILINGUAL_MODEL = os.environ.get("YT_WHISPER_MULTILINGUAL_MODEL", "large")
+
+
+def sample_windows(
+    samples: npt.NDArray[np.float32], windows: int = 1
+) -> list[npt.NDArray[np.float32]]:
+    """
+    Pick evenly spaced windows of the audio, starting with the first one.
+
+    Audio shorter than the requested windows yields fewer of them.
+    """
+    window = int(WINDOW_SECONDS * SAMPLE_RATE)
+    last_start = max(0, len(samples) - window)
+    count = max(1, min(windows, len(samples) // window or 1))
+    starts = np.linspace(0, last_start, count).astype(int) if count > 1 else [0]
+    return [np.asarray(samples[start : start + window]) for start in starts]
+
+
+def detect_language(
+    audio: Any,  # noqa: ANN401
+    windows: int = 1,
+    model_name: str = DETECT_MODEL,
+    backend: str = DEFAULT_BACKEND,
+    compute_type: str | None = None,
+    model_cache: ModelCache | None = None,
+) -> dict[str, Any]:
+    """
+    Identify the spoken language without transcribing.
+
+    Args:
+        audio: Path to the audio file, or 16 kHz mono float32 samples
+        windows: Number of 30 second windows to sample across the audio. More
+            windows help when a video opens with music or another language.
+        model_name: Multilingual Whisper model to use
+        backend: Inference backend ('openai-whisper' or 'faster-whisper')
+        compute_type: Precision or quantization for the backend
+        model_cache: Cache to load the model from instead of the shared one
+
+    Returns:
+        Dictionary with the 'language' code and its 'probability', averaged
+        over the windows
+    """
+    samples = decode_audio(audio) if isinstance(audio, str) else audio
+    precision = resolve_precision(backend, compute_type)
+    load = model_cache.get if model_cache else get_model
+    model = load(model_name, precision=precision, backend=backend)
+
+    scores: Counter[str] = Counter()
+    sampled = sample_windows(samples, windows)
+    for window in sampled:
+        language, probability = get_backend(backend).detect_language(
+            model, window, precision
+        )
+        scores[language] += probability
+
+    language, total = scores.most_common(1)[0]
+    return {"language": language, "probability": total / len(sampled)}
+
+
+def route_model(language: str | None) -> str:
+    """Choose the model for a language: English-only for English audio."""
+    return ENGLISH_MODEL if language == "en" else MULTILINGUAL_MODEL
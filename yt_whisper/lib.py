@@ -1,4 +1,5 @@
 # yt_whisper/lib.py
+import hashlib
 import json
 import os
 from pathlib import Path
@@ -8,9 +9,13 @@ import tempfile
 from datetime import datetime, timezone
 from typing import Any
 
-import whisper
-import yt_dlp
-from yt_dlp.utils import DownloadError
+# yt-dlp, numpy and the modules built on it (audio, language, parallel, vad)
+# are imported in the functions that use them, so that importing this module,
+# and with it the CLI, stays fast for commands that only read the database
+from .backends import DEFAULT_BACKEND, get_backend, resolve_precision
+from .cache import AudioCache
+from .models import ModelCache, get_model
+from .timing import Timings, peak_rss, reset_peak_rss
 
 
 def extract_youtube_id(url: str) -> str | None:
@@ -50,8 +55,17 @@ def is_ffmpeg_available() -> bool:
         return False
 
 
+def _find_native_audio(temp_path: Path, youtube_id: str) -> Path | None:
+    """Find a previously downloaded native audio file for a video."""
+    for candidate in sorted(temp_path.glob(f"ytw_audio_{youtube_id}.*")):
+        if candidate.name.endswith((".info.json", ".part", ".ytdl")):
+            continue
+        return candidate
+    return None
+
+
 def download_audio(
-    youtube_id: str, temp_dir: str, force: bool = False
+    youtube_id: str, temp_dir: str, force: bool = False, native: bool = False
 ) -> tuple[str, str]:
     """
     Download audio from YouTube video to a temporary directory.
@@ -60,6 +74,8 @@ def download_audio(
         youtube_id: The YouTube video ID
         temp_dir: Temporary directory path
         force: Whether to force re-download if file exists
+        native: Keep the best audio stream in its original container (e.g.
+            webm/opus or m4a) instead of re-encoding it to MP3
 
     Returns:
         Tuple of (audio_file_path, metadata_file_path)
@@ -68,7 +84,12 @@ def download_audio(
     output_file = temp_path / f"ytw_audio_{youtube_id}.mp3"
     metadata_file = temp_path / f"ytw_audio_{youtube_id}.info.json"
 
-    if os.path.exists(str(output_file)) and not force:
+    if native:
+        existing = _find_native_audio(temp_path, youtube_id)
+        if existing and not force:
+            print(f"Using existing file: {existing}")
+            return str(existing), str(metadata_file)
+    elif os.path.exists(str(output_file)) and not force:
         print(f"Using existing file: {output_file}")
         return str(output_file), str(metadata_file)
 
@@ -89,6 +110,14 @@ def download_audio(
         "quiet": False,
         "no_warnings": False,
     }
+    if native:
+        # No postprocessing: the stream is decoded once, straight to PCM
+        ydl_opts["postprocessors"] = []
+        ydl_opts["outtmpl"] = str(temp_path / f"ytw_audio_{youtube_id}.%(ext)s")
+        ydl_opts["overwrites"] = force
+
+    import yt_dlp
+    from yt_dlp.utils import DownloadError
 
     try:
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
@@ -105,14 +134,243 @@ def download_audio(
         print(f"An unexpected error occurred during download: {e}")
         raise
 
+    if native:
+        downloaded = _find_native_audio(temp_path, youtube_id)
+        if downloaded is None:
+            raise FileNotFoundError(
+                f"Downloaded audio for {youtube_id} not found in {temp_dir}"
+            )
+        return str(downloaded), str(metadata_file)
+
     return str(output_file), str(metadata_file)
 
 
+def fetch_audio(
+    youtube_id: str,
+    temp_dir: str,
+    force: bool = False,
+    native: bool = False,
+    cache: AudioCache | None = None,
+) -> tuple[str, str]:
+    """
+    Get the audio of a video, from the audio cache when possible.
+
+    Args:
+        youtube_id: The YouTube video ID
+        temp_dir: Temporary directory to download to
+        force: Whether to force re-download even if the audio is cached
+        native: Keep the original audio container instead of converting to MP3
+        cache: Audio cache to read from and store new downloads in
+
+    Returns:
+        Tuple of (audio_file_path, metadata_file_path)
+    """
+    audio_format = "native" if native else "mp3"
+    if cache is not None and not force:
+        cached = cache.lookup(youtube_id, audio_format)
+        if cached:
+            return cached
+
+    audio_file, metadata_file = download_audio(
+        youtube_id, temp_dir, force, native=native
+    )
+
+    if cache is not None and os.path.exists(metadata_file):
+        return cache.store(youtube_id, audio_format, audio_file, metadata_file)
+    return audio_file, metadata_file
+
+
+def normalize_segments(segments: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Keep the segment fields yt-whisper stores, in a JSON-friendly form."""
+    return [
+        {
+            "start": float(segment["start"]),
+            "end": float(segment["end"]),
+            "text": segment["text"].strip(),
+            "tokens": [int(token) for token in segment.get("tokens", [])],
+            "avg_logprob": segment.get("avg_logprob"),
+            "no_speech_prob": segment.get("no_speech_prob"),
+        }
+        for segment in segments
+    ]
+
+
+def run_transcription(
+    audio: Any,  # noqa: ANN401
+    model_name: str = "base",
+    language: str | None = None,
+    model: Any = None,  # noqa: ANN401
+    workers: int = 1,
+    timings: Timings | None = None,
+    backend: str = DEFAULT_BACKEND,
+    compute_type: str | None = None,
+    vad: bool = False,
+    model_cache: ModelCache | None = None,
+    stream: bool = False,
+) -> dict[str, Any]:
+    """
+    Transcribe audio and keep Whisper's timestamped segments.
+
+    Args:
+        audio: Path to the audio file, or 16 kHz mono float32 samples
+        model_name: Name of the Whisper model to use, or 'auto' to detect the
+            language first and pick an English-only or a multilingual model
+        language: Language code (e.g., 'en', 'es', 'fr'). If None, will auto-detect.
+        model: Already loaded model to use instead of the shared model cache
+        workers: Number of processes to split long audio across. Audio shorter
+            than two chunks is always transcribed in this process.
+        timings: Timings to record the model_load and inference spans in
+        backend: Inference backend ('openai-whisper' or 'faster-whisper')
+        compute_type: Precision or quantization for the backend (default:
+            'fp32' for openai-whisper, 'int8' for faster-whisper)
+        vad: Only transcribe the parts of the audio that contain speech
+        model_cache: Cache to load models from instead of the shared one
+        stream: Decode and transcribe the audio in 30 second windows, holding
+            only the current one in memory (see yt_whisper.streaming). workers
+            is ignored.
+
+    Returns:
+        Dictionary with the full 'text', the 'segments' (start, end, text,
+        tokens, avg_logprob, no_speech_prob), the 'language', the
+        'language_probability' (if it was detected up front), the 'model' and
+        'backend' used and the 'options' that identify the transcript version
+        (see transcription_options). With vad, also 'vad' with the
+        'audio_seconds', 'speech_seconds' and 'skipped_seconds'.
+    """
+    from .audio import SAMPLE_RATE, decode_audio
+    from .language import AUTO_MODEL, detect_language, route_model
+    from .parallel import DEFAULT_CHUNK_SECONDS, transcribe_parallel
+    from .vad import find_speech, join_regions, remap_segments, speech_stats
+
+    timings = timings or Timings()
+    precision = resolve_precision(backend, compute_type)
+    load = model_cache.get if model_cache else get_model
+
+    if stream:
+        from .streaming import transcribe_stream
+
+        return transcribe_stream(
+            audio,
+            model_name=model_name,
+            language=language,
+            model=model,
+            timings=timings,
+            backend=backend,
+            compute_type=precision,
+            vad=vad,
+            model_cache=model_cache,
+        )
+
+    if vad:
+        if isinstance(audio, str):
+            with timings.span("decode"):
+                audio = decode_audio(audio)
+        with timings.span("vad"):
+            regions = find_speech(audio)
+            stats = speech_stats(regions, len(audio))
+        print(
+            f"Skipping {stats['skipped_seconds']:.1f}s of "
+            f"{stats['audio_seconds']:.1f}s without speech"
+        )
+        if not regions:
+            return {
+                "text": "",
+                "segments": [],
+                "language": language,
+                "language_probability": None,
+                "model": None if model_name == AUTO_MODEL else model_name,
+                "backend": backend,
+                "options": transcription_options(precision, vad=True),
+                "vad": stats,
+            }
+
+        # Language ID and routing run on the speech, not on an intro
+        result = run_transcription(
+            join_regions(audio, regions),
+            model_name=model_name,
+            language=language,
+            model=model,
+            workers=workers,
+            timings=timings,
+            backend=backend,
+            compute_type=precision,
+            model_cache=model_cache,
+        )
+        result["segments"] = remap_segments(result["segments"], regions)
+        result["options"] = transcription_options(precision, vad=True)
+        result["vad"] = stats
+        return result
+
+    language_probability = None
+    if model_name == AUTO_MODEL:
+        if language is None:
+            if isinstance(audio, str):
+                with timings.span("decode"):
+                    audio = decode_audio(audio)
+            with timings.span("language_id"):
+                detected = detect_language(
+                    audio,
+                    backend=backend,
+                    compute_type=precision,
+                    model_cache=model_cache,
+                )
+            language = detected["language"]
+            language_probability = detected["probability"]
+            print(f"Detected language: {language} ({language_probability:.0%})")
+        model_name = route_model(language)
+
+    if workers > 1:
+        samples = decode_audio(audio) if isinstance(audio, str) else audio
+        if len(samples) >= 2 * DEFAULT_CHUNK_SECONDS * SAMPLE_RATE:
+            # Each worker loads its own model, so this is all inference time
+            with timings.span("inference"):
+                result = transcribe_parallel(
+                    samples,
+                    model_name,
+                    language=language,
+                    workers=workers,
+                    backend=backend,
+                    compute_type=precision,
+                )
+            result.update(
+                model=model_name,
+                language_probability=language_probability,
+                backend=backend,
+                options=transcription_options(precision),
+            )
+            return result
+        audio = samples
+
+    if model is None:
+        print(f"Loading Whisper model: {model_name}...")
+        with timings.span("model_load"):
+            model = load(model_name, precision=precision, backend=backend)
+
+    if isinstance(audio, str):
+        print(f"Transcribing {audio}...")
+    with timings.span("inference"):
+        result = get_backend(backend).transcribe(model, audio, language, precision)
+
+    return {
+        "text": result["text"],
+        "segments": normalize_segments(result.get("segments") or []),
+        "language": result.get("language", language),
+        "language_probability": language_probability,
+        "model": model_name,
+        "backend": backend,
+        "options": transcription_options(precision),
+    }
+
+
 def transcribe_audio(
     audio_file: str,
     temp_dir: str,
     model_name: str = "base",
     language: str | None = None,
+    model: Any = None,  # noqa: ANN401
+    workers: int = 1,
+    backend: str = DEFAULT_BACKEND,
+    compute_type: str | None = None,
 ) -> tuple[str, str]:
     """
     Transcribe audio file using Whisper Python library.
@@ -122,6 +380,10 @@ def transcribe_audio(
         temp_dir: Temporary directory path
         model_name: Name of the Whisper model to use
         language: Language code (e.g., 'en', 'es', 'fr'). If None, will auto-detect.
+        model: Already loaded model to use instead of the shared model cache
+        workers: Number of processes to split long audio across
+        backend: Inference backend ('openai-whisper' or 'faster-whisper')
+        compute_type: Precision or quantization for the backend
 
     Returns:
         Tuple of (transcription_text, transcription_file_path)
@@ -129,12 +391,15 @@ def transcribe_audio(
     youtube_id = os.path.basename(audio_file).split("_")[-1].split(".")[0]
     output_file = os.path.join(temp_dir, f"ytw_transcript_{youtube_id}.txt")
 
-    print(f"Loading Whisper model: {model_name}...")
-    model = whisper.load_model(model_name)
-
-    print(f"Transcribing {audio_file}...")
-    result = model.transcribe(audio_file, language=language, fp16=False)
-    transcription = result["text"]
+    transcription = run_transcription(
+        audio_file,
+        model_name=model_name,
+        language=language,
+        model=model,
+        workers=workers,
+        backend=backend,
+        compute_type=compute_type,
+    )["text"]
 
     with open(output_file, "w", encoding="utf-8") as f:
         f.write(transcription)
@@ -184,11 +449,109 @@ def extract_metadata(metadata_file: str) -> tuple[dict[str, Any], dict[str, Any]
         return empty_metadata, {}
 
 
+def transcription_options(
+    compute_type: str, vad: bool = False, batched: bool = False, streamed: bool = False
+) -> dict[str, Any]:
+    """
+    Options besides the model, language and backend that change a transcript.
+
+    Together they identify a version of a video's transcript in the database.
+    """
+    options: dict[str, Any] = {"compute_type": compute_type, "vad": vad}
+    if batched:
+        options["batched"] = True
+    if streamed:
+        options["streamed"] = True
+    return options
+
+
+def options_hash(options: dict[str, Any] | None) -> str:
+    """Short stable hash of transcription_options(), '' if they are unknown."""
+    if options is None:
+        return ""
+    encoded = json.dumps(options, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+def version_filter(
+    model_name: str,
+    language: str | None,
+    backend: str = DEFAULT_BACKEND,
+    compute_type: str | None = None,
+    vad: bool = False,
+    batched: bool = False,
+    streamed: bool = False,
+) -> dict[str, Any]:
+    """
+    Filters for db.existing_ids() matching the transcript these settings make.
+
+    With model 'auto' and no language the model is only known once the
+    language is detected, so any transcript of a video matches.
+    """
+    from .language import AUTO_MODEL, route_model
+
+    if model_name == AUTO_MODEL:
+        if language is None:
+            return {}
+        model_name = route_model(language)
+    options = transcription_options(
+        resolve_precision(backend, compute_type), vad, batched, streamed
+    )
+    return {
+        "model_name": model_name,
+        "language": language,
+        "backend": backend,
+        "options_hash": options_hash(options),
+    }
+
+
+def build_result(
+    youtube_id: str,
+    url: str,
+    metadata: dict[str, Any],
+    raw_metadata: dict[str, Any],
+    transcription: str,
+    segments: list[dict[str, Any]] | None = None,
+    model_name: str | None = None,
+    language: str | None = None,
+    language_probability: float | None = None,
+    backend: str | None = None,
+    options: dict[str, Any] | None = None,
+) -> dict:
+    """Assemble the result dictionary stored in the database."""
+    return {
+        "id": youtube_id,
+        "url": url,
+        "title": metadata["title"],
+        "channel": metadata["channel"],
+        "author": metadata["author"],
+        "upload_date": metadata["upload_date"],
+        "duration": metadata["duration"],
+        "description": metadata["description"],
+        "transcription": transcription,
+        "segments": segments or [],
+        "metadata": raw_metadata,  # This is the complete raw metadata from YouTube
+        "created_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "model": model_name,
+        "language": language,
+        "language_probability": language_probability,
+        "backend": backend,
+        "options_hash": options_hash(options),
+    }
+
+
 def download_and_transcribe(
     url: str,
     force: bool = False,
     model_name: str = "base",
     language: str | None = None,
+    native_audio: bool = False,
+    use_cache: bool = False,
+    workers: int = 1,
+    backend: str = DEFAULT_BACKEND,
+    compute_type: str | None = None,
+    vad: bool = False,
+    stream: bool = False,
 ) -> dict:
     """
     Main function to download and transcribe a YouTube video.
@@ -196,10 +559,27 @@ def download_and_transcribe(
     Args:
         url: YouTube URL
         force: Whether to force re-download if file exists
+        model_name: Name of the Whisper model to use
+        language: Language code (e.g., 'en', 'es', 'fr'). If None, will auto-detect.
+        native_audio: Download the original audio stream and decode it once to
+            PCM for Whisper, instead of converting it to MP3 first
+        use_cache: Reuse audio from the on-disk audio cache and store new
+            downloads in it
+        workers: Number of processes to split long videos across
+        backend: Inference backend ('openai-whisper' or 'faster-whisper')
+        compute_type: Precision or quantization for the backend
+        vad: Only transcribe the parts of the audio that contain speech
+        stream: Transcribe in bounded windows decoded through a pipe, so memory
+            does not grow with the length of the video
 
     Returns:
-        Dictionary with video information and transcription
+        Dictionary with video information and transcription, plus the
+        'timings' of each stage in seconds, the 'peak_rss' in bytes during
+        transcription and, with vad, the 'vad' stats of how much audio was
+        skipped
     """
+    from .audio import decode_audio
+
     youtube_id = extract_youtube_id(url)
 
     if not youtube_id:
@@ -209,36 +589,113 @@ def download_and_transcribe(
     with tempfile.TemporaryDirectory() as temp_dir:
         print(f"Created temporary directory: {temp_dir}")
 
+        timings = Timings()
+
         # Download audio and get metadata
-        audio_file, metadata_file = download_audio(youtube_id, temp_dir, force)
+        with timings.span("download"):
+            audio_file, metadata_file = fetch_audio(
+                youtube_id,
+                temp_dir,
+                force,
+                native=native_audio,
+                cache=AudioCache() if use_cache else None,
+            )
 
         # Extract metadata
-        metadata, raw_metadata = extract_metadata(metadata_file)
+        with timings.span("metadata"):
+            metadata, raw_metadata = extract_metadata(metadata_file)
 
         # Transcribe the audio
-        transcription, transcription_file = transcribe_audio(
-            audio_file,
-            temp_dir,
+        reset_peak_rss()
+        audio = audio_file
+        if native_audio and not stream:
+            with timings.span("decode"):
+                audio = decode_audio(audio_file)
+        transcription = run_transcription(
+            audio,
             model_name=model_name,
             language=language,
+            workers=workers,
+            timings=timings,
+            backend=backend,
+            compute_type=compute_type,
+            vad=vad,
+            stream=stream,
         )
+        rss = peak_rss()
 
         # Prepare the result
-        result = {
-            "id": youtube_id,
-            "url": url,
-            "title": metadata["title"],
-            "channel": metadata["channel"],
-            "author": metadata["author"],
-            "upload_date": metadata["upload_date"],
-            "duration": metadata["duration"],
-            "description": metadata["description"],
-            "transcription": transcription,
-            "metadata": raw_metadata,  # This is the complete raw metadata from YouTube
-            "created_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
-        }
+        result = build_result(
+            youtube_id,
+            url,
+            metadata,
+            raw_metadata,
+            transcription["text"],
+            transcription["segments"],
+            model_name=transcription["model"],
+            language=transcription["language"],
+            language_probability=transcription["language_probability"],
+            backend=transcription["backend"],
+            options=transcription["options"],
+        )
+        result["timings"] = timings.as_dict()
+        result["peak_rss"] = rss
+        if "vad" in transcription:
+            result["vad"] = transcription["vad"]
 
         # The temporary directory and all files in it will be automatically
         # deleted when exiting the context manager
 
     return result
+
+
+def download_and_detect_language(
+    url: str,
+    windows: int = 1,
+    native_audio: bool = False,
+    use_cache: bool = False,
+    backend: str = DEFAULT_BACKEND,
+    compute_type: str | None = None,
+) -> dict[str, Any]:
+    """
+    Download a YouTube video's audio and identify its language.
+
+    Args:
+        url: YouTube URL
+        windows: Number of 30 second windows to sample across the audio
+        native_audio: Download the original audio stream instead of MP3
+        use_cache: Reuse audio from the on-disk audio cache and store new
+            downloads in it
+        backend: Inference backend ('openai-whisper' or 'faster-whisper')
+        compute_type: Precision or quantization for the backend
+
+    Returns:
+        Dictionary with the video 'id', the 'language', its 'probability' and
+        the 'model' that --model auto would pick
+    """
+    from .audio import decode_audio
+    from .language import detect_language, route_model
+
+    youtube_id = extract_youtube_id(url)
+    if not youtube_id:
+        raise ValueError(f"Could not extract YouTube ID from URL: {url}")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        audio_file, _ = fetch_audio(
+            youtube_id,
+            temp_dir,
+            native=native_audio,
+            cache=AudioCache() if use_cache else None,
+        )
+        detected = detect_language(
+            decode_audio(audio_file),
+            windows=windows,
+            backend=backend,
+            compute_type=compute_type,
+        )
+
+    return {
+        "id": youtube_id,
+        **detected,
+        "model": route_model(detected["language"]),
+    }
@@ -0,0 +1,144 @@
+"""
+Process-wide cache of loaded Whisper models.
+
+Loading a Whisper model deserializes hundreds of megabytes of weights, so
+repeated transcriptions in the same process should reuse the loaded model
+instead of calling ``whisper.load_model`` for every video. Models of every
+inference backend share the cache.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any
+
+from .backends import DEFAULT_BACKEND, get_backend
+
+DEFAULT_MAX_MODELS = 2
+
+ModelKey = tuple[str, str, str, str]
+
+
+class ModelCache:
+    """
+    LRU cache of loaded models keyed by (model name, device, precision, backend).
+
+    At most ``max_models`` models are kept resident; the least recently used
+    model is dropped when a new one has to be loaded. Models are loaded outside
+    the cache lock, so a slow load does not hold up lookups of other models;
+    threads asking for a model that is being loaded wait for that load.
+    """
+
+    def __init__(self, max_models: int = DEFAULT_MAX_MODELS) -> None:
+        self.max_models = max(1, max_models)
+        self._models: OrderedDict[ModelKey, Any] = OrderedDict()
+        self._loading: dict[ModelKey, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.load_time = 0.0
+
+    def get(
+        self,
+        model_name: str,
+        device: str | None = None,
+        precision: str = "fp32",
+        backend: str = DEFAULT_BACKEND,
+    ) -> Any:  # noqa: ANN401
+        """
+        Return a loaded model, loading it on first use.
+
+        Args:
+            model_name: Name of the Whisper model (e.g. 'base', 'small')
+            device: Device to load the model on. None lets the backend choose.
+            precision: Precision or compute type the model is used with (e.g.
+                'fp32' for openai-whisper, 'int8' for faster-whisper)
+            backend: Name of the inference backend that loads the model
+
+        Returns:
+            The loaded Whisper model
+        """
+        key = (model_name, device or "auto", precision, backend)
+
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                self.hits += 1
+                return self._models[key]
+
+            loading = self._loading.get(key)
+            if loading is None:
+                self.misses += 1
+                self._loading[key] = future = Future()
+            else:
+                self.hits += 1
+        if loading is not None:
+            return loading.result()
+
+        start = time.perf_counter()
+        try:
+            model = get_backend(backend).load(model_name, device, precision)
+        except BaseException as e:
+            with self._lock:
+                del self._loading[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self.load_time += time.perf_counter() - start
+            del self._loading[key]
+            self._models[key] = model
+            while len(self._models) > self.max_models:
+                self._models.popitem(last=False)
+                self.evictions += 1
+        future.set_result(model)
+        return model
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit/miss counters, total load time and the resident models."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "load_time": self.load_time,
+                "resident": [list(key) for key in self._models],
+                "max_models": self.max_models,
+            }
+
+    def clear(self) -> None:
+        """Drop all resident models and reset the counters."""
+        with self._lock:
+            self._models.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.load_time = 0.0
+
+
+_cache = ModelCache(
+    int(os.environ.get("YT_WHISPER_MAX_MODELS", str(DEFAULT_MAX_MODELS)))
+)
+
+
+def get_model(
+    model_name: str,
+    device: str | None = None,
+    precision: str = "fp32",
+    backend: str = DEFAULT_BACKEND,
+) -> Any:  # noqa: ANN401
+    """Get a Whisper model from the process-wide cache."""
+    return _cache.get(model_name, device=device, precision=precision, backend=backend)
+
+
+def get_model_cache_stats() -> dict[str, Any]:
+    """Report hits, misses and cumulative load time of the model cache."""
+    return _cache.stats()
+
+
+def clear_model_cache() -> None:
+    """Unload all cached models."""
+    _cache.clear()
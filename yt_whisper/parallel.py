@@ -0,0 +1,186 @@
+"""
+Chunked parallel transcription of long audio.
+
+Long audio is split at quiet moments into chunks that are transcribed in a
+pool of worker processes, each holding its own model, and the chunk results
+are stitched back together on the original timeline.
+"""
+
+import multiprocessing
+import os
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from .audio import SAMPLE_RATE, find_silence_splits
+from .backends import DEFAULT_BACKEND, resolve_precision
+from .models import get_model
+
+# Default chunk length; long enough that Whisper keeps useful context
+DEFAULT_CHUNK_SECONDS = 600.0
+
+# Audio added on both sides of a chunk so words at a cut are heard in full
+DEFAULT_OVERLAP_SECONDS = 2.0
+
+
+def _init_worker(
+    model_name: str, threads: int, backend: str, compute_type: str
+) -> None:
+    """Load the model once per worker and share the CPU cores between workers."""
+    try:
+        import torch
+
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    get_model(model_name, precision=compute_type, backend=backend)
+
+
+def _transcribe_chunk(
+    samples: npt.NDArray[np.float32],
+    offset: float,
+    keep_start: float,
+    keep_end: float,
+    model_name: str,
+    language: str | None,
+    backend: str = DEFAULT_BACKEND,
+    compute_type: str | None = None,
+) -> tuple[list[dict[str, Any]], str | None]:
+    """
+    Transcribe one chunk and move its segments onto the original timeline.
+
+    Only segments centred inside [keep_start, keep_end) are returned; the
+    overlap on either side belongs to the neighbouring chunks, which removes
+    the duplicate segments the overlap produces.
+    """
+    # Imported here to keep the module importable without a cycle
+    from .lib import run_transcription
+
+    compute_type = resolve_precision(backend, compute_type)
+    model = get_model(model_name, precision=compute_type, backend=backend)
+    result = run_transcription(
+        samples,
+        model_name,
+        language=language,
+        model=model,
+        backend=backend,
+        compute_type=compute_type,
+    )
+
+    kept = []
+    for segment in result["segments"]:
+        start = segment["start"] + offset
+        end = segment["end"] + offset
+        if keep_start <= (start + end) / 2 < keep_end:
+            kept.append({**segment, "start": start, "end": end})
+    return kept, result.get("language")
+
+
+def plan_chunks(
+    num_samples: int,
+    splits: list[int],
+    overlap_seconds: float = DEFAULT_OVERLAP_SECONDS,
+    sample_rate: int = SAMPLE_RATE,
+) -> list[tuple[int, int, float, float]]:
+    """
+    Turn split points into chunk boundaries.
+
+    Returns:
+        List of (first_sample, last_sample, keep_start, keep_end) where the
+        sample range includes the overlap and the keep range, in seconds, does
+        not
+    """
+    overlap = int(overlap_seconds * sample_rate)
+    bounds = [0, *splits, num_samples]
+    chunks = []
+    for i in range(len(bounds) - 1):
+        first = max(0, bounds[i] - overlap)
+        last = min(num_samples, bounds[i + 1] + overlap)
+        keep_start = bounds[i] / sample_rate if i > 0 else float("-inf")
+        keep_end = bounds[i + 1] / sample_rate if i < len(bounds) - 2 else float("inf")
+        chunks.append((first, last, keep_start, keep_end))
+    return chunks
+
+
+def transcribe_parallel(
+    samples: npt.NDArray[np.float32],
+    model_name: str = "base",
+    language: str | None = None,
+    workers: int | None = None,
+    chunk_seconds: float = DEFAULT_CHUNK_SECONDS,
+    overlap_seconds: float = DEFAULT_OVERLAP_SECONDS,
+    executor: Executor | None = None,
+    backend: str = DEFAULT_BACKEND,
+    compute_type: str | None = None,
+) -> dict[str, Any]:
+    """
+    Transcribe long audio in chunks across several processes.
+
+    Args:
+        samples: 16 kHz mono float32 samples
+        model_name: Name of the Whisper model to use
+        language: Language code. If None, each chunk detects the language and
+            the most common answer is reported.
+        workers: Number of worker processes (default: number of CPU cores)
+        chunk_seconds: Approximate chunk length in seconds
+        overlap_seconds: Audio shared between neighbouring chunks
+        executor: Executor to run chunks on instead of a new process pool
+        backend: Inference backend each worker loads its model with
+        compute_type: Precision or quantization for the backend
+
+    Returns:
+        Dictionary with 'text', 'segments' and 'language', like
+        lib.run_transcription
+    """
+    workers = workers or os.cpu_count() or 1
+    compute_type = resolve_precision(backend, compute_type)
+    splits = find_silence_splits(samples, chunk_seconds)
+    chunks = plan_chunks(len(samples), splits, overlap_seconds)
+    print(f"Transcribing {len(chunks)} chunks with {workers} workers...")
+
+    own_executor = executor is None
+    if executor is None:
+        executor = ProcessPoolExecutor(
+            max_workers=min(workers, len(chunks)),
+            # Forking a process that already runs torch threads can deadlock
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(
+                model_name,
+                max(1, (os.cpu_count() or 1) // workers),
+                backend,
+                compute_type,
+            ),
+        )
+
+    try:
+        futures = [
+            executor.submit(
+                _transcribe_chunk,
+                np.asarray(samples[first:last]),
+                first / SAMPLE_RATE,
+                keep_start,
+                keep_end,
+                model_name,
+                language,
+                backend,
+                compute_type,
+            )
+            for first, last, keep_start, keep_end in chunks
+        ]
+        results = [future.result() for future in futures]
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+    segments = [segment for chunk_segments, _ in results for segment in chunk_segments]
+    languages = Counter(lang for _, lang in results if lang)
+
+    return {
+        "text": "".join(" " + segment["text"] for segment in segments),
+        "segments": segments,
+        "language": language or (languages.most_common(1)[0][0] if languages else None),
+    }
@@ -0,0 +1,133 @@
+"""
+Expansion of playlist and channel URLs into videos, and channel sync.
+
+Collections are listed with yt-dlp's flat extraction, which reads only the
+listing pages instead of every video's info page. Entries are consumed lazily,
+so a sync of a channel (listed newest first) stops at the last video it saw and
+only fetches the listing pages that contain new uploads.
+"""
+
+import re
+from typing import Any
+
+from .db import get_channel, update_channel
+from .jobs import enqueue
+from .lib import extract_youtube_id
+
+# Channel root URLs, which are expanded to their uploads tab
+_CHANNEL_PATTERN = re.compile(
+    r"^(?P<root>(?:https?://)?(?:www\.|m\.)?youtube\.com/"
+    r"(?:@[^/?#]+|channel/[^/?#]+|c/[^/?#]+|user/[^/?#]+))"
+    r"(?P<tab>/[^?#]*)?"
+)
+_PLAYLIST_PATTERN = re.compile(r"youtube\.com/playlist\?(?:.*&)?list=[^&]+")
+
+
+def is_collection_url(url: str) -> bool:
+    """Whether a URL points to a playlist or channel rather than a single video."""
+    if extract_youtube_id(url):
+        # A watch URL with a list= parameter is still a single video
+        return False
+    return bool(_PLAYLIST_PATTERN.search(url) or _CHANNEL_PATTERN.match(url))
+
+
+def is_channel_url(url: str) -> bool:
+    """Whether a URL points to a channel, whose uploads are listed newest first."""
+    return bool(_CHANNEL_PATTERN.match(url))
+
+
+def _listing_url(url: str) -> str:
+    """Point a bare channel URL at its videos tab instead of the tab overview."""
+    match = _CHANNEL_PATTERN.match(url)
+    if match and match.group("tab") in (None, "", "/"):
+        return f"{match.group('root')}/videos"
+    return url
+
+
+def list_entries(
+    url: str, stop_at: str | None = None, limit: int | None = None
+) -> tuple[str | None, list[dict[str, Any]]]:
+    """
+    List the videos of a playlist or channel without fetching each video.
+
+    Args:
+        url: Playlist or channel URL
+        stop_at: Stop listing when this video ID is reached (it is excluded)
+        limit: Maximum number of videos to list
+
+    Returns:
+        Tuple of (collection title, entries in listing order), where each entry
+        has the video 'id', 'url' and 'title' (if known)
+    """
+    import yt_dlp
+
+    ydl_opts = {
+        "extract_flat": "in_playlist",
+        # Fetch listing pages as entries are consumed, so stopping early helps
+        "lazy_playlist": True,
+        "skip_download": True,
+        "quiet": True,
+        "no_warnings": True,
+    }
+    listed: list[dict[str, Any]] = []
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(_listing_url(url), download=False, process=False)
+        info = info or {}
+        for entry in info.get("entries") or []:
+            # Skip nested playlists such as a channel's Shorts or Live tabs
+            if not entry or entry.get("ie_key", "Youtube") != "Youtube":
+                continue
+            video_id = entry.get("id")
+            if not video_id:
+                continue
+            if video_id == stop_at or (limit is not None and len(listed) >= limit):
+                break
+            listed.append(
+                {
+                    "id": video_id,
+                    "url": f"https://www.youtube.com/watch?v={video_id}",
+                    "title": entry.get("title"),
+                }
+            )
+    return info.get("title"), listed
+
+
+def sync_channel(
+    url: str,
+    db_path: str | None = None,
+    limit: int | None = None,
+    version: dict[str, Any] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Queue the videos of a channel or playlist that were added since the last sync.
+
+    Channels are listed newest first, so listing stops at the newest video seen
+    by the previous sync. Playlists are listed in full and rely on the job
+    queue to skip videos it already knows. New videos are added to the job
+    queue, where `yt-whisper worker` picks them up.
+
+    Args:
+        url: Channel or playlist URL
+        db_path: Optional custom path to the database file
+        limit: Maximum number of videos to list on the first sync of a channel
+        version: Filters for the transcript the worker will make, see
+            jobs.enqueue()
+
+    Returns:
+        The entries that were added to the job queue, in listing order
+    """
+    channel = get_channel(url, db_path)
+    last_video_id = channel["last_video_id"] if channel else None
+    incremental = is_channel_url(url) and last_video_id is not None
+
+    title, entries = list_entries(
+        url,
+        stop_at=last_video_id if incremental else None,
+        limit=None if incremental else limit,
+    )
+    urls = [entry["url"] for entry in entries]
+    queued = set(enqueue(urls, db_path, version=version)["queued"])
+
+    newest = entries[0]["id"] if entries and is_channel_url(url) else last_video_id
+    update_channel(url, title or (channel or {}).get("title"), newest, db_path)
+    return [entry for entry in entries if entry["id"] in queued]
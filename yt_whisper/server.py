@@ -0,0 +1,286 @@
+"""
+Long-lived transcription daemon.
+
+`yt-whisper serve` keeps Whisper models loaded and owns one SQLite connection,
+and answers requests over a Unix socket that only its owner can open. Commands
+that go through it skip interpreter start-up, imports, model loading and
+opening the database, so cached lookups take milliseconds instead of seconds.
+
+The API is JSON over HTTP on the socket:
+
+    GET  /health            Daemon status
+    POST /call/<function>   Run one of FUNCTIONS, with a body of
+                            {"kwargs": {...}}
+
+Only the keyword arguments listed in FUNCTIONS are accepted. Functions always
+run on the daemon's own database; a client cannot name another file.
+
+Responses are {"result": ...}, or {"error": ..., "type": ...} with a 4xx/5xx
+status. Queries run one at a time on the thread that owns the database
+connection, and transcriptions one at a time on the inference thread, so a
+model is never used by two requests at once.
+"""
+
+import json
+import os
+import socketserver
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+from typing import Any
+
+from . import db
+from .backends import DEFAULT_BACKEND, resolve_precision
+from .client import socket_path as default_socket_path
+from .language import AUTO_MODEL
+from .lib import download_and_transcribe
+from .models import get_model
+
+# Read-only database functions the daemon runs on behalf of clients, with the
+# keyword arguments a client may pass; db_path is always the daemon's
+QUERIES: dict[str, tuple[str, ...]] = {
+    "existing_ids": (
+        "youtube_ids",
+        "model_name",
+        "language",
+        "backend",
+        "options_hash",
+    ),
+    "get_transcript": ("youtube_id", "include_metadata", "model_name"),
+    "get_versions": ("youtube_id",),
+    "get_video_info": ("youtube_id",),
+    "get_segments": ("youtube_id", "start", "end"),
+    "list_transcripts": ("limit", "after"),
+    "search_transcripts": ("query", "limit", "offset", "highlight"),
+    "search_segments": ("query", "youtube_id", "limit"),
+}
+
+FUNCTIONS: dict[str, tuple[str, ...]] = {
+    **QUERIES,
+    "transcribe": (
+        "url",
+        "save",
+        "force",
+        "model_name",
+        "language",
+        "native_audio",
+        "use_cache",
+        "workers",
+        "backend",
+        "compute_type",
+        "vad",
+        "stream",
+    ),
+}
+
+
+class Daemon:
+    """
+    State shared by all requests: the database thread and the warm models.
+
+    Args:
+        db_path: Database the daemon serves (default: the standard location)
+        model_name: Model used when a transcription request does not name one
+        backend: Inference backend for transcriptions
+        compute_type: Precision or quantization for the backend
+    """
+
+    def __init__(
+        self,
+        db_path: str | None = None,
+        model_name: str = "base",
+        backend: str = DEFAULT_BACKEND,
+        compute_type: str | None = None,
+    ) -> None:
+        self.db_path = db_path or db.get_db_path()
+        self.model_name = model_name
+        self.backend = backend
+        self.compute_type = resolve_precision(backend, compute_type)
+        self.started = time.time()
+        self.requests = 0
+        self._requests_lock = threading.Lock()
+        self._db = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ytw-db")
+        self._inference = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="ytw-inference"
+        )
+
+    def preload(self) -> None:
+        """Load the default model before the first request needs it."""
+        if self.model_name == AUTO_MODEL:
+            # The model is only known once a video's language is
+            return
+        self._inference.submit(
+            get_model,
+            self.model_name,
+            precision=self.compute_type,
+            backend=self.backend,
+        ).result()
+
+    def health(self) -> dict[str, Any]:
+        """Report what the daemon serves and how busy it has been."""
+        return {
+            "status": "ok",
+            "pid": os.getpid(),
+            "db_path": self.db_path,
+            "model": self.model_name,
+            "backend": self.backend,
+            "requests": self.requests,
+            "uptime": time.time() - self.started,
+        }
+
+    def call(self, name: str, kwargs: dict[str, Any]) -> Any:  # noqa: ANN401
+        """
+        Run a function for a client.
+
+        Raises:
+            ValueError: If the function is not one of FUNCTIONS, or an argument
+                is not one it accepts from clients
+        """
+        # Each connection is handled on its own thread
+        with self._requests_lock:
+            self.requests += 1
+        if name not in FUNCTIONS:
+            raise ValueError(f"Unknown function: {name}")
+        unexpected = sorted(set(kwargs) - set(FUNCTIONS[name]))
+        if unexpected:
+            raise ValueError(
+                f"Unexpected arguments for {name}: {', '.join(unexpected)}"
+            )
+        if name == "transcribe":
+            return self._inference.submit(self.transcribe, **kwargs).result()
+        return self._db.submit(
+            getattr(db, name), **kwargs, db_path=self.db_path
+        ).result()
+
+    def transcribe(self, url: str, save: bool = True, **options: Any) -> dict:  # noqa: ANN401
+        """Transcribe a video with the warm models and save it."""
+        options.setdefault("model_name", self.model_name)
+        options.setdefault("backend", self.backend)
+        if options["backend"] == self.backend:
+            options.setdefault("compute_type", self.compute_type)
+        result = download_and_transcribe(url, **options)
+        if save:
+            self._db.submit(db.save_to_db, result, self.db_path).result()
+        # The raw yt-dlp metadata is large and stays in the database
+        result.pop("metadata", None)
+        return result
+
+    def close(self) -> None:
+        """Stop the worker threads once their current work is done."""
+        self._db.shutdown()
+        self._inference.shutdown()
+
+
+def make_handler(daemon: Daemon) -> type[BaseHTTPRequestHandler]:
+    """Build the request handler class for a daemon."""
+
+    class Handler(BaseHTTPRequestHandler):
+        server_version = "yt-whisper"
+
+        def _reply(self, status: int, payload: dict[str, Any]) -> None:
+            # existing_ids returns a set
+            body = json.dumps(payload, default=list).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:  # noqa: N802
+            if self.path == "/health":
+                self._reply(200, {"result": daemon.health()})
+            else:
+                self._reply(404, {"error": f"Not found: {self.path}"})
+
+        def do_POST(self) -> None:  # noqa: N802
+            if not self.path.startswith("/call/"):
+                self._reply(404, {"error": f"Not found: {self.path}"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                kwargs = body.get("kwargs") or {}
+                if not isinstance(kwargs, dict):
+                    raise ValueError("kwargs must be an object")
+                result = daemon.call(self.path[len("/call/") :], kwargs)
+            except (ValueError, TypeError) as e:
+                self._reply(400, {"error": str(e), "type": "ValueError"})
+            except Exception as e:
+                self._reply(500, {"error": str(e), "type": type(e).__name__})
+            else:
+                self._reply(200, {"result": result})
+
+        def address_string(self) -> str:
+            # Unix socket clients have no address
+            return "unix"
+
+    return Handler
+
+
+class UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    """HTTP server on a Unix socket, one thread per connection."""
+
+    daemon_threads = True
+
+
+def create_server(daemon: Daemon, socket_path: str | None = None) -> UnixHTTPServer:
+    """
+    Bind the daemon to a Unix socket.
+
+    There is no TCP mode: a localhost port could be reached by any local user
+    and, through DNS rebinding, by web pages. A stale socket file left by a
+    daemon that exited uncleanly is replaced; one that still answers is an
+    error.
+
+    Raises:
+        RuntimeError: If another daemon is already listening on the socket
+    """
+    handler = make_handler(daemon)
+    path = socket_path or default_socket_path(daemon.db_path)
+    if os.path.exists(path):
+        from .client import Client, DaemonUnavailableError
+
+        try:
+            Client(path, timeout=1).health()
+        except DaemonUnavailableError:
+            os.unlink(path)
+        else:
+            raise RuntimeError(f"A daemon is already listening on {path}")
+
+    # Only the owner may talk to the daemon. The socket is created with these
+    # permissions, as changing them after bind leaves a window to connect.
+    umask = os.umask(0o177)
+    try:
+        return UnixHTTPServer(path, handler)
+    finally:
+        os.umask(umask)
+
+
+def serve(
+    daemon: Daemon,
+    socket_path: str | None = None,
+    ready: threading.Event | None = None,
+) -> None:
+    """
+    Serve requests until interrupted, then remove the socket file.
+
+    Args:
+        daemon: The daemon state to serve
+        socket_path: Unix socket to listen on (default: next to the database)
+        ready: Set once the server accepts connections
+    """
+    server = create_server(daemon, socket_path)
+    if ready:
+        ready.set()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        try:
+            os.unlink(server.server_address)
+        except FileNotFoundError:
+            pass
+        daemon.close()
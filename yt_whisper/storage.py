@@ -3,10 +3,27 @@ Module for handling storage-related functionality including database paths.
 """
 
 import sqlite3
+import time
 from pathlib import Path
 
 from platformdirs import user_data_dir
 
+# Seconds a connection waits for another writer's lock before "database is
+# locked". Workers, batch writers and the daemon can write at the same time.
+BUSY_TIMEOUT = 30.0
+
+# Pragmas applied to every connection opened by yt-whisper. WAL lets readers run
+# concurrently with a writer, and NORMAL synchronous mode is durable across
+# application crashes while avoiding an fsync on every commit.
+SQLITE_PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("busy_timeout", str(int(BUSY_TIMEOUT * 1000))),
+    ("temp_store", "MEMORY"),
+    ("cache_size", "-16000"),
+    ("foreign_keys", "ON"),
+)
+
 
 def get_database_path(db_name: str = "logs.db") -> Path:
     """
@@ -34,6 +51,21 @@ def get_database_path(db_name: str = "logs.db") -> Path:
     return app_dir / db_name
 
 
+def get_audio_cache_dir() -> Path:
+    """
+    Returns the directory of the on-disk audio cache, creating it if needed.
+
+    The cache lives next to the database in the platform-specific application
+    data directory, e.g. ~/.local/share/yt-whisper/audio-cache on Linux.
+
+    Returns:
+        Path: Path to the audio cache directory
+    """
+    cache_dir = Path(user_data_dir("yt-whisper")) / "audio-cache"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
 def get_database_file(filename: str) -> Path:
     """
     Get the full path to a database file in the app's data directory.
@@ -49,15 +81,58 @@ def get_database_file(filename: str) -> Path:
     return db_path
 
 
-def get_database_connection(db_name: str = "transcriptions.db") -> "sqlite3.Connection":
+def tune_connection(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """
+    Apply the yt-whisper SQLite pragmas to a connection.
+
+    Args:
+        conn: Connection to configure
+
+    Returns:
+        sqlite3.Connection: The same connection, for chaining
+    """
+    for name, value in SQLITE_PRAGMAS:
+        if name == "journal_mode":
+            _set_journal_mode(conn, value)
+        else:
+            conn.execute(f"PRAGMA {name} = {value}")
+    return conn
+
+
+def _set_journal_mode(conn: sqlite3.Connection, mode: str) -> None:
+    """
+    Switch the journal mode, waiting up to BUSY_TIMEOUT for other connections.
+
+    Switching a new database to WAL needs it to itself, and SQLite reports
+    "database is locked" at once instead of calling the busy handler when
+    another process opens the file at the same time.
+    """
+    deadline = time.monotonic() + BUSY_TIMEOUT
+    while True:
+        try:
+            conn.execute(f"PRAGMA journal_mode = {mode}")
+            return
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) or time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def get_database_connection(
+    db_name: str = "transcriptions.db", tuned: bool = False
+) -> "sqlite3.Connection":
     """
     Get a connection to the SQLite database.
 
     Args:
         db_name: Name of the database file (default: "transcriptions.db")
+        tuned: Whether to enable WAL mode and the other SQLITE_PRAGMAS
 
     Returns:
         sqlite3.Connection: Connection to the database
     """
     db_path = get_database_path(db_name)
-    return sqlite3.connect(str(db_path))
+    conn = sqlite3.connect(str(db_path), timeout=BUSY_TIMEOUT)
+    if tuned:
+        tune_connection(conn)
+    return conn
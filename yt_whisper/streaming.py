@@ -0,0 +1,186 @@
+"""
+Memory-bounded transcription of long audio.
+
+Given a file path, ``model.transcribe`` decodes the whole file into one float32
+array (about 230 MB per hour at 16 kHz) and computes the mel spectrogram of all
+of it, so memory grows with the length of the video. In streaming mode ffmpeg
+decodes into a pipe that is read one block at a time. Blocks are cut at pauses
+into windows of at most 30 seconds, and each window is transcribed and dropped
+before more audio is read, so only the current window's samples and mel
+features are held.
+
+Windows are decoded independently, as with batching (see yt_whisper.batching),
+so the text of one window does not prompt the next.
+"""
+
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from .audio import SAMPLE_RATE, stream_audio
+from .backends import DEFAULT_BACKEND, get_backend, resolve_precision
+from .batching import plan_windows
+from .lib import normalize_segments, transcription_options
+from .models import ModelCache, get_model
+from .timing import Timings
+
+# Audio read from ffmpeg at a time; windows are cut from up to this much plus
+# the unfinished window carried over from the previous block
+BLOCK_SECONDS = 60.0
+
+
+def iter_windows(
+    blocks: Iterable[npt.NDArray[np.float32]],
+) -> Iterator[tuple[int, npt.NDArray[np.float32]]]:
+    """
+    Cut consecutive blocks of samples into windows of at most 30 seconds.
+
+    The last window of each block may continue in the next one, so it is
+    carried over and cut again together with the next block.
+
+    Yields:
+        (first_sample, samples) of each window, in order
+    """
+    carry = np.zeros(0, dtype=np.float32)
+    position = 0
+    for block in blocks:
+        buffer = np.concatenate((carry, block)) if len(carry) else block
+        windows = plan_windows(buffer)
+        if not windows:
+            continue
+        for first, last in windows[:-1]:
+            yield position + first, buffer[first:last]
+        first = windows[-1][0]
+        # Copy, so the rest of the block can be freed
+        carry = np.array(buffer[first:])
+        position += first
+    if len(carry):
+        yield position, carry
+
+
+def _blocks(audio: Any) -> Iterator[npt.NDArray[np.float32]]:  # noqa: ANN401
+    """Blocks of a file path decoded through a pipe, or of in-memory samples."""
+    if isinstance(audio, str):
+        yield from stream_audio(audio, BLOCK_SECONDS)
+        return
+    # Slices of a memory-mapped array are only paged in while they are used
+    size = int(BLOCK_SECONDS * SAMPLE_RATE)
+    for first in range(0, len(audio), size):
+        yield np.asarray(audio[first : first + size], dtype=np.float32)
+
+
+def transcribe_stream(
+    audio: Any,  # noqa: ANN401
+    model_name: str = "base",
+    language: str | None = None,
+    model: Any = None,  # noqa: ANN401
+    timings: Timings | None = None,
+    backend: str = DEFAULT_BACKEND,
+    compute_type: str | None = None,
+    vad: bool = False,
+    model_cache: ModelCache | None = None,
+) -> dict[str, Any]:
+    """
+    Transcribe audio window by window without holding all of it in memory.
+
+    Args:
+        audio: Path to the audio file, or 16 kHz mono float32 samples (for
+            example memory-mapped with audio.open_pcm)
+        model_name: Name of the Whisper model to use, or 'auto' to detect the
+            language from the first window and pick a model for it
+        language: Language code. If None, it is detected from the first window
+            and used for the rest.
+        model: Already loaded model to use instead of the shared model cache
+        timings: Timings to record the model_load, vad and inference spans in
+        backend: Inference backend ('openai-whisper' or 'faster-whisper')
+        compute_type: Precision or quantization for the backend
+        vad: Skip the parts of each window without speech
+        model_cache: Cache to load models from instead of the shared one
+
+    Returns:
+        Dictionary with the same keys as run_transcription()
+    """
+    from .language import AUTO_MODEL, detect_language, route_model
+    from .vad import find_speech, join_regions, remap_segments, speech_stats
+
+    timings = timings or Timings()
+    precision = resolve_precision(backend, compute_type)
+    load = model_cache.get if model_cache else get_model
+    inference = get_backend(backend)
+
+    segments: list[dict[str, Any]] = []
+    language_probability = None
+    audio_samples = 0
+    speech_samples = 0
+
+    if isinstance(audio, str):
+        print(f"Streaming {audio}...")
+    for first, window in iter_windows(_blocks(audio)):
+        audio_samples += len(window)
+        regions = [(0, len(window))]
+        if vad:
+            with timings.span("vad"):
+                regions = find_speech(window)
+            speech_samples += sum(last - start for start, last in regions)
+            if not regions:
+                continue
+            window = join_regions(window, regions)
+
+        if model_name == AUTO_MODEL:
+            if language is None:
+                with timings.span("language_id"):
+                    detected = detect_language(
+                        window,
+                        backend=backend,
+                        compute_type=precision,
+                        model_cache=model_cache,
+                    )
+                language = detected["language"]
+                language_probability = detected["probability"]
+                print(f"Detected language: {language} ({language_probability:.0%})")
+            model_name = route_model(language)
+
+        if model is None:
+            print(f"Loading Whisper model: {model_name}...")
+            with timings.span("model_load"):
+                model = load(model_name, precision=precision, backend=backend)
+
+        with timings.span("inference"):
+            (result,) = inference.transcribe_windows(
+                model, [window], [language], precision
+            )
+        # The first window's language holds for the rest of the audio
+        language = language or result.get("language")
+
+        offset = first / SAMPLE_RATE
+        window_segments = result.get("segments") or []
+        if vad:
+            window_segments = remap_segments(window_segments, regions)
+        segments.extend(
+            {
+                **segment,
+                "start": segment["start"] + offset,
+                "end": segment["end"] + offset,
+            }
+            for segment in window_segments
+        )
+
+    transcription = {
+        "text": "".join(segment["text"] for segment in segments),
+        "segments": normalize_segments(segments),
+        "language": language,
+        "language_probability": language_probability,
+        "model": None if model_name == AUTO_MODEL else model_name,
+        "backend": backend,
+        "options": transcription_options(precision, vad, streamed=True),
+    }
+    if vad:
+        stats = speech_stats([(0, speech_samples)], audio_samples)
+        print(
+            f"Skipped {stats['skipped_seconds']:.1f}s of "
+            f"{stats['audio_seconds']:.1f}s without speech"
+        )
+        transcription["vad"] = stats
+    return transcription
@@ -0,0 +1,124 @@
+"""
+Per-stage timing instrumentation.
+
+A Timings object collects wall-clock spans for the stages of a transcription
+(download, metadata parse, model load, inference, database write) so slow runs
+can be attributed to the stage that caused them. reset_peak_rss() and
+peak_rss() measure the memory high-water mark of a run.
+"""
+
+import sys
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+# Display order of the well-known stages
+STAGES = (
+    "download",
+    "metadata",
+    "decode",
+    "vad",
+    "language_id",
+    "model_load",
+    "inference",
+    "db_write",
+)
+
+
+class Timings:
+    """Accumulates named timing spans, in seconds."""
+
+    def __init__(self) -> None:
+        self.spans: dict[str, float] = {}
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Time the enclosed block and add it to the span called name."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float) -> None:
+        """Add seconds to a span."""
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def as_dict(self) -> dict[str, float]:
+        """Return the spans, well-known stages first."""
+        ordered = {name: self.spans[name] for name in STAGES if name in self.spans}
+        ordered.update(self.spans)
+        return ordered
+
+
+def real_time_factor(audio_seconds: float, timings: dict[str, float]) -> float | None:
+    """Seconds of audio transcribed per second of inference, if known."""
+    inference = timings.get("inference")
+    if not inference or not audio_seconds:
+        return None
+    return audio_seconds / inference
+
+
+def format_profile(timings: dict[str, float], audio_seconds: float = 0) -> list[str]:
+    """
+    Format timing spans as a breakdown table.
+
+    Args:
+        timings: Span durations in seconds
+        audio_seconds: Duration of the transcribed audio
+
+    Returns:
+        Lines of the table, ending with the real-time factor when known
+    """
+    total = sum(timings.values())
+    lines = [f"{'Stage':<12} {'Seconds':>10} {'Share':>7}"]
+    for name, seconds in timings.items():
+        share = seconds / total * 100 if total else 0.0
+        lines.append(f"{name:<12} {seconds:>10.2f} {share:>6.1f}%")
+    lines.append(f"{'total':<12} {total:>10.2f}")
+
+    factor = real_time_factor(audio_seconds, timings)
+    if factor is not None:
+        lines.append(
+            f"Real-time factor: {factor:.1f}x "
+            f"({audio_seconds:.0f}s audio / {timings['inference']:.2f}s inference)"
+        )
+    return lines
+
+
+def reset_peak_rss() -> None:
+    """
+    Start measuring the peak resident memory from now.
+
+    Only Linux can reset the high-water mark; elsewhere peak_rss() reports the
+    peak since the process started.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss() -> int | None:
+    """
+    Peak resident memory of this process in bytes, if the OS reports it.
+
+    The process is shared by all threads, so with concurrent transcriptions
+    this is the peak of all of them.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
@@ -0,0 +1,160 @@
+"""
+Voice activity detection before transcription.
+
+Long intros, outros and dead air cost as much inference time as speech, and
+Whisper tends to hallucinate text over them. An energy-based detector, built on
+the same frame energies used to place chunk splits, finds the stretches that
+stand out from the recording's noise floor. Only those are transcribed, and the
+segment timestamps are moved back onto the original timeline.
+"""
+
+import bisect
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from .audio import SAMPLE_RATE, frame_energy
+from .db import MAX_SEGMENT_SECONDS
+
+# Frames quieter than this are never speech, whatever the recording's level
+SILENCE_DB = -60.0
+
+# Bounds of the automatic threshold, in dBFS and in dB above the noise floor
+MIN_THRESHOLD_DB = -50.0
+NOISE_MARGIN_DB = 10.0
+
+# The threshold stays at least this far below the loud parts of the audio
+DYNAMIC_RANGE_DB = 20.0
+
+
+def _auto_threshold(levels: npt.NDArray[np.float32]) -> float:
+    """Pick a threshold between the noise floor and the loud parts of the audio."""
+    noise = float(np.percentile(levels, 10))
+    peak = float(np.percentile(levels, 95))
+    threshold = max(noise + NOISE_MARGIN_DB, MIN_THRESHOLD_DB)
+    threshold = min(threshold, peak - DYNAMIC_RANGE_DB)
+    return max(threshold, SILENCE_DB)
+
+
+def find_speech(
+    samples: npt.NDArray[np.float32],
+    sample_rate: int = SAMPLE_RATE,
+    threshold_db: float | None = None,
+    frame_seconds: float = 0.03,
+    min_speech_seconds: float = 0.25,
+    min_silence_seconds: float = 1.0,
+    padding_seconds: float = 0.2,
+) -> list[tuple[int, int]]:
+    """
+    Find the regions of the audio that contain speech.
+
+    Args:
+        samples: Mono audio samples
+        sample_rate: Sample rate of the audio
+        threshold_db: Frame level in dBFS above which a frame counts as speech
+            (default: chosen from the audio's noise floor)
+        frame_seconds: Length of the frames energy is measured over
+        min_speech_seconds: Shorter bursts of sound are dropped
+        min_silence_seconds: Shorter pauses do not split a region
+        padding_seconds: Audio kept on both sides of each region, so quiet word
+            onsets and endings are not cut off
+
+    Returns:
+        Non-overlapping (first_sample, last_sample) ranges in increasing order
+    """
+    frame_size = max(1, int(frame_seconds * sample_rate))
+    energy = frame_energy(samples, frame_size)
+    if not len(energy):
+        return []
+
+    levels = 20 * np.log10(energy + 1e-10)
+    if threshold_db is None:
+        threshold_db = _auto_threshold(levels)
+    active = (levels > threshold_db).astype(np.int8)
+
+    # Frame indices where activity starts and stops
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], active, [0]))))
+    frames: list[list[int]] = []
+    min_gap = min_silence_seconds / frame_seconds
+    for start, end in zip(edges[::2], edges[1::2], strict=True):
+        if frames and start - frames[-1][1] < min_gap:
+            frames[-1][1] = end
+        else:
+            frames.append([start, end])
+
+    padding = int(padding_seconds * sample_rate)
+    regions: list[tuple[int, int]] = []
+    for start, end in frames:
+        if (end - start) * frame_seconds < min_speech_seconds:
+            continue
+        first = max(0, start * frame_size - padding)
+        # The samples after the last complete frame belong to the last region
+        last = len(samples) if end == len(energy) else end * frame_size
+        last = min(len(samples), last + padding)
+        if regions and first <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], last)
+        else:
+            regions.append((first, last))
+    return regions
+
+
+def join_regions(
+    samples: npt.NDArray[np.float32], regions: list[tuple[int, int]]
+) -> npt.NDArray[np.float32]:
+    """Concatenate the speech regions into one array to transcribe."""
+    if not regions:
+        return np.zeros(0, dtype=np.float32)
+    return np.concatenate(
+        [np.asarray(samples[first:last], dtype=np.float32) for first, last in regions]
+    )
+
+
+def remap_segments(
+    segments: list[dict[str, Any]],
+    regions: list[tuple[int, int]],
+    sample_rate: int = SAMPLE_RATE,
+) -> list[dict[str, Any]]:
+    """
+    Move segment timestamps from the joined speech back to the original audio.
+
+    A segment that spans a removed stretch is cut off at the end of the region
+    it starts in if it would otherwise exceed MAX_SEGMENT_SECONDS, which the
+    segment time range queries rely on.
+    """
+    # Start of each region in the joined audio, and on the original timeline
+    offsets, position = [], 0.0
+    for first, last in regions:
+        offsets.append(position)
+        position += (last - first) / sample_rate
+
+    def locate(seconds: float, is_end: bool) -> tuple[int, float]:
+        if is_end:
+            index = max(0, bisect.bisect_left(offsets, seconds) - 1)
+        else:
+            index = max(0, bisect.bisect_right(offsets, seconds) - 1)
+        first, last = regions[index]
+        within = min(seconds - offsets[index], (last - first) / sample_rate)
+        return index, first / sample_rate + max(0.0, within)
+
+    remapped = []
+    for segment in segments:
+        index, start = locate(segment["start"], is_end=False)
+        _, end = locate(segment["end"], is_end=True)
+        if end - start > MAX_SEGMENT_SECONDS:
+            end = min(regions[index][1] / sample_rate, start + MAX_SEGMENT_SECONDS)
+        remapped.append({**segment, "start": start, "end": max(start, end)})
+    return remapped
+
+
+def speech_stats(
+    regions: list[tuple[int, int]], num_samples: int, sample_rate: int = SAMPLE_RATE
+) -> dict[str, float]:
+    """Report how much of the audio was kept as speech and how much was skipped."""
+    audio_seconds = num_samples / sample_rate
+    speech_seconds = sum(last - first for first, last in regions) / sample_rate
+    return {
+        "audio_seconds": audio_seconds,
+        "speech_seconds": speech_seconds,
+        "skipped_seconds": audio_seconds - speech_seconds,
+    }